@@ -0,0 +1,64 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""
+ChunkedDownload
+
+Functions that are submitted to the cluster in order to download a large remote
+object one index range at a time (see RemotePythonObject.toLocalIter).
+
+The 'remote*' functions are converted and executed by pyfora, so they must stick
+to the "pure" subset of Python that pyfora supports.
+"""
+
+
+def chunkRanges(length, chunkSize):
+    """Split [0, length) into consecutive (low, high) ranges of at most chunkSize."""
+    return [(low, min(low + chunkSize, length)) for low in xrange(0, length, chunkSize)]
+
+
+def remoteLayout(value):
+    """Describe how 'value' should be paged.
+
+    Returns a tuple (kind, length), where 'kind' is one of
+        'dict' - page over the keys of a dictionary
+        'sequence' - page over a list, tuple or string using slices
+        'iloc' - page over a dataframe or series using 'iloc' slices
+        'whole' - the value can't be paged and has to be downloaded at once
+    """
+    if isinstance(value, dict):
+        return ('dict', len(value))
+    if isinstance(value, list) or isinstance(value, tuple) or isinstance(value, str):
+        return ('sequence', len(value))
+
+    try:
+        value.iloc
+        return ('iloc', len(value))
+    except Exception:
+        return ('whole', None)
+
+
+def remoteDictKeys(value):
+    return value.keys()
+
+
+def remoteDictChunk(value, keys, low, high):
+    return {k: value[k] for k in keys[low:high]}
+
+
+def remoteSequenceChunk(value, low, high):
+    return value[low:high]
+
+
+def remoteIlocChunk(value, low, high):
+    return value.iloc[low:high]
@@ -23,6 +23,7 @@ import pyfora.Executor as Executor
 import pyfora.ObjectConverter as ObjectConverter
 import pyfora.RemotePythonObject as RemotePythonObject
 import pyfora.SocketIoJsonInterface as SocketIoJsonInterface
+import pyfora.TcpMsgpackInterface as TcpMsgpackInterface
 import pyfora.ModuleDirectoryStructure as ModuleDirectoryStructure
 
 # We defer importing SubscribableWebObjects.py to support auto doc generation
@@ -158,11 +159,11 @@ class Connection(object):
             })
 
 
-    def convertObject(self, objectId, objectRegistry, callback):
+    def convertObject(self, objectId, objectRegistry, callback, dependentObjectIdsToExpose=None):
         def wrapper(*args, **kwargs):
             if not self.closed:
                 callback(*args, **kwargs)
-        self.objectConverter.convert(objectId, objectRegistry, wrapper)
+        self.objectConverter.convert(objectId, objectRegistry, wrapper, dependentObjectIdsToExpose)
 
 
     def createComputation(self, fn, args, onCreatedCallback):
@@ -197,6 +198,83 @@ class Connection(object):
             })
 
 
+    def createComputationBatch(self, argIdsList, onCreatedCallback):
+        """Create one computation for each element of argIdsList with a single request.
+
+        argIdsList - a list of tuples of converted objectIds. The first objectId in each
+            tuple is the function to call and the rest are its arguments.
+        onCreatedCallback - called with an Exception.PyforaError if there is an error,
+            otherwise, called with the batch and a list of ComputedValue objects
+            representing the computations, in the order of argIdsList.
+        """
+        batch = self.webObjectFactory.PyforaComputedValueBatch({
+            'argIdsList': [tuple(argIds) for argIds in argIdsList]
+            })
+
+        isCreated = [False]
+        def onFailure(err):
+            if not self.closed:
+                onCreatedCallback(Exceptions.PyforaError(err))
+        def onSubmittedComputedValues(computedValues):
+            if not self.closed and computedValues is not None and not isCreated[0]:
+                isCreated[0] = True
+                onCreatedCallback(batch, computedValues)
+
+        batch.subscribe_submittedComputedValues({
+            'onSuccess': onSubmittedComputedValues,
+            'onFailure': onFailure,
+            'onChanged': onSubmittedComputedValues
+            })
+
+    def prioritizeComputationBatch(self,
+                                   batch,
+                                   onPrioritizedCallback,
+                                   onStatusesChangedCallback,
+                                   onFailedCallback):
+        """Prioritize every computation in a batch and watch them with a single subscription.
+
+        batch - the batch passed to the callback of createComputationBatch.
+        onPrioritizedCallback - called with either an error or None on success of the prioritization
+        onStatusesChangedCallback - called with a list of (index, jsonStatus) pairs for the
+            computations in the batch that have finished since the previous call.
+        onFailedCallback - called with a pyfora exception if the subscription fails
+        """
+        def onFailure(err):
+            if not self.closed:
+                onPrioritizedCallback(Exceptions.PyforaError(err))
+
+        #indices whose status we have already passed on
+        reported = set()
+
+        def statusesChanged(jsonStatuses):
+            if not self.closed and jsonStatuses is not None:
+                newStatuses = [
+                    (int(index), jsonStatus)
+                    for index, jsonStatus in jsonStatuses.iteritems()
+                    if index not in reported
+                    ]
+                reported.update(jsonStatuses.iterkeys())
+                if newStatuses:
+                    onStatusesChangedCallback(newStatuses)
+
+        def onSubscriptionFailure(err):
+            if not self.closed:
+                onFailedCallback(Exceptions.PyforaError(err))
+
+        def onSuccess(result):
+            if not self.closed:
+                onPrioritizedCallback(None)
+                batch.subscribe_jsonStatusRepresentations({
+                    'onSuccess': statusesChanged,
+                    'onFailure': onSubscriptionFailure,
+                    'onChanged': statusesChanged
+                    })
+
+        batch.increaseRequestCount({}, {
+            'onSuccess': onSuccess,
+            'onFailure': onFailure
+            })
+
     def prioritizeComputation(self,
                               computedValue,
                               onPrioritizedCallback,
@@ -333,11 +411,17 @@ class Connection(object):
             })
 
 
-    def downloadComputation(self, computedValue, onResultCallback, maxBytecount=None):
+    def downloadComputation(self,
+                            computedValue,
+                            onResultCallback,
+                            maxBytecount=None,
+                            encoding=None):
         """download the result of a computation as json.
 
         onResultCallback - called with a PyforaError if there is a problem, or
             the json representation of the computation's result or exception otherwise.
+        encoding - None (or 'json') for the default encoding, or 'binary' to receive
+            homogenous lists as a single raw typed buffer (see PythonObjectRehydrator).
         """
         def onFailure(err):
             if not self.closed:
@@ -360,7 +444,7 @@ class Connection(object):
                     })
 
         resultComputer = self.webObjectFactory.PyforaResultAsJson(
-            {'computedValue': computedValue, 'maxBytecount': maxBytecount}
+            {'computedValue': computedValue, 'maxBytecount': maxBytecount, 'encoding': encoding}
             )
 
         resultComputer.subscribe_resultIsPopulated({
@@ -381,29 +465,43 @@ def createObjectConverter(webObjectFactory):
     return ObjectConverter.ObjectConverter(webObjectFactory, moduleTree.toJson())
 
 
-def connect(url, timeout=30.0):
+TCP_URL_PREFIX = 'tcp://'
+
+def connect(url, timeout=30.0, returnNumpyArrays=False):
     """Opens a connection to a pyfora cluster
 
     Args:
-        url (str): The HTTP URL of the cluster's manager (e.g. ``http://192.168.1.200:30000``)
+        url (str): The HTTP URL of the cluster's manager (e.g. ``http://192.168.1.200:30000``).
+            A ``tcp://`` URL of the cluster's backend gateway (e.g. ``tcp://192.168.1.200:30008``)
+            connects to it directly using msgpack encoded messages, which requires the
+            ``msgpack`` package.
         timeout (Optional float): A timeout for the operation in seconds, or None
             to wait indefinitely.
+        returnNumpyArrays (Optional bool): If ``True``, downloaded lists of numbers are
+            returned as read-only :class:`numpy.ndarray` objects rather than python lists.
 
     Returns:
         An :class:`~pyfora.Executor.Executor` that can be used to submit work
         to the cluster.
     """
-    socketIoInterface = SocketIoJsonInterface.SocketIoJsonInterface(
-        url,
-        '/subscribableWebObjects'
-        )
+    if url.startswith(TCP_URL_PREFIX):
+        host, port = url[len(TCP_URL_PREFIX):].rstrip('/').rsplit(':', 1)
+        socketIoInterface = TcpMsgpackInterface.TcpMsgpackInterface(host, int(port))
+    else:
+        socketIoInterface = SocketIoJsonInterface.SocketIoJsonInterface(
+            url,
+            '/subscribableWebObjects'
+            )
     socketIoInterface.connect(timeout=timeout)
-    return connectGivenSocketIo(socketIoInterface)
+    return connectGivenSocketIo(socketIoInterface, returnNumpyArrays=returnNumpyArrays)
 
 
-def connectGivenSocketIo(socketIoInterface):
+def connectGivenSocketIo(socketIoInterface, returnNumpyArrays=False):
     import pyfora.SubscribableWebObjects as SubscribableWebObjects
     webObjectFactory = SubscribableWebObjects.WebObjectFactory(socketIoInterface)
-    return Executor.Executor(Connection(webObjectFactory, createObjectConverter(webObjectFactory)))
+    return Executor.Executor(
+        Connection(webObjectFactory, createObjectConverter(webObjectFactory)),
+        returnNumpyArrays=returnNumpyArrays
+        )
 
 
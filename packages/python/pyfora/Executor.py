@@ -27,6 +27,9 @@ import pyfora.ObjectRegistry as ObjectRegistry
 import pyfora.PyObjectWalker as PyObjectWalker
 import pyfora.WithBlockExecutor as WithBlockExecutor
 import pyfora.PureImplementationMappings as PureImplementationMappings
+import pyfora.ChunkedDownload as ChunkedDownload
+import collections
+import concurrent.futures
 import traceback
 import logging
 import threading
@@ -66,10 +69,14 @@ class Executor(object):
             :class:`~PureImplementationMappings.PureImplementationMappings`
             that defines mapping between Python libraries and their "pure" :mod:`pyfora`
             implementation.
+        returnNumpyArrays (optional bool): if ``True``, downloaded lists of numbers are
+            returned as read-only :class:`numpy.ndarray` objects that wrap the downloaded
+            buffer without copying it, rather than as python lists.
     """
-    def __init__(self, connection, pureImplementationMappings=None):
+    def __init__(self, connection, pureImplementationMappings=None, returnNumpyArrays=False):
         self.connection = connection
         self.stayOpenOnExit = False
+        self.returnNumpyArrays = returnNumpyArrays
         self.pureImplementationMappings = \
             pureImplementationMappings or PureImplementationMappings.PureImplementationMappings()
         self.objectRegistry = ObjectRegistry.ObjectRegistry()
@@ -239,6 +246,118 @@ class Executor(object):
         return results[0](*results[1:])
 
 
+    def submitMany(self, fn, argTuples):
+        """Submits ``fn(*args)`` for every ``args`` in ``argTuples`` as a single batch.
+
+        Unlike calling :func:`~Executor.submit` in a loop, the function and all the
+        arguments are converted in one request, all the computations are created in
+        a second one and prioritized in a third, and their results are reported
+        through one subscription. This makes large parameter sweeps of small
+        computations much cheaper.
+
+        Args:
+            fn: a callable, or a :class:`~RemotePythonObject.RemotePythonObject` of one.
+            argTuples: an iterable of argument tuples.
+
+        Returns:
+            A list of :class:`~Future.Future` objects, one for each element of ``argTuples``
+            and in the same order. They resolve to :class:`~RemotePythonObject.RemotePythonObject`
+            instances (or exceptions) as the computations complete.
+        """
+        self._raiseIfClosed()
+
+        argTuples = [tuple(args) for args in argTuples]
+        futures = [self._create_future(onCancel=self._cancelComputation) for _ in argTuples]
+        if not futures:
+            return futures
+
+        try:
+            walker = PyObjectWalker.PyObjectWalker(
+                purePythonClassMapping=self.pureImplementationMappings,
+                objectRegistry=self.objectRegistry
+                )
+            fnId = walker.walkPyObject(fn)
+            argIdsList = [
+                (fnId,) + tuple(walker.walkPyObject(arg) for arg in args)
+                for args in argTuples
+                ]
+        except PyObjectWalker.UnresolvedFreeVariableExceptionWithTrace as e:
+            logging.error(
+                "Converting UnresolvedFreeVariableExceptionWithTrace to PythonToForaConversionError:\n%s",
+                traceback.format_exc())
+            raise Exceptions.PythonToForaConversionError(e.message, e.trace)
+
+        #convert everything in one request by converting a tuple that holds all of it
+        objectIds = sorted(set(objectId for argIds in argIdsList for objectId in argIds))
+        rootId = self.objectRegistry.allocateObject()
+        self.objectRegistry.defineTuple(rootId, objectIds)
+
+        def onFailure(exception):
+            for future in futures:
+                if not future.done():
+                    self._resolve_future(future, exception)
+
+        def onStatusesChanged(jsonStatuses):
+            for index, jsonStatus in jsonStatuses:
+                future = futures[index]
+                if future.done():
+                    continue
+                if jsonStatus['status'] == 'failure':
+                    self._resolve_future(future, Exceptions.PyforaError(jsonStatus['message']))
+                else:
+                    self._resolveFutureToComputedObject(future, jsonStatus)
+
+        def onPrioritized(result):
+            if isinstance(result, Exception):
+                onFailure(result)
+            else:
+                for future in futures:
+                    future.set_running_or_notify_cancel()
+
+        def onCreated(result, computedValues=None):
+            if isinstance(result, Exception):
+                onFailure(result)
+                return
+
+            for future, computedValue in zip(futures, computedValues):
+                future.setComputedValue(computedValue)
+
+            self.connection.prioritizeComputationBatch(
+                result,
+                onPrioritized,
+                onStatusesChanged,
+                onFailure
+                )
+
+        def onConverted(result):
+            if isinstance(result, Exception):
+                onFailure(result)
+            else:
+                self.connection.createComputationBatch(argIdsList, onCreated)
+
+        self.connection.convertObject(rootId, self.objectRegistry, onConverted, objectIds)
+        return futures
+
+
+    def map(self, fn, *iterables):
+        """Computes ``fn`` over the elements of ``iterables`` remotely, as a single batch.
+
+        This is a generator that yields the results as the computations complete, which
+        is not necessarily the order of ``iterables``. See :func:`~Executor.submitMany`.
+
+        Args:
+            fn: a callable, or a :class:`~RemotePythonObject.RemotePythonObject` of one.
+            iterables: one iterable for each argument of ``fn``, as with the builtin ``map``.
+
+        Yields:
+            A :class:`~RemotePythonObject.RemotePythonObject` for each completed call.
+            Raises the exception of the first call that fails.
+        """
+        futures = self.submitMany(fn, zip(*iterables))
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+
     def close(self):
         """Closes the connection to the pyfora cluster."""
         if not self.isClosed():
@@ -336,7 +455,70 @@ class Executor(object):
                 result = Exceptions.ForaToPythonConversionError(e)
             self._resolve_future(future, result)
 
-        self.connection.downloadComputation(computation, onResultCallback, maxBytecount)
+        self.connection.downloadComputation(computation,
+                                            onResultCallback,
+                                            maxBytecount,
+                                            encoding='binary')
+        return future
+
+
+    def _iterateRemoteObjectInChunks(self, remoteObject, chunkSize, maxChunksInFlight):
+        assert chunkSize > 0 and maxChunksInFlight > 0
+
+        kind, length = self.submit(ChunkedDownload.remoteLayout, remoteObject)\
+            .result().toLocal().result()
+
+        if kind == 'whole':
+            yield remoteObject.toLocal().result()
+            return
+
+        if kind == 'dict':
+            keys = self.submit(ChunkedDownload.remoteDictKeys, remoteObject).result()
+            chunkFunction = ChunkedDownload.remoteDictChunk
+            leadingArgs = (remoteObject, keys)
+        elif kind == 'sequence':
+            chunkFunction = ChunkedDownload.remoteSequenceChunk
+            leadingArgs = (remoteObject,)
+        else:
+            chunkFunction = ChunkedDownload.remoteIlocChunk
+            leadingArgs = (remoteObject,)
+
+        chunkFunctionProxy = self.define(chunkFunction).result()
+
+        ranges = collections.deque(ChunkedDownload.chunkRanges(length, chunkSize))
+        pendingChunks = collections.deque()
+
+        while ranges or pendingChunks:
+            while ranges and len(pendingChunks) < maxChunksInFlight:
+                low, high = ranges.popleft()
+                args = leadingArgs + (self.define(low).result(), self.define(high).result())
+                pendingChunks.append(self._computeAndDownload(chunkFunctionProxy, args))
+
+            yield pendingChunks.popleft().result()
+
+
+    def _computeAndDownload(self, fnHandle, argHandles):
+        """Call a remote function and download its result, without blocking.
+
+        Returns a Future that resolves to the local value of fnHandle(*argHandles).
+        """
+        future = self._create_future()
+
+        def onDownloaded(downloadFuture):
+            exception = downloadFuture.exception()
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(downloadFuture.result())
+
+        def onComputed(computedFuture):
+            exception = computedFuture.exception()
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                computedFuture.result().toLocal().add_done_callback(onDownloaded)
+
+        self._callRemoteObject(fnHandle, argHandles).add_done_callback(onComputed)
         return future
 
 
@@ -350,7 +532,10 @@ class Executor(object):
             if 'maxBytesExceeded' in jsonResult:
                 return Exceptions.ResultExceededBytecountThreshold()
             else:
-                return self.objectRehydrator.convertJsonResultToPythonObject(jsonResult['result'])
+                return self.objectRehydrator.convertJsonResultToPythonObject(
+                    jsonResult['result'],
+                    returnNumpyArrays=self.returnNumpyArrays
+                    )
 
         result = self.objectRehydrator.convertJsonResultToPythonObject(jsonResult['result'])
         return Exceptions.ComputationError(result, jsonResult['trace'])
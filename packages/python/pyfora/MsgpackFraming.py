@@ -0,0 +1,94 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+"""
+MsgpackFraming
+
+The wire format used by TcpMsgpackInterface and the BackendGateway for clients
+that connect to the gateway directly instead of through the socket.io relay.
+
+Every frame is a little-endian uint32 length followed by that many bytes, which
+is the framing SocketStringChannel uses. The first frame a client sends is the
+JSON connection request, e.g.
+
+    {"requestType": "SubscribableWebObjects", "encoding": "msgpack", "version": "..."}
+
+and the gateway answers with a msgpack encoded handshake ('ok' or an error
+message). After that, every frame holds one msgpack encoded message with the
+same schema as the JSON messages sent over socket.io.
+
+Requests are encoded as the two element array [messageId, body] so that clients
+can encode 'body' before a messageId is assigned to it.
+"""
+
+import struct
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+ENCODING = 'msgpack'
+
+HANDSHAKE_OK = 'ok'
+
+frameHeader = struct.Struct('<I')
+
+#the msgpack prefix of a two element array
+_pairPrefix = '\x92'
+
+
+def isAvailable():
+    return msgpack is not None
+
+
+def _raiseIfUnavailable():
+    if msgpack is None:
+        raise ImportError(
+            "The 'msgpack' package is required to connect to the gateway over tcp"
+            )
+
+
+def _default(obj):
+    if hasattr(obj, 'toMemoizedJSON'):
+        return obj.toMemoizedJSON()
+    raise TypeError("Can't encode %s as msgpack" % type(obj))
+
+
+def encode(message):
+    _raiseIfUnavailable()
+    return msgpack.packb(message, default=_default, use_bin_type=False)
+
+
+def decode(payload):
+    _raiseIfUnavailable()
+    return msgpack.unpackb(payload, raw=True)
+
+
+def encodeRequest(messageId, encodedBody):
+    """Combine a messageId with a body that was already passed through 'encode'."""
+    return _pairPrefix + encode(messageId) + encodedBody
+
+
+def decodeRequest(payload):
+    """Decode a frame produced by 'encodeRequest' into a message dictionary."""
+    messageId, body = decode(payload)
+    if not isinstance(body, dict):
+        raise ValueError("Incoming message was not a dictionary: %s" % body)
+    body['messageId'] = messageId
+    return body
+
+
+def frame(payload):
+    return frameHeader.pack(len(payload)) + payload
@@ -28,15 +28,58 @@ class ObjectConverter(object):
 
         self.remoteConverter.initialize({'purePythonMDSAsJson': purePythonMDSAsJson}, {'onSuccess':onSuccess, 'onFailure':onFailure})
 
-    def convert(self, objectId, objectRegistry, callback):
+        #content hashes of definitions we have already sent to the server
+        self.contentHashesKnownToServer = set()
+
+    def convert(self, objectId, objectRegistry, callback, dependentObjectIdsToExpose=None):
+        """Convert 'objectId' and everything it depends on to FORA on the server.
+
+        dependentObjectIdsToExpose - objectIds that 'objectId' depends on which should also be
+            usable as computation arguments, as if they had been converted on their own.
+        """
         dependencyGraph = objectRegistry.computeDependencyGraph(objectId)
-        objectIdToObjectDefinition = {
+
+        serializedDefinitions = {
             objId: TypeDescription.serialize(objectRegistry.getDefinition(objId))
             for objId in dependencyGraph.iterkeys()
             }
+        objectIdToContentHash = {}
+        for objId, definition in serializedDefinitions.iteritems():
+            contentHash = TypeDescription.contentHash(definition)
+            if contentHash is not None:
+                objectIdToContentHash[objId] = contentHash
+
+        self._convert(objectId,
+                      serializedDefinitions,
+                      objectIdToContentHash,
+                      list(dependentObjectIdsToExpose or ()),
+                      callback)
+
+    def _convert(self,
+                 objectId,
+                 serializedDefinitions,
+                 objectIdToContentHash,
+                 dependentObjectIdsToExpose,
+                 callback):
+        #only send definitions whose content the server hasn't seen. It can look up the rest
+        #by their content hash.
+        objectIdToObjectDefinition = {
+            objId: definition
+            for objId, definition in serializedDefinitions.iteritems()
+            if objectIdToContentHash.get(objId) not in self.contentHashesKnownToServer
+            }
 
         def onSuccess(message):
-            if 'isException' not in message:
+            if 'unknownContentHashes' in message:
+                #the server dropped some content we thought it had. Resend it in full.
+                self.contentHashesKnownToServer.difference_update(message['unknownContentHashes'])
+                self._convert(objectId,
+                              serializedDefinitions,
+                              objectIdToContentHash,
+                              dependentObjectIdsToExpose,
+                              callback)
+            elif 'isException' not in message:
+                self.contentHashesKnownToServer.update(objectIdToContentHash.itervalues())
                 callback(objectId)
             else:
                 callback(Exceptions.PythonToForaConversionError(str(message['message']), message['trace']))
@@ -44,7 +87,9 @@ class ObjectConverter(object):
         self.remoteConverter.convert(
             {
                 'objectId': objectId,
-                'objectIdToObjectDefinition': objectIdToObjectDefinition
+                'objectIdToObjectDefinition': objectIdToObjectDefinition,
+                'objectIdToContentHash': objectIdToContentHash,
+                'dependentObjectIdsToExpose': dependentObjectIdsToExpose
             },
             {
                 'onSuccess': onSuccess,
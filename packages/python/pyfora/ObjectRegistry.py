@@ -15,6 +15,10 @@
 import pyfora.TypeDescription as TypeDescription
 import base64
 
+#the numpy dtypes that can be sent as PackedHomogenousData, which correspond to
+#pyfora's int, float and bool
+PACKABLE_DTYPES = ('<i8', '<f8', '|b1')
+
 class ObjectRegistry(object):
     def __init__(self):
         self._nextObjectID = 0
@@ -34,6 +38,17 @@ class ObjectRegistry(object):
             primitive = base64.b64encode(primitive)
         self.objectIdToObjectDefinition[objectId] = primitive
 
+    def definePackedHomogenousData(self, objectId, array):
+        """Define a list whose elements are the elements of a 1-d numpy array.
+
+        The array must already have one of the dtypes in PACKABLE_DTYPES.
+        """
+        assert array.dtype.str in PACKABLE_DTYPES, array.dtype
+        self.objectIdToObjectDefinition[objectId] = TypeDescription.PackedHomogenousData(
+            dtype=array.dtype.str,
+            dataAsBytes=base64.b64encode(array.tostring())
+            )
+
     def defineTuple(self, objectId, memberIds):
         self.objectIdToObjectDefinition[objectId] = TypeDescription.Tuple(memberIds)
 
@@ -147,7 +162,7 @@ class ObjectRegistry(object):
         if TypeDescription.isPrimitive(objectDefinition) or \
                 isinstance(objectDefinition,
                            (TypeDescription.File, TypeDescription.RemotePythonObject,
-                            TypeDescription.NamedSingleton, list,
+                            TypeDescription.NamedSingleton, TypeDescription.PackedHomogenousData, list,
                             TypeDescription.Unconvertible)):
             return []
         elif isinstance(objectDefinition, (TypeDescription.BuiltinExceptionInstance)):
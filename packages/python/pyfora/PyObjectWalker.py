@@ -27,6 +27,10 @@ import logging
 import traceback
 import __builtin__
 import ast
+import numpy
+
+#lists of ints, floats or bools at least this long are sent as one packed buffer
+MIN_LIST_LENGTH_TO_PACK = 100
 
 
 class UnresolvedFreeVariableException(Exception):
@@ -62,6 +66,27 @@ def _convertUnresolvedFreeVariableExceptionAndRaise(e, sourceFileName):
         )
 
 
+_packedDtypeForType = {int: '<i8', float: '<f8', bool: '|b1'}
+
+_packedDtypeForNumpyKind = {'i': '<i8', 'u': '<i8', 'f': '<f8', 'b': '|b1'}
+
+
+def _fitsPackedDtype(array, packedDtype):
+    """Determine whether every element of 'array' can be cast to 'packedDtype' unchanged."""
+    if array.dtype.kind == 'u' and array.dtype.itemsize >= numpy.dtype(packedDtype).itemsize:
+        # unsigned values past the signed maximum would wrap around to negative numbers
+        return len(array) == 0 or array.max() <= numpy.iinfo(packedDtype).max
+    return True
+
+
+def _isPackable(list_):
+    """Determine whether every element of list_ has the same packable primitive type."""
+    firstType = type(list_[0])
+    if firstType not in _packedDtypeForType:
+        return False
+    return all(type(val) is firstType for val in list_)
+
+
 def isClassInstance(pyObject):
     return hasattr(pyObject, "__class__")
 
@@ -78,6 +103,17 @@ class _Unconvertible(object):
     pass
 
 
+class HomogenousNumpyList(object):
+    """Marks a 1-d numpy array that should be converted to a list of its elements.
+
+    Pure implementations (e.g. of numpy arrays) wrap their data in this rather
+    than calling 'tolist', which lets the walker send the data as a single packed
+    buffer without materializing a python object per element.
+    """
+    def __init__(self, array):
+        self.array = array
+
+
 class _FunctionDefinition(object):
     def __init__(self, sourceFileId, lineNumber, freeVariableMemberAccessChainsToId):
         self.sourceFileId = sourceFileId
@@ -204,6 +240,8 @@ class PyObjectWalker(object):
             self._walkPyObject(pyObject.result(), objectId)
         elif isinstance(pyObject, _FileDescription):
             self._registerFileDescription(objectId, pyObject)
+        elif isinstance(pyObject, HomogenousNumpyList):
+            self._registerHomogenousNumpyList(objectId, pyObject.array)
         elif isinstance(pyObject, Exception) and pyObject.__class__ in \
            NamedSingletons.pythonSingletonToName:
             self._registerBuiltinExceptionInstance(objectId, pyObject)
@@ -300,7 +338,12 @@ class PyObjectWalker(object):
         `_registerList`: register a `list` instance with `self.objectRegistry`.
         Recursively call `walkPyObject` on the values in the list.
         """
-        if all(isPrimitive(val) for val in list_):
+        if len(list_) >= MIN_LIST_LENGTH_TO_PACK and _isPackable(list_):
+            self._objectRegistry.definePackedHomogenousData(
+                objectId,
+                numpy.array(list_, dtype=_packedDtypeForType[type(list_[0])])
+                )
+        elif all(isPrimitive(val) for val in list_):
             self._registerPrimitive(objectId, list_)
         else:
             memberIds = [self.walkPyObject(val) for val in list_]
@@ -310,6 +353,20 @@ class PyObjectWalker(object):
                 memberIds=memberIds
                 )
 
+    def _registerHomogenousNumpyList(self, objectId, array):
+        """
+        `_registerHomogenousNumpyList`: register a 1-d numpy array as a list,
+        packing its data into a single buffer if pyfora has a matching primitive type.
+        """
+        packedDtype = _packedDtypeForNumpyKind.get(array.dtype.kind)
+        if packedDtype is None or not _fitsPackedDtype(array, packedDtype):
+            self._registerList(objectId, array.tolist())
+        else:
+            self._objectRegistry.definePackedHomogenousData(
+                objectId,
+                numpy.ascontiguousarray(array, dtype=packedDtype)
+                )
+
     def _registerPrimitive(self, objectId, primitive):
         """
         `_registerPrimitive`: register a primitive (defined by `isPrimitive`)
@@ -33,6 +33,14 @@ def sanitizeModulePath(pathToModule):
         res = res[:-1]
     return res
 
+def dtypeFromJson(dtypeAsJson):
+    """Invert PyforaToJsonTransformer.dtypeToJson: strings are simple dtypes, and
+    lists are the 'descr' of a structured dtype."""
+    if isinstance(dtypeAsJson, basestring):
+        return numpy.dtype(str(dtypeAsJson))
+    return numpy.dtype([tuple(str(x) if isinstance(x, basestring) else x for x in field)
+                        for field in dtypeAsJson])
+
 class PythonObjectRehydrator(object):
     """PythonObjectRehydrator - responsible for building local copies of objects
                                 produced by the server."""
@@ -93,7 +101,14 @@ class PythonObjectRehydrator(object):
                     targetDict[magicVar] = getattr(actualModule, magicVar)
 
 
-    def convertJsonResultToPythonObject(self, json):
+    def convertJsonResultToPythonObject(self, json, returnNumpyArrays=False):
+        """Convert the json representation of a result produced by the server to python.
+
+        json - the 'result' member of a PyforaResultAsJson response
+        returnNumpyArrays - if True, homogenous lists of numbers that were sent as a single
+            binary buffer are returned as read-only numpy arrays wrapping that buffer
+            rather than as python lists.
+        """
         root_id = json['root_id']
         definitions = json['obj_definitions']
         converted = {}
@@ -154,6 +169,25 @@ class PythonObjectRehydrator(object):
                     )
                 return data
 
+            if 'homogenousListBuffer' in objectDef:
+                data = numpy.frombuffer(
+                    base64.b64decode(objectDef['homogenousListBuffer']),
+                    dtype=dtypeFromJson(objectDef['dtype'])
+                    )
+                assert len(data) == objectDef['length']
+
+                if returnNumpyArrays and data.dtype.fields is None:
+                    return data
+
+                #we use the first element as a prototype when decoding
+                firstElement = convert(objectDef['firstElement'])
+
+                data = data.tolist()
+                assert isinstance(data[0], type(firstElement)), "%s of type %s is not %s" % (
+                    data[0], type(data[0]), type(firstElement)
+                    )
+                return data
+
             if 'builtinException' in objectDef:
                 builtinExceptionTypeName = objectDef['builtinException']
                 builtinExceptionType = NamedSingletons.singletonNameToObject[builtinExceptionTypeName]
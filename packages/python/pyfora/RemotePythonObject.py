@@ -44,6 +44,29 @@ class RemotePythonObject(object):
                type(self).__name__)
             )
 
+    def toLocalIter(self, chunkSize=100000, maxChunksInFlight=2):
+        """Downloads the remote object in pieces.
+
+        Lists, tuples and strings are paged by slices, dictionaries by ranges of
+        their keys, and dataframes and series by ``iloc`` slices. Any other object
+        is downloaded at once and yielded as a single piece.
+
+        Only ``maxChunksInFlight`` pieces are computed or downloaded ahead of the
+        consumer, so client memory is bounded by the chunk size rather than by the
+        size of the object.
+
+        Args:
+            chunkSize (int): the maximum number of elements (or rows, or keys) in
+                each piece.
+            maxChunksInFlight (int): how many pieces to request ahead of the one
+                being consumed.
+
+        Returns:
+            An iterator over the pieces of the object, in order. Each piece has the
+            same type as the object (e.g. a slice of a list is a list).
+        """
+        return self.executor._iterateRemoteObjectInChunks(self, chunkSize, maxChunksInFlight)
+
     def _pyforaComputedValueArg(self):
         """Argument to be passed to PyforaComputedValue to represent this object."""
         raise NotImplementedError()
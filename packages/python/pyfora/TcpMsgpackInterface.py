@@ -0,0 +1,258 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import json
+import logging
+import socket
+import threading
+import time
+
+import pyfora
+import pyfora.MsgpackFraming as MsgpackFraming
+from pyfora.SocketIoJsonInterface import ConnectionStatus
+
+
+class TcpMsgpackInterface(object):
+    """A drop-in replacement for SocketIoJsonInterface that talks to the BackendGateway
+    directly, using length-prefixed msgpack frames (see MsgpackFraming).
+
+    Messages are encoded by the calling thread before any lock is taken, and responses
+    are decoded on a dedicated reader thread, so concurrent requests only serialize on
+    the socket write itself.
+    """
+    def __init__(self,
+                 host,
+                 port,
+                 events=None,
+                 version=None):
+        self.host = host
+        self.port = port
+        self.events = events or {}
+        self.version = version or pyfora.__version__
+
+        self.sock = None
+        self.readerThread = None
+        self.nextMessageId = 0
+        self.messageHandlers = {}
+
+        #protects connection_status and messageHandlers
+        self.lock = threading.Lock()
+
+        #held while assigning a messageId and writing its frame, which must happen
+        #in messageId order
+        self.writeLock = threading.Lock()
+        self.connection_status = ConnectionStatus()
+
+
+    def connect(self, timeout=None):
+        timeout = timeout or 30.0
+        with self.lock:
+            if self._isConnected():
+                raise ValueError("'connect' called when already connected")
+            self.connection_status.status = ConnectionStatus.connecting
+
+        try:
+            self.sock = self._createSocket(timeout)
+            self.sock.sendall(
+                MsgpackFraming.frame(
+                    json.dumps({
+                        'requestType': 'SubscribableWebObjects',
+                        'encoding': MsgpackFraming.ENCODING,
+                        'version': self.version
+                        })
+                    )
+                )
+            handshake = MsgpackFraming.decode(self._readFrame())
+        except (socket.error, socket.timeout) as e:
+            self._closeSocket()
+            with self.lock:
+                self.connection_status.status = ConnectionStatus.disconnected
+            raise pyfora.ConnectionError("Connection failed: %s" % e)
+
+        if handshake != MsgpackFraming.HANDSHAKE_OK:
+            self._closeSocket()
+            with self.lock:
+                self.connection_status.status = ConnectionStatus.disconnected
+                self.connection_status.message = handshake
+            raise pyfora.ConnectionError(handshake)
+
+        self.sock.settimeout(None)
+
+        with self.lock:
+            self.connection_status.status = ConnectionStatus.connected
+            self.readerThread = threading.Thread(target=self._readerThreadLoop)
+            self.readerThread.daemon = True
+            self.readerThread.start()
+
+        return self
+
+
+    def close(self):
+        with self.lock:
+            if not self._isConnected():
+                return
+            readerThread = self.readerThread
+            self.readerThread = None
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+        if readerThread is not None:
+            readerThread.join()
+
+
+    def isConnected(self):
+        with self.lock:
+            return self._isConnected()
+
+
+    def send(self, message, callback):
+        encodedBody = MsgpackFraming.encode(message)
+
+        with self.writeLock:
+            with self.lock:
+                self._raiseIfNotConnected()
+                messageId = self.nextMessageId
+                self.nextMessageId += 1
+                self.messageHandlers[messageId] = callback
+
+            message['messageId'] = messageId
+            try:
+                self.sock.sendall(
+                    MsgpackFraming.frame(MsgpackFraming.encodeRequest(messageId, encodedBody))
+                    )
+            except socket.error:
+                #the reader thread sees the same failure and fails all pending messages
+                logging.warn("Failed to send message %s to the gateway", messageId)
+
+
+    def on(self, event, callback):
+        if event in self.events:
+            raise ValueError("Event handler for '%s' already exists" % event)
+        self.events[event] = callback
+
+
+    def _createSocket(self, timeout):
+        t0 = time.time()
+        while True:
+            try:
+                sock = socket.create_connection((self.host, self.port), timeout)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                return sock
+            except socket.error:
+                if time.time() - t0 > timeout:
+                    raise
+                time.sleep(0.5)
+
+
+    def _closeSocket(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except socket.error:
+                pass
+
+
+    def _recvExactly(self, size):
+        chunks = []
+        remaining = size
+        while remaining > 0:
+            chunk = self.sock.recv(min(remaining, 1024 * 1024))
+            if not chunk:
+                raise socket.error("Connection closed by the gateway")
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return ''.join(chunks)
+
+
+    def _readFrame(self):
+        size = MsgpackFraming.frameHeader.unpack(
+            self._recvExactly(MsgpackFraming.frameHeader.size)
+            )[0]
+        return self._recvExactly(size)
+
+
+    def _readerThreadLoop(self):
+        try:
+            while True:
+                self._on_message(self._readFrame())
+        except socket.error:
+            pass
+        finally:
+            self._closeSocket()
+            self._on_disconnect()
+
+
+    def _isConnected(self):
+        return self.connection_status.status in [ConnectionStatus.connecting,
+                                                 ConnectionStatus.connected]
+
+
+    def _raiseIfNotConnected(self):
+        if not self._isConnected():
+            raise ValueError('Performing I/O on disconnected socket')
+
+
+    def _triggerEvent(self, event, *args, **kwargs):
+        if event in self.events:
+            self.events[event](*args, **kwargs)
+
+
+    def _on_message(self, payload):
+        try:
+            message = MsgpackFraming.decode(payload)
+        except:
+            self._triggerEvent('invalid_message', payload)
+            return
+
+        messageId = message.get('messageId')
+        if messageId is None:
+            self._triggerEvent('special_message', message)
+            return
+
+        with self.lock:
+            callback = self.messageHandlers.get(messageId)
+            if callback is not None and message.get('responseType') != 'SubscribeResponse':
+                del self.messageHandlers[messageId]
+
+        if callback is None:
+            self._triggerEvent('unexpected_message', message)
+            return
+
+        callback(message)
+
+
+    def _on_disconnect(self):
+        callbacks = []
+        with self.lock:
+            self.connection_status.status = ConnectionStatus.disconnected
+
+            # respond to all pending messages with a failure
+            callbacks = [
+                (cb, self._disconnect_failure_message(messageId))
+                for messageId, cb in self.messageHandlers.iteritems()
+                ]
+            self.messageHandlers.clear()
+
+        self._triggerEvent('disconnect')
+
+        for callback, message in callbacks:
+            callback(message)
+
+    def _disconnect_failure_message(self, messageId):
+        return {
+            "messageId": messageId,
+            "responseType": "Failure",
+            "message": "Disconnected from server"
+            }
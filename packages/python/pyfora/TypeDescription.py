@@ -14,6 +14,8 @@
 
 
 import collections
+import cPickle
+import hashlib
 
 
 
@@ -46,6 +48,45 @@ def serialize(object_definition):
     return object_definition._asdict()
 
 
+#definitions smaller than these thresholds are cheaper to resend than to look up by hash
+MIN_LIST_LENGTH_TO_CACHE_BY_CONTENT = 100
+MIN_STRING_LENGTH_TO_CACHE_BY_CONTENT = 1024
+
+
+def contentHash(serializedDefinition):
+    """Return a hash of the content of a serialized definition, or None.
+
+    Only definitions without dependencies on other objectIds (files and large primitives)
+    are hashed, since their content completely determines the converted value. Callers
+    use the hash to avoid resending a definition the server has already seen.
+    """
+    if isinstance(serializedDefinition, list):
+        if len(serializedDefinition) < MIN_LIST_LENGTH_TO_CACHE_BY_CONTENT:
+            return None
+        return hashlib.sha1(
+            "list:" + cPickle.dumps(serializedDefinition, cPickle.HIGHEST_PROTOCOL)
+            ).hexdigest()
+
+    if isinstance(serializedDefinition, str):
+        if len(serializedDefinition) < MIN_STRING_LENGTH_TO_CACHE_BY_CONTENT:
+            return None
+        return hashlib.sha1("str:" + serializedDefinition).hexdigest()
+
+    if isinstance(serializedDefinition, collections.Mapping) and \
+            serializedDefinition.get('typeName') == 'File':
+        return hashlib.sha1(
+            "file:%s:%s" % (serializedDefinition['path'], serializedDefinition['text'])
+            ).hexdigest()
+
+    if isinstance(serializedDefinition, collections.Mapping) and \
+            serializedDefinition.get('typeName') == 'PackedHomogenousData':
+        return hashlib.sha1(
+            "packed:%s:%s" % (serializedDefinition['dtype'], serializedDefinition['dataAsBytes'])
+            ).hexdigest()
+
+    return None
+
+
 def deserialize(value):
     if isPrimitive(value) or isinstance(value, list):
         return value
@@ -70,6 +111,14 @@ File = type_description(
     'File',
     'path, text'
     )
+
+# PackedHomogenousData: a list of ints, floats or bools packed into a single buffer
+#  dtype: the numpy dtype string of the elements ('<i8', '<f8' or '|b1')
+#  dataAsBytes: the base64 encoded little-endian element data
+PackedHomogenousData = type_description(
+    'PackedHomogenousData',
+    'dtype, dataAsBytes'
+    )
 FunctionDefinition = type_description(
     'FunctionDefinition',
     'sourceFileId, lineNumber, freeVariableMemberAccessChainsToId'
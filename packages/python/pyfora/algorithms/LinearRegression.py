@@ -73,55 +73,16 @@ def _computeXTX(df, start=0, end=None, splitLimit=_splitLimit, fitIntercept=True
 
     numRows = end - start
     if numRows <= splitLimit:
-        numColumns = df.shape[1]
+        columns = [df.iloc[start:end, col].tolist() for col in xrange(df.shape[1])]
 
         if fitIntercept:
-            numColumns = numColumns + 1
+            columns = columns + [[1.0 for _ in xrange(numRows)]]
 
-        def unsymmetrizedElementAt(row, col):
-            """Fills out 'half' of the symmetric matrix XTX, filling in
-            zeros above the main diagonal, to avoid computing dot products
-            twice
+        # rows of XT are the columns of X, so XT.dot(X) is a single matrix
+        # product, which numpy.dot splits into tiles along every dimension
+        XT = numpy.array(columns)
 
-            the full symmetric matrix XTX is filled out by reading the
-            lower diagonal of this matrix.
-            """
-            if col < row:
-                return 0.0
-
-            if fitIntercept:
-                if row == numColumns - 1 and col == numColumns - 1:
-                    return float(numRows)
-
-                if row == numColumns - 1:
-                    return _loopSum(df.iloc[start:end, col])
-
-                if  col == numColumns - 1:
-                    return _loopSum(df.iloc[start:end, row])
-
-            right = df.iloc[start:end, col]
-            left = df.iloc[start:end, row]
-
-            return _dotDontCheckLengths(right, left)
-
-        unsymmetrizedValues = [
-            [unsymmetrizedElementAt(row, col) for col in xrange(numColumns)] \
-            for row in xrange(numColumns)
-            ]
-
-        symmetrizedValues = []
-        for row in xrange(numColumns):
-            for col in xrange(numColumns):
-                if row <= col:
-                    symmetrizedValues = symmetrizedValues + \
-                        [unsymmetrizedValues[row][col]]
-                else:
-                    symmetrizedValues = symmetrizedValues + \
-                        [unsymmetrizedValues[col][row]]
-
-        tr = numpy.array(symmetrizedValues)
-
-        return tr.reshape((numColumns, numColumns))
+        return numpy.dot(XT, XT.T)
 
     mid = (start + end) / 2
 
@@ -34,13 +34,25 @@ class AdditiveRegressionTree:
 
     def predict(self, x, nEstimators=None):
         if isinstance(x, PurePandas.PurePythonDataFrame):
-            return x.apply(
-                lambda row: self._predictionFunction(row, nEstimators),
-                1
+            return PurePandas.PurePythonSeries(
+                self._predictDataframe(x, nEstimators)
                 )
         else:
             return self._predictionFunction(x, nEstimators)
 
+    def _predictDataframe(self, df, nEstimators=None):
+        if nEstimators is None:
+            nEstimators = len(self.trees)
+
+        treePredictions = [
+            tree._predictDataframe(df) for tree in self.trees[:nEstimators]
+            ]
+
+        return [
+            sum(predictions[ix] for predictions in treePredictions) \
+            for ix in xrange(len(df))
+            ]
+
     def _predictionFunction(self, row, nEstimators=None):
         if nEstimators is None:
             nEstimators = len(self.trees)
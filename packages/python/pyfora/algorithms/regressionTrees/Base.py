@@ -152,6 +152,128 @@ class SampleSummaryHistogram:
             )
 
 
+class FeatureBins:
+    """Quantile bins for some columns of a dataframe.
+
+    Each value x of a binned column is replaced by the small integer code
+    "number of split points of that column which are <= x", so the best
+    split of a node can be read off a histogram over codes (see
+    :class:`CodeHistogram`) instead of being found by scanning rows.
+
+    Attributes:
+        dimensions: the dataframe column index of each binned feature.
+        splitPoints: for each feature, its distinct ascending split points.
+        codes: for each feature, the bin code of every row.
+    """
+    def __init__(self, dimensions, splitPoints, codes):
+        self.dimensions = dimensions
+        self.splitPoints = splitPoints
+        self.codes = codes
+
+    @staticmethod
+    def fromDataframe(df, dimensions, numBins, sampleSize=100000):
+        splitPoints = [
+            _quantileSplitPoints(df.iloc[:, dim], numBins, sampleSize) \
+            for dim in dimensions
+            ]
+
+        codes = [
+            _binCodes(df.iloc[:, dimensions[featureIx]], splitPoints[featureIx]) \
+            for featureIx in xrange(len(dimensions))
+            ]
+
+        return FeatureBins(dimensions, splitPoints, codes)
+
+    def numFeatures(self):
+        return len(self.dimensions)
+
+    def numBins(self, featureIx):
+        return len(self.splitPoints[featureIx]) + 1
+
+
+def _quantileSplitPoints(column, numBins, sampleSize):
+    sz = len(column)
+    stride = max(sz / sampleSize, 1)
+    sample = sorted([column[ix] for ix in xrange(0, sz, stride)])
+
+    if len(sample) == 0:
+        return []
+
+    candidates = [
+        sample[(binIx * len(sample)) / numBins] for binIx in xrange(1, numBins)
+        ]
+
+    # drop duplicates, and split points which would leave the first bin empty
+    return [
+        candidates[ix] for ix in xrange(len(candidates)) \
+        if candidates[ix] > sample[0] and (ix == 0 or candidates[ix] != candidates[ix - 1])
+        ]
+
+
+def _binCodes(column, splitPoints):
+    return [_binIndex(splitPoints, column[ix]) for ix in xrange(len(column))]
+
+
+def _binIndex(splitPoints, x):
+    low = 0
+    high = len(splitPoints)
+    while low < high:
+        mid = (low + high) / 2
+        if splitPoints[mid] <= x:
+            low = mid + 1
+        else:
+            high = mid
+
+    return low
+
+
+class CodeHistogram:
+    """`SampleSummary`s of y-values, bucketed by the bin code of one feature.
+
+    Histograms are additive, and the histogram of a node minus the histogram
+    of one of its children is the histogram of the other child.
+    """
+    def __init__(self, samples):
+        self.samples = samples
+
+    def __add__(self, other):
+        return CodeHistogram(
+            [self.samples[ix] + other.samples[ix] for ix in xrange(len(self.samples))]
+            )
+
+    def __sub__(self, other):
+        return CodeHistogram(
+            [self.samples[ix] - other.samples[ix] for ix in xrange(len(self.samples))]
+            )
+
+    def bestSplitBinAndImpurityImprovement(self):
+        """Returns (binIx, impurityImprovement) for the best split which sends
+        the bins <= binIx to the left."""
+        above = SampleSummary()
+        for sample in self.samples:
+            above = above + sample
+        below = SampleSummary()
+
+        bestIx = 0
+        bestImpurityImprovement = -float("inf")
+
+        curIx = 0
+        while curIx + 1 < len(self.samples):
+            above = above - self.samples[curIx]
+            below = below + self.samples[curIx]
+
+            impurityImprovement = SampleSummary.impurityImprovement(
+                above, below)
+
+            if impurityImprovement > bestImpurityImprovement:
+                bestImpurityImprovement = impurityImprovement
+                bestIx = curIx
+
+            curIx = curIx + 1
+
+        return bestIx, bestImpurityImprovement
+
+
 class _MutableVector:
     def __init__(self, count, defaultValue):
         self.samples = __inline_fora(
@@ -272,9 +394,10 @@ class ImpurityPair:
 
 
 class TreeBuilderArgs:
-    def __init__(self, minSamplesSplit, maxDepth, numBuckets):
+    def __init__(self, minSamplesSplit, maxDepth, numBuckets, numBins=None):
         self.minSamplesSplit = minSamplesSplit
         self.maxDepth = maxDepth
         self.numBuckets = numBuckets
+        self.numBins = numBins
 
 
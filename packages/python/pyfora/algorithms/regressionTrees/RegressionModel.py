@@ -33,7 +33,8 @@ class RegressionModel:
             yAsSeries,
             loss,
             regressionTreeBuilder,
-            learningRate
+            learningRate,
+            featureBins=None
             ):
         self.additiveRegressionTree = additiveRegressionTree
         self.X = X
@@ -43,6 +44,9 @@ class RegressionModel:
         self.regressionTreeBuilder = regressionTreeBuilder
         self.learningRate = learningRate
 
+        # the binned predictors, if regressionTreeBuilder fits binned trees
+        self.featureBins = featureBins
+
     def score(self, X, yTrue):
         """
         Return the coefficient of determination (R\ :sup:`2`\ ) of the prediction.
@@ -112,7 +116,8 @@ class RegressionModel:
         baseModelBuilder = RegressionTree.RegressionTreeBuilder(
             treeBuilderArgs.maxDepth,
             treeBuilderArgs.minSamplesSplit,
-            treeBuilderArgs.numBuckets
+            treeBuilderArgs.numBuckets,
+            numBins=treeBuilderArgs.numBins
             )
 
         if loss.needsOriginalYValues:
@@ -125,7 +130,8 @@ class RegressionModel:
             yAsSeries,
             loss,
             baseModelBuilder,
-            learningRate
+            learningRate,
+            baseModelBuilder.binFeatures(X, XDimensions)
             )
 
     def boost(self, predictions, pseudoResiduals):
@@ -143,7 +149,8 @@ class RegressionModel:
             None,
             self.XDimensions,
             self.loss.leafValueFun(self.learningRate),
-            None)
+            None,
+            self.featureBins)
 
         return RegressionModel(
             self.additiveRegressionTree + nextRegressionTree,
@@ -152,7 +159,8 @@ class RegressionModel:
             self.yAsSeries,
             self.loss,
             self.regressionTreeBuilder,
-            self.learningRate)
+            self.learningRate,
+            self.featureBins)
 
     def featureImportances(self):
         raise NotImplementedError()
@@ -17,6 +17,10 @@ import pyfora.pure_modules.pure_pandas as PurePandas
 import Base
 
 
+# DataFrames are predicted in blocks of at most this many rows, in parallel
+_predictionBlockSize = 100000
+
+
 class RegressionTree:
     """A class representing a regression tree.
 
@@ -63,13 +67,56 @@ class RegressionTree:
 
         """
         if isinstance(x, PurePandas.PurePythonDataFrame):
-            return x.apply(
-                lambda row: self._predictionFunction(row, depth),
-                1
-                )
+            return PurePandas.PurePythonSeries(self._predictDataframe(x, depth))
         else:
             return self._predictionFunction(x, depth)
 
+    def _predictDataframe(self, df, depth=None):
+        """Returns a list of the predictions for each row of ``df``.
+
+        Rather than walking the rules once per row, each block of rows is
+        routed through the tree together: at a split, the block is
+        partitioned with one pass over the rule's column.
+        """
+        if depth is None:
+            depth = 1000000
+
+        columns = [df.iloc[:, colIx] for colIx in xrange(df.shape[1])]
+
+        return self._predictRowRange(columns, depth, 0, len(df))
+
+    def _predictRowRange(self, columns, depth, low, high):
+        if high - low <= _predictionBlockSize:
+            return self._predictOnIndices(columns, depth, 0, range(low, high))
+
+        mid = (low + high) / 2
+        return self._predictRowRange(columns, depth, low, mid) + \
+            self._predictRowRange(columns, depth, mid, high)
+
+    def _predictOnIndices(self, columns, depth, ruleIx, indices):
+        rule = self.rules[ruleIx]
+        if not isinstance(rule, Base.SplitRule) or depth == 0:
+            return [rule.leafValue for _ in indices]
+
+        column = columns[rule.rule.dimension]
+        splitPoint = rule.rule.splitPoint
+        goesLeft = [column[ix] < splitPoint for ix in indices]
+
+        leftIndices = [indices[ix] for ix in xrange(len(indices)) if goesLeft[ix]]
+        rightIndices = [indices[ix] for ix in xrange(len(indices)) if not goesLeft[ix]]
+
+        leftValues = []
+        if len(leftIndices) > 0:
+            leftValues = self._predictOnIndices(
+                columns, depth - 1, ruleIx + rule.jumpIfLess, leftIndices)
+
+        rightValues = []
+        if len(rightIndices) > 0:
+            rightValues = self._predictOnIndices(
+                columns, depth - 1, ruleIx + rule.jumpIfHigher, rightIndices)
+
+        return _interleave(goesLeft, leftValues, rightValues)
+
     def _predictionFunction(self, row, depth=None):
         if depth is None:
             depth = 1000000
@@ -86,6 +133,7 @@ class RegressionTree:
                     ix = ix + rule.jumpIfLess
                 else:
                     ix = ix + rule.jumpIfHigher
+                currentDepth = currentDepth + 1
             else: # rule must be a leaf value
                 return rule.leafValue
 
@@ -155,6 +203,10 @@ class RegressionTreeBuilder:
             column splits.
         minSplitThresh (int): an "internal" argument, not generally of interest to
             casual users, giving the splitting rule in ``computeBucketedSampleSummaries``.
+        numBins (int): If given, each predictor is binned once into at most
+            ``numBins`` quantile bins, and splits are found from per-node
+            histograms of the bin codes instead of by bucketing each node's
+            rows. ``numBuckets`` is then unused.
 
     Returns:
         A :class:`~pyfora.algorithms.regressionTrees.RegressionTree.RegressionTree`
@@ -175,13 +227,15 @@ class RegressionTreeBuilder:
             maxDepth,
             minSamplesSplit=2,
             numBuckets=10000,
-            minSplitThresh=1000000
+            minSplitThresh=1000000,
+            numBins=None
             ):
         self.maxDepth = maxDepth
         self.impurityMeasure = Base.SampleSummary
         self.minSamplesSplit = minSamplesSplit
         self.minSplitThresh = minSplitThresh
         self.numBuckets = numBuckets
+        self.numBins = numBins
 
     @staticmethod
     def samplesummary(xVec):
@@ -290,7 +344,8 @@ class RegressionTreeBuilder:
              maxDepth=None,
              xDimensions=None,
              leafValueFun=None,
-             activeIndices=None):
+             activeIndices=None,
+             featureBins=None):
         if maxDepth is None:
             maxDepth = self.maxDepth
 
@@ -303,6 +358,13 @@ class RegressionTreeBuilder:
         if activeIndices is None:
             activeIndices = range(len(df))
 
+        if self.numBins is not None:
+            if featureBins is None:
+                featureBins = self.binFeatures(df, xDimensions)
+
+            return self.fitBinned_(
+                df, yDim, maxDepth, featureBins, leafValueFun, activeIndices)
+
         if len(activeIndices) < self.minSamplesSplit or maxDepth == 0:
             leafValue = leafValueFun(df, activeIndices)
             return RegressionTree(
@@ -338,23 +400,183 @@ class RegressionTreeBuilder:
             rightIndices
             )
 
+        return RegressionTreeBuilder.joinSubtrees(
+            bestRule,
+            treeLeft,
+            treeRight,
+            len(leftIndices),
+            len(rightIndices),
+            len(xDimensions)
+            )
+
+    @staticmethod
+    def joinSubtrees(rule, treeLeft, treeRight, numLeft, numRight, numDimensions):
         treeLeft = treeLeft.rules
         treeRight = treeRight.rules
 
-        leafValue = (len(leftIndices) * treeLeft[0].leafValue + \
-                     len(rightIndices) * treeRight[0].leafValue) / \
-            (len(leftIndices) + len(rightIndices))
+        leafValue = (numLeft * treeLeft[0].leafValue + \
+                     numRight * treeRight[0].leafValue) / \
+            (numLeft + numRight)
 
         return RegressionTree(
             [Base.SplitRule(
-                bestRule,
+                rule,
                 1,
                 1 + len(treeLeft),
                 leafValue
                 )] + treeLeft + treeRight,
-            len(xDimensions)
+            numDimensions
             )
 
+    def binFeatures(self, df, xDimensions):
+        """Returns the :class:`~pyfora.algorithms.regressionTrees.Base.FeatureBins`
+        used to fit trees on columns ``xDimensions`` of ``df``, or None if this
+        builder doesn't bin features.
+
+        Binning only depends on the predictors, so callers which fit many trees
+        to the same predictors (such as gradient boosting) should compute it once
+        and pass it to ``fit_``.
+        """
+        if self.numBins is None:
+            return None
+
+        return Base.FeatureBins.fromDataframe(df, xDimensions, self.numBins)
+
+    def fitBinned_(self,
+                   df,
+                   yDim,
+                   maxDepth,
+                   featureBins,
+                   leafValueFun,
+                   activeIndices,
+                   histograms=None):
+        numDimensions = featureBins.numFeatures()
+
+        if len(activeIndices) < self.minSamplesSplit or maxDepth == 0:
+            return RegressionTree(
+                [RegressionLeafRule(
+                    leafValueFun(df, activeIndices)
+                    )],
+                numDimensions
+                )
+
+        if histograms is None:
+            histograms = self.computeCodeHistograms(
+                featureBins, df.iloc[:, yDim], activeIndices)
+
+        splits = [
+            histograms[featureIx].bestSplitBinAndImpurityImprovement() \
+            for featureIx in xrange(numDimensions)
+            ]
+        bestFeatureIx = argmax([split[1] for split in splits])
+        bestBinIx, impurityImprovement = splits[bestFeatureIx]
+
+        codes = featureBins.codes[bestFeatureIx]
+        leftIndices = [ix for ix in activeIndices if codes[ix] <= bestBinIx]
+        rightIndices = [ix for ix in activeIndices if codes[ix] > bestBinIx]
+
+        if len(leftIndices) == 0 or len(rightIndices) == 0:
+            return RegressionTree(
+                [RegressionLeafRule(
+                    leafValueFun(df, activeIndices)
+                    )],
+                numDimensions
+                )
+
+        bestRule = Base.Rule(
+            featureBins.dimensions[bestFeatureIx],
+            featureBins.splitPoints[bestFeatureIx][bestBinIx],
+            impurityImprovement,
+            len(activeIndices)
+            )
+
+        # only scan the rows of the smaller child: the larger child's
+        # histograms are the parent's minus the smaller child's
+        nextDepth = maxDepth - 1
+        if nextDepth == 0:
+            leftHistograms = None
+            rightHistograms = None
+        elif len(leftIndices) <= len(rightIndices):
+            leftHistograms = self.computeCodeHistograms(
+                featureBins, df.iloc[:, yDim], leftIndices)
+            rightHistograms = [
+                histograms[featureIx] - leftHistograms[featureIx] \
+                for featureIx in xrange(numDimensions)
+                ]
+        else:
+            rightHistograms = self.computeCodeHistograms(
+                featureBins, df.iloc[:, yDim], rightIndices)
+            leftHistograms = [
+                histograms[featureIx] - rightHistograms[featureIx] \
+                for featureIx in xrange(numDimensions)
+                ]
+
+        treeLeft = self.fitBinned_(
+            df, yDim, nextDepth,
+            featureBins,
+            leafValueFun,
+            leftIndices,
+            leftHistograms
+            )
+        treeRight = self.fitBinned_(
+            df, yDim, nextDepth,
+            featureBins,
+            leafValueFun,
+            rightIndices,
+            rightHistograms
+            )
+
+        return RegressionTreeBuilder.joinSubtrees(
+            bestRule,
+            treeLeft,
+            treeRight,
+            len(leftIndices),
+            len(rightIndices),
+            numDimensions
+            )
+
+    def computeCodeHistograms(
+            self, featureBins, yCol, activeIndices, low=0, high=None):
+        """Returns a :class:`~pyfora.algorithms.regressionTrees.Base.CodeHistogram`
+        of ``yCol`` over the rows ``activeIndices`` for each binned feature."""
+        if high is None:
+            high = len(activeIndices)
+
+        if high - low < self.minSplitThresh:
+            histograms = [
+                Base._MutableVector(
+                    featureBins.numBins(featureIx),
+                    Base.SampleSummary()
+                    ) \
+                for featureIx in xrange(featureBins.numFeatures())
+                ]
+
+            for ix in xrange(low, high):
+                rowIx = activeIndices[ix]
+                sample = Base.SampleSummary(yCol[rowIx])
+                for featureIx in xrange(len(histograms)):
+                    histograms[featureIx].augmentItem(
+                        featureBins.codes[featureIx][rowIx],
+                        sample
+                        )
+
+            return [
+                Base.CodeHistogram([s for s in histogram]) \
+                for histogram in histograms
+                ]
+
+        mid = (low + high) / 2
+
+        leftHistograms = self.computeCodeHistograms(
+            featureBins, yCol, activeIndices, low, mid)
+        rightHistograms = self.computeCodeHistograms(
+            featureBins, yCol, activeIndices, mid, high)
+
+        return [
+            leftHistograms[featureIx] + rightHistograms[featureIx] \
+            for featureIx in xrange(len(leftHistograms))
+            ]
+
     @staticmethod
     def defaultLeafValueFun(yDim):
         def tr(values, activeIndices):
@@ -414,3 +636,20 @@ def argmax(vec):
             curMaxIx = ix
 
     return curMaxIx
+
+
+def _interleave(goesLeft, leftValues, rightValues):
+    """Merge ``leftValues`` and ``rightValues`` back into the order given by
+    the flags ``goesLeft``."""
+    tr = []
+    leftIx = 0
+    rightIx = 0
+    for isLeft in goesLeft:
+        if isLeft:
+            tr = tr + [leftValues[leftIx]]
+            leftIx = leftIx + 1
+        else:
+            tr = tr + [rightValues[rightIx]]
+            rightIx = rightIx + 1
+
+    return tr
@@ -15,7 +15,7 @@
 import pyfora.pure_modules.pure_pandas as PurePandas
 
 
-def read_csv_from_string(data):
+def read_csv_from_string(data, inferColumnTypes=False):
     """
     Reads a string in CSV format into a DataFrame. This function is similar to
     :func:`pandas.read_csv` but it takes a string as input instead of a file.
@@ -23,48 +23,36 @@ def read_csv_from_string(data):
     This function is intended to be used in pyfora code that runs
     remotely in a pyfora cluster.
 
+    ``data`` may also be a dataset returned by
+    :func:`~pyfora.Executor.Executor.importS3Dataset` or
+    :func:`~pyfora.Executor.Executor.importRemoteFile`, in which case it is
+    parsed in parallel byte ranges directly from the dataset, without first
+    being copied into a single string.
+
 
     Args:
         data (str): a string of comma-separated values
+        inferColumnTypes (bool): if True, the type of each column (int, float,
+            bool or str) is inferred from the first megabyte of ``data``.
+            Otherwise every column is parsed as float.
 
     Returns:
         A :class:`pandas.DataFrame` that holds the parsed data.
 
 
     Note:
-        This function currently assumes that all values are of type float (or floatifiable),
-        and that the first row contains column headers. This limitation will be
-        removed in the near future.
+        This function assumes that the first row contains column headers.
+        When ``inferColumnTypes`` is False, it also assumes that all values are
+        of type float (or floatifiable). When it is True, values further into
+        the data must still match the types inferred from its start.
     """
     listOfColumns, columnNames = \
         __inline_fora(
-            """fun(@unnamed_args:(data), *args) {
-                   let df = try {
-                       parsing.csv(
-                           data.@m,
-                           defaultColumnType: { PyFloat(Float64(_)) }
-                           );
-                       } catch (e) {
-                       throw Exception(PyString(String(e)))
-                       }
-
-                   let listOfColumns = PyList(
-                       df.columns.apply(
-                           fun(series) {
-                               PyList(series.dataVec)
-                               }
-                           )
-                       );
-
-                  let columnNames = PyList(
-                      df.columnNames ~~ { PyString(_) }
-                      )
-
-                  return PyTuple((listOfColumns, columnNames))
-                  }"""
-            )(data)
+            """fun(@unnamed_args:(data, inferColumnTypes), *args) {
+                   purePython.csvModule.readCsv(data.@m, inferColumnTypes.@m)
+                   }"""
+            )(data, inferColumnTypes)
 
     return PurePandas.PurePythonDataFrame(
         listOfColumns, columnNames
         )
-
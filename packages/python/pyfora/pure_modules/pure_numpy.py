@@ -14,6 +14,7 @@
 
 
 from pyfora.PureImplementationMapping import PureImplementationMapping, pureMapping
+from pyfora.PyObjectWalker import HomogenousNumpyList
 import pyfora.pure_modules.pure_math as PureMath
 from pyfora.pure_modules.pure___builtin__ import Round
 
@@ -21,53 +22,191 @@ import math
 import numpy as np
 
 
-class PurePythonNumpyArray(object):
-    """
-    This is this pyfora wrapper and implementation of the numpy array class
-    Internally, the array is stored as a list of values and a tuple of the
-    array dimensions. Currently, the values block is interpreted in a
-    *row major* fashion.
-    """
-    def __init__(self, shape, values):
-        self.shape = shape
-        self.values = values
+#arrays are split into blocks of this many elements when computing cumulative sums
+CUMSUM_BLOCK_SIZE = 10000
 
-    def transpose(self):
-        if len(self.shape) == 1:
-            return self
+#matrix products whose operands and result together hold at most this many elements
+#are computed with a single native multiply. Larger ones are split into tiles that
+#are, so that no single multiply has to hold more than about 512MB of floats.
+MATMUL_MAX_UNTILED_ELEMENTS = 2 ** 26
 
-        if len(self.shape) == 2:
-            newVals = []
+#indexing copies the elements of a view into a list of its own once the view holds
+#fewer than 1 / VIEW_COMPACTION_RATIO of the values it refers to, so that small views
+#don't keep the whole parent array alive (or get downloaded along with it)
+VIEW_COMPACTION_RATIO = 4
 
-            d1 = self.shape[0]
-            d2 = self.shape[1]
 
-            newVals = [self[ix1][ix2] for ix2 in xrange(d2) for ix1 in xrange(d1)]
+def _product(values):
+    return reduce(lambda x, y: x * y, values, 1)
 
-            newShape = (d2, d1)
 
-            return PurePythonNumpyArray(
-                newShape,
-                newVals
-                )
+def _rowMajorStrides(shape):
+    strides = []
+    stride = 1
+    ix = len(shape) - 1
+    while ix >= 0:
+        strides = [stride] + strides
+        stride = stride * shape[ix]
+        ix = ix - 1
+    return tuple(strides)
+
 
-        if len(self.shape) == 3:
-            newVals = []
+def _normalizeSlice(s, length):
+    """Returns (start, step, count) for the indices of range(length) selected by slice 's'."""
+    step = 1 if s.step is None else s.step
+    if step == 0:
+        raise ValueError("slice step cannot be zero")
 
-            d1 = self.shape[0]
-            d2 = self.shape[1]
-            d3 = self.shape[2]
+    if step > 0:
+        lower = 0
+        upper = length
+    else:
+        lower = -1
+        upper = length - 1
+
+    def clip(bound, default):
+        if bound is None:
+            return default
+        if bound < 0:
+            bound = bound + length
+            if bound < lower:
+                return lower
+            return bound
+        if bound > upper:
+            return upper
+        return bound
+
+    if step > 0:
+        start = clip(s.start, lower)
+        stop = clip(s.stop, upper)
+        count = (stop - start + step - 1) / step
+    else:
+        start = clip(s.start, upper)
+        stop = clip(s.stop, lower)
+        count = (start - stop - step - 1) / (-step)
 
-            newVals = [self[ix1][ix2][ix3] for ix3 in xrange(d3) for ix2 in xrange(d2) for ix1 in xrange(d1)]
+    if count < 0:
+        count = 0
 
-            newShape = (d3, d2, d1)
+    return start, step, count
 
-            return PurePythonNumpyArray(
-                newShape,
-                newVals
-                )
 
-        raise NotImplementedError("Not implemented for dim > 3")
+def _sumKernel(values):
+    # 'sum' splits the list and reduces the pieces in parallel
+    return sum(values)
+
+
+def _maxKernel(values):
+    if len(values) == 0:
+        raise ValueError("zero-size array to reduction operation maximum which has no identity")
+    return reduce(lambda x, y: y if y > x else x, values)
+
+
+def _argmaxKernel(values):
+    if len(values) == 0:
+        raise ValueError("attempt to get argmax of an empty sequence")
+    # the reduction keeps the order of the indices, so ties resolve to the first index
+    return reduce(lambda i, j: j if values[j] > values[i] else i, xrange(len(values)))
+
+
+def _meanKernel(values):
+    if len(values) == 0:
+        # like numpy, the mean of nothing is nan rather than an error
+        return np.nan
+    return _sumKernel(values) / float(len(values))
+
+
+def _runningSum(values, start):
+    tr = []
+    total = start
+    for val in values:
+        total = total + val
+        tr = tr + [total]
+    return tr
+
+
+def _cumsumKernel(values):
+    # block totals are independent, so only the short list of block offsets
+    # and the running sums within each block are sequential
+    blockCount = (len(values) + CUMSUM_BLOCK_SIZE - 1) / CUMSUM_BLOCK_SIZE
+    blocks = [
+        values[ix * CUMSUM_BLOCK_SIZE:(ix + 1) * CUMSUM_BLOCK_SIZE]
+        for ix in xrange(blockCount)
+        ]
+    blockStarts = _runningSum([0] + [_sumKernel(block) for block in blocks[:-1]], 0)
+
+    return [
+        val
+        for ix in xrange(blockCount)
+        for val in _runningSum(blocks[ix], blockStarts[ix])
+        ]
+
+
+class PurePythonNumpyArray(object):
+    """
+    This is this pyfora wrapper and implementation of the numpy array class
+    Internally, the array is a strided view onto a flat list of values:
+    the element at index (i_0, ..., i_n) is
+
+        values[offset + i_0 * strides[0] + ... + i_n * strides[n]]
+
+    A 'strides' of None means the *row major* layout of 'shape', starting at
+    'offset'. Transposes, slices and reshapes of row major arrays return views
+    onto the same list of values rather than copying it.
+    """
+    def __init__(self, shape, values, offset=0, strides=None):
+        self.shape = shape
+        self.values = values
+        self.offset = offset
+        self.strides = strides
+
+    def _effectiveStrides(self):
+        if self.strides is None:
+            return _rowMajorStrides(self.shape)
+        return self.strides
+
+    def _isRowMajor(self):
+        return self.strides is None or self.strides == _rowMajorStrides(self.shape)
+
+    def _contiguousValues(self):
+        """Returns the elements of the array as a list, in row major order."""
+        if self._isRowMajor():
+            if self.offset == 0 and len(self.values) == self.size:
+                return self.values
+            return self.values[self.offset:self.offset + self.size]
+
+        indices = [self.offset]
+        strides = self.strides
+        for dim in xrange(len(self.shape)):
+            stride = strides[dim]
+            indices = [base + ix * stride for base in indices for ix in xrange(self.shape[dim])]
+
+        return [self.values[ix] for ix in indices]
+
+    def _contiguous(self):
+        """Returns an equivalent array whose 'values' are exactly its elements in row major order."""
+        if self.strides is None and self.offset == 0 and len(self.values) == self.size:
+            return self
+        return PurePythonNumpyArray(self.shape, self._contiguousValues())
+
+    def _permuteAxes(self, axes):
+        strides = self._effectiveStrides()
+        return PurePythonNumpyArray(
+            tuple([self.shape[axis] for axis in axes]),
+            self.values,
+            self.offset,
+            tuple([strides[axis] for axis in axes])
+            )
+
+    def transpose(self):
+        if len(self.shape) == 1:
+            return self
+
+        return self._permuteAxes([len(self.shape) - 1 - ix for ix in xrange(len(self.shape))])
+
+    @property
+    def T(self):
+        return self.transpose()
 
     def __iter__(self):
         for idx in xrange(len(self)):
@@ -83,12 +222,11 @@ class PurePythonNumpyArray(object):
                 "__eq__ only currently implemented for equal-sized arrays"
                 )
 
-        tr = [self.values[ix] == y.values[ix] for ix in xrange(self.size)]
-        return PurePythonNumpyArray(self.shape, tr)
+        return self._zipArraysWithOp(y, lambda a, b: a == b)
 
     @property
     def size(self):
-        return len(self.values)
+        return _product(self.shape)
 
     @property
     def ndim(self):
@@ -96,48 +234,66 @@ class PurePythonNumpyArray(object):
 
     def flatten(self):
         """Returns a 1-d numpy array"""
-        return PurePythonNumpyArray((self.size,), self.values)
+        return PurePythonNumpyArray((self.size,), self._contiguousValues())
 
     def tolist(self):
         """Converts an n-dimensional numpy array to an n-dimensional list of lists"""
-        def walk(array):
-            if not isinstance(array, PurePythonNumpyArray):
-                return array
-            toReturn = []
-            for val in array:
-                toReturn = toReturn + [walk(val)]
-
-            return toReturn
+        if len(self.shape) == 1:
+            return self._contiguousValues()
 
-        return walk(self)
+        return [row.tolist() for row in self]
 
     def __len__(self):
         return self.shape[0]
 
     def __getitem__(self, ix):
-        if len(self.shape) == 1:
-            if isinstance(ix, slice):
-                vals = self.values[ix]
-                return PurePythonNumpyArray((len(vals),), vals)
+        if not isinstance(ix, tuple):
+            ix = (ix,)
+
+        if len(ix) > len(self.shape):
+            raise IndexError("too many indices for array")
+
+        strides = self._effectiveStrides()
+        offset = self.offset
+        newShape = []
+        newStrides = []
+
+        for dim in xrange(len(ix)):
+            index = ix[dim]
+            length = self.shape[dim]
+            if isinstance(index, slice):
+                start, step, count = _normalizeSlice(index, length)
+                offset = offset + start * strides[dim]
+                newShape = newShape + [count]
+                newStrides = newStrides + [strides[dim] * step]
             else:
-                return self.values[ix]
+                if index < 0:
+                    index = index + length
+                if index < 0 or index >= length:
+                    raise IndexError("index out of bounds")
+                offset = offset + index * strides[dim]
 
-        newShape = self.shape[1:]
+        for dim in xrange(len(ix), len(self.shape)):
+            newShape = newShape + [self.shape[dim]]
+            newStrides = newStrides + [strides[dim]]
 
-        stride = 1
-        for idx in xrange(1, len(self.shape)):
-            stride = stride * self.shape[idx]
-        toReturn = []
-        startIdx = ix * stride
-        for idx in xrange(startIdx, startIdx + stride):
-            toReturn = toReturn + [self.values[idx]]
+        if len(newShape) == 0:
+            return self.values[offset]
+
+        newShape = tuple(newShape)
+        newStrides = tuple(newStrides)
+        if newStrides == _rowMajorStrides(newShape):
+            newStrides = None
 
-        return PurePythonNumpyArray(newShape, toReturn)
+        view = PurePythonNumpyArray(newShape, self.values, offset, newStrides)
+        if view.size * VIEW_COMPACTION_RATIO < len(self.values):
+            return view._contiguous()
+        return view
 
     def __neg__(self):
         return PurePythonNumpyArray(
             self.shape,
-            [-val for val in self.values]
+            [-val for val in self._contiguousValues()]
             )
 
     def __mul__(self, v):
@@ -192,25 +348,95 @@ class PurePythonNumpyArray(object):
                 " and " + str(v.shape)
                 )
 
+        values1 = self._contiguousValues()
+        values2 = v._contiguousValues()
+
         return PurePythonNumpyArray(
             self.shape,
-            [op(self.values[ix], v.values[ix]) for ix in xrange(self.size)]
+            [op(values1[ix], values2[ix]) for ix in xrange(len(values1))]
             )
 
     def _applyOperatorToAllElements(self, op, val):
         return PurePythonNumpyArray(
             self.shape,
-            [op(self.values[ix], val) for ix in xrange(self.size)]
+            [op(x, val) for x in self._contiguousValues()]
+            )
+
+    def _reduceAlongAxis(self, kernel, axis):
+        """Apply 'kernel' to the list of elements along 'axis', for each index of the other axes."""
+        if axis is None:
+            return kernel(self._contiguousValues())
+
+        if axis < 0:
+            axis = axis + len(self.shape)
+        if axis < 0 or axis >= len(self.shape):
+            raise ValueError("axis out of bounds")
+
+        otherAxes = [dim for dim in xrange(len(self.shape)) if dim != axis]
+        values = self._permuteAxes(otherAxes + [axis])._contiguousValues()
+        length = self.shape[axis]
+
+        # 'axis' may be empty, so count the results from the other axes
+        results = [
+            kernel(values[ix * length:(ix + 1) * length])
+            for ix in xrange(_product([self.shape[dim] for dim in otherAxes]))
+            ]
+
+        if len(otherAxes) == 0:
+            return results[0]
+
+        return PurePythonNumpyArray(tuple([self.shape[dim] for dim in otherAxes]), results)
+
+    def sum(self, axis=None):
+        return self._reduceAlongAxis(_sumKernel, axis)
+
+    def mean(self, axis=None):
+        return self._reduceAlongAxis(_meanKernel, axis)
+
+    def max(self, axis=None):
+        return self._reduceAlongAxis(_maxKernel, axis)
+
+    def argmax(self, axis=None):
+        return self._reduceAlongAxis(_argmaxKernel, axis)
+
+    def cumsum(self, axis=None):
+        if axis is None:
+            return PurePythonNumpyArray((self.size,), _cumsumKernel(self._contiguousValues()))
+
+        if axis < 0:
+            axis = axis + len(self.shape)
+        if axis < 0 or axis >= len(self.shape):
+            raise ValueError("axis out of bounds")
+
+        # move 'axis' last, accumulate along it, and then move it back
+        axes = [dim for dim in xrange(len(self.shape)) if dim != axis] + [axis]
+        moved = self._permuteAxes(axes)
+        values = moved._contiguousValues()
+        length = self.shape[axis]
+
+        accumulated = PurePythonNumpyArray(
+            moved.shape,
+            [
+                val
+                for ix in xrange(_product(moved.shape[:-1]))
+                for val in _cumsumKernel(values[ix * length:(ix + 1) * length])
+                ]
             )
 
+        inverse = [axes.index(dim) for dim in xrange(len(axes))]
+        return accumulated._permuteAxes(inverse)._contiguous()
+
     def reshape(self, newShape):
-        impliedElementCount = reduce(lambda x, y: x * y, newShape)
+        impliedElementCount = _product(newShape)
         if self.size != impliedElementCount:
             raise ValueError("Total size of new array must be unchanged")
 
+        if self._isRowMajor():
+            return PurePythonNumpyArray(newShape, self.values, self.offset)
+
         return PurePythonNumpyArray(
             newShape,
-            self.values
+            self._contiguousValues()
             )
 
     def dot(self, other):
@@ -231,10 +457,13 @@ class PurePythonNumpyArrayMapping(PureImplementationMapping):
     def mapPythonInstanceToPyforaInstance(self, numpyArray):
         return PurePythonNumpyArray(
             numpyArray.shape,
-            numpyArray.flatten().tolist()
+            HomogenousNumpyList(numpyArray.flatten())
             )
 
     def mapPyforaInstanceToPythonInstance(self, pureNumpyArray):
+        # only the array's own elements should go back to the client, not
+        # the whole list of values a view refers to
+        pureNumpyArray = pureNumpyArray._contiguous()
         array = np.array(pureNumpyArray.values)
         try:
             return array.reshape(pureNumpyArray.shape)
@@ -334,31 +563,16 @@ def _dot(arr1, arr2):
             return _dot(arr1, arr2)[0]
 
         if len(arr1.shape) == 2 and len(arr2.shape) == 1:
-            # right now, values is stored in a row-major fashion
-            arr1_flat = arr1.values
-            arr2_flat = arr2.values
-            res = []
-            arr1_flat_ix = 0
-            while arr1_flat_ix < len(arr1_flat):
-                arr2_flat_ix = 0
-                dot = 0.0
-                while arr2_flat_ix < len(arr2_flat):
-                    dot = dot + arr1_flat[arr1_flat_ix] * arr2_flat[arr2_flat_ix]
-                    arr2_flat_ix = arr2_flat_ix + 1
-                    arr1_flat_ix = arr1_flat_ix + 1
-                res = res + [dot] 
-
-            return PurePythonNumpyArray(
-                values=res,
-                shape=(len(res),)
-                )
+            arr2 = arr2.reshape((arr2.shape[0], 1))
+            res = _dot(arr1, arr2)
+            return res.reshape((res.shape[0],))
 
         if len(arr1.shape) != len(arr2.shape):
             raise ValueError("Matrix dimensions do not match")
 
         # 1d dot 1d -> normal dot product
         if len(arr1.shape) == 1:
-            return _dotProduct(arr1, arr2)
+            return _dotProduct(arr1._contiguousValues(), arr2._contiguousValues())
 
         # 2d x 2d -> matrix multiplication
         elif len(arr1.shape) == 2:
@@ -370,21 +584,7 @@ def _dot(arr1, arr2):
                     str(arr2.shape[0]) + " (dim 0)"
                     )
 
-            result = __inline_fora(
-                """fun(@unnamed_args:(values1, shape1, values2, shape2), *args) {
-                       return purePython.linalgModule.matrixMult(
-                           values1, shape1, values2, shape2
-                           )
-                       }"""
-                )(arr1.values, arr1.shape, arr2.values, arr2.shape)
-
-            flattenedValues = result[0]
-            shape = tuple(result[1])
-
-            return PurePythonNumpyArray(
-                shape,
-                flattenedValues
-                )
+            return _tiledMatrixMultiply(arr1, arr2)
 
         else:
             raise Exception(
@@ -395,6 +595,82 @@ def _dot(arr1, arr2):
         return _dot(NpArray()(arr1), NpArray()(arr2))
 
 
+def _tiledMatrixMultiply(arr1, arr2):
+    """Multiply two 2-d arrays with one native multiply if they fit in
+    MATMUL_MAX_UNTILED_ELEMENTS. Otherwise, recursively halve the largest of the
+    three dimensions (rows of arr1, columns of arr2, and the shared inner
+    dimension), so that the tiling adapts to the shape of the product and
+    the halves can be computed in parallel."""
+    rows = arr1.shape[0]
+    inner = arr1.shape[1]
+    columns = arr2.shape[1]
+
+    if rows * inner + inner * columns + rows * columns <= MATMUL_MAX_UNTILED_ELEMENTS:
+        return _matrixMultiplyTile(arr1, arr2)
+
+    largest = max(rows, inner, columns)
+
+    if rows == largest:
+        mid = rows / 2
+        return _stackRows(
+            _tiledMatrixMultiply(arr1[:mid], arr2),
+            _tiledMatrixMultiply(arr1[mid:], arr2)
+            )
+
+    if columns == largest:
+        mid = columns / 2
+        return _stackColumns(
+            _tiledMatrixMultiply(arr1, arr2[:, :mid]),
+            _tiledMatrixMultiply(arr1, arr2[:, mid:])
+            )
+
+    mid = inner / 2
+    return _tiledMatrixMultiply(arr1[:, :mid], arr2[:mid]) + \
+        _tiledMatrixMultiply(arr1[:, mid:], arr2[mid:])
+
+
+def _matrixMultiplyTile(arr1, arr2):
+    result = __inline_fora(
+        """fun(@unnamed_args:(values1, shape1, values2, shape2), *args) {
+               return purePython.linalgModule.matrixMult(
+                   values1, shape1, values2, shape2
+                   )
+               }"""
+        )(arr1._contiguousValues(), arr1.shape, arr2._contiguousValues(), arr2.shape)
+
+    flattenedValues = result[0]
+    shape = tuple(result[1])
+
+    return PurePythonNumpyArray(
+        shape,
+        flattenedValues
+        )
+
+
+def _stackRows(top, bottom):
+    return PurePythonNumpyArray(
+        (top.shape[0] + bottom.shape[0], top.shape[1]),
+        top._contiguousValues() + bottom._contiguousValues()
+        )
+
+
+def _stackColumns(left, right):
+    leftValues = left._contiguousValues()
+    rightValues = right._contiguousValues()
+    leftWidth = left.shape[1]
+    rightWidth = right.shape[1]
+
+    return PurePythonNumpyArray(
+        (left.shape[0], leftWidth + rightWidth),
+        [
+            val
+            for rowIx in xrange(left.shape[0])
+            for val in leftValues[rowIx * leftWidth:(rowIx + 1) * leftWidth] + \
+                rightValues[rowIx * rightWidth:(rowIx + 1) * rightWidth]
+            ]
+        )
+
+
 @pureMapping(np.dot)
 class NpDot(object):
     def __call__(self, a, b):
@@ -411,7 +687,7 @@ class NpPinv(object):
             """fun(@unnamed_args:(rowMajorValues, shape), *args) {
                    purePython.linalgModule.pInv(rowMajorValues, shape)
                    }"""
-            )(matrix.values, shape)
+            )(matrix._contiguousValues(), shape)
 
         flat = result[0]
         shape = result[1]
@@ -433,7 +709,7 @@ class NpInv(object):
             """fun(@unnamed_args:(rowMajorValues, shape), *args) {
                    purePython.linalgModule.inv(rowMajorValues, shape)
                    }"""
-            )(x.values, shape)
+            )(x._contiguousValues(), shape)
 
         flat = result[0]
         shape = result[1]
@@ -453,7 +729,7 @@ class NpEigH(object):
             """fun(@unnamed_args:(a, uplo), *args) {
                    return purePython.linalgModule.eigh(a, uplo)
                    }"""
-            )(a, UPLO)
+            )(a._contiguous(), UPLO)
 
         return (
             PurePythonNumpyArray(
@@ -477,7 +753,7 @@ class Svd(object):
             """fun(@unnamed_args:(a), *args) {
                    purePython.linalgModule.svd(a)
                    }"""
-            )(a)
+            )(a._contiguous())
 
         return (
             PurePythonNumpyArray(
@@ -506,7 +782,7 @@ class Lstsq(object):
             """fun(@unnamed_args:(a, b, rcond), *args) {
                    purePython.linalgModule.lstsq(a, b, rcond)
                    }"""
-            )(a, b, rcond)
+            )(a._contiguous(), b._contiguous(), rcond)
 
         x = PurePythonNumpyArray((len(x),), x)
 
@@ -548,10 +824,10 @@ class NpNorm(object):
         elif ord == -2:
             return self.minus_two_norm(a)
         else:
-            return sum(abs(elt)**ord for elt in a.values) ** (1.0 / ord)
+            return sum(abs(elt)**ord for elt in a._contiguousValues()) ** (1.0 / ord)
         
     def frobenius_norm(self, a):
-        return sum(elt ** 2.0 for elt in a.values) ** 0.5
+        return sum(elt ** 2.0 for elt in a._contiguousValues()) ** 0.5
 
     def nuclear_norm(self, a):
         # return sum of singular values
@@ -559,7 +835,7 @@ class NpNorm(object):
 
     def inf_norm(self, a):
         if len(a.shape) == 1:
-            return max(abs(elt) for elt in a.values)
+            return max(abs(elt) for elt in a._contiguousValues())
         elif len(a.shape) == 2:
             # max(sum(abs(x), axis=1))
             raise NotImplementedError
@@ -568,7 +844,7 @@ class NpNorm(object):
 
     def minus_inf_norm(self, a):
         if len(a.shape) == 1:
-            return min(abs(elt) for elt in a.values)
+            return min(abs(elt) for elt in a._contiguousValues())
         elif len(a.shape) == 2:
             # min(sum(abs(x), axis=1))
             raise NotImplementedError
@@ -580,7 +856,7 @@ class NpNorm(object):
 
     def one_norm(self, a):
         if len(a.shape) == 1:
-            return sum(abs(elt) for elt in a.values)
+            return sum(abs(elt) for elt in a._contiguousValues())
         elif len(a.shape) == 2:
             raise NotImplementedError
 
@@ -622,7 +898,7 @@ class LinSolve(object):
             """fun(@unnamed_args:(a,b), *args) {
                    purePython.linalgModule.linsolve(a, b)
                    }"""
-            )(a, b)
+            )(a._contiguous(), b._contiguous())
         flattendValues = res[0]
         shape = res[1]
         return PurePythonNumpyArray(
@@ -647,8 +923,32 @@ class NpArange(object):
 
 @pureMapping(np.mean)
 class Mean(object):
-    def __call__(self, x):
-        return sum(x) / len(x)
+    def __call__(self, x, axis=None):
+        return NpArray()(x).mean(axis)
+
+
+@pureMapping(np.sum)
+class NpSum(object):
+    def __call__(self, x, axis=None):
+        return NpArray()(x).sum(axis)
+
+
+@pureMapping(np.max)
+class NpMax(object):
+    def __call__(self, x, axis=None):
+        return NpArray()(x).max(axis)
+
+
+@pureMapping(np.argmax)
+class NpArgmax(object):
+    def __call__(self, x, axis=None):
+        return NpArray()(x).argmax(axis)
+
+
+@pureMapping(np.cumsum)
+class NpCumsum(object):
+    def __call__(self, x, axis=None):
+        return NpArray()(x).cumsum(axis)
 
 
 class Median(object):
@@ -708,7 +1008,7 @@ class IsInf(object):
         
         return PurePythonNumpyArray(
             x_asarray.shape,
-            [self.isinf_float(val) for val in x_asarray.values]
+            [self.isinf_float(val) for val in x_asarray._contiguousValues()]
             )
 
 
@@ -748,7 +1048,7 @@ class IsFinite(object):
         
         return PurePythonNumpyArray(
             x_asarray.shape,
-            [self.isfinite_float(val) for val in x_asarray.values]
+            [self.isfinite_float(val) for val in x_asarray._contiguousValues()]
             )
 
 
@@ -777,7 +1077,7 @@ class NpAbs(object):
         
         return PurePythonNumpyArray(
             x_asarray.shape,
-            [self.abs_primitive(val) for val in x_asarray.values]
+            [self.abs_primitive(val) for val in x_asarray._contiguousValues()]
             )
 
 
@@ -808,7 +1108,7 @@ class All(object):
     def all_array(self, x):
         x_asarray = np.array(x)
         
-        return all([self.all_primitive(val) for val in x_asarray.values])
+        return all([self.all_primitive(val) for val in x_asarray._contiguousValues()])
 
 
 @pureMapping(np.log)
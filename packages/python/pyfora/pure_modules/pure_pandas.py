@@ -14,7 +14,7 @@
 
 
 from pyfora.PureImplementationMapping import PureImplementationMapping, pureMapping
-from pyfora.pure_modules.pure_numpy import PurePythonNumpyArray
+from pyfora.pure_modules.pure_numpy import PurePythonNumpyArray, _dot
 
 from pyfora.unique import unique
 import numpy
@@ -146,36 +146,19 @@ class PurePythonDataFrame(object):
             self._dot(other, splitLimit, mid, high)
 
     def _dot_on_chunk(self, other, low, high):
-        tr = _scaleVecOnRange(self._columns[0], other[0], low, high)
-
-        colIx = 1
-        while colIx < self.shape[1]:
-            tr = _addVecsOnRange(
-                tr, self._columns[colIx], other[colIx], low, high)
-            colIx = colIx + 1
-
-        return tr
-
-
-def _scaleVecOnRange(vec, multiplier, lowIx, highIx):
-    tr = []
-    ix = lowIx
-    while ix < highIx:
-        tr = tr + [multiplier * vec[ix]]
-        ix = ix + 1
-
-    return tr
-
-def _addVecsOnRange(vec1, vec2, vec2Multiplier, lowIx, highIx):
-    tr = []
-    ix = lowIx
-
-    while ix < highIx:
-        tr = tr + [vec1[ix - lowIx] + vec2Multiplier * vec2[ix]]
-        ix = ix + 1
-
-    return tr
+        columnMajorValues = sum([col[low:high].tolist() for col in self._columns], [])
+
+        # the tiled matrix multiply in pure_numpy splits wide frames by column
+        chunk = PurePythonNumpyArray(
+            (self.shape[1], high - low),
+            columnMajorValues
+            ).transpose()
+        otherAsArray = PurePythonNumpyArray(
+            (len(other),),
+            [other[ix] for ix in xrange(len(other))]
+            )
 
+        return _dot(chunk, otherAsArray).tolist()
 
 
 class _PurePythonDataFrameILocIndexer(object):
@@ -41,7 +41,7 @@ class Expm:
                        matrix
                        )
                    }"""
-            )(A)
+            )(A._contiguous())
 
         return PureNumpy.PurePythonNumpyArray(
             tuple(result[1]),
@@ -0,0 +1,57 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import pyfora.Connection as Connection
+
+import unittest
+
+
+class FakeComputationBatch(object):
+    """Stands in for a PyforaComputedValueBatch web object."""
+    def __init__(self):
+        self.statusCallbacks = None
+
+    def increaseRequestCount(self, args, callbacks):
+        callbacks['onSuccess'](None)
+
+    def subscribe_jsonStatusRepresentations(self, callbacks):
+        self.statusCallbacks = callbacks
+        callbacks['onSuccess']({})
+
+    def setStatuses(self, jsonStatuses):
+        self.statusCallbacks['onChanged'](jsonStatuses)
+
+
+class ConnectionTest(unittest.TestCase):
+    def test_batch_statuses_are_reported_once(self):
+        connection = Connection.Connection(None, None)
+        batch = FakeComputationBatch()
+        reported = []
+
+        connection.prioritizeComputationBatch(
+            batch,
+            lambda result: self.assertIsNone(result),
+            reported.append,
+            self.fail
+            )
+
+        batch.setStatuses({'1': {'status': 'finished'}})
+        batch.setStatuses({'1': {'status': 'finished'}, '0': {'status': 'failure'}})
+        batch.setStatuses({'1': {'status': 'finished'}, '0': {'status': 'failure'}})
+
+        self.assertEqual(
+            reported,
+            [[(1, {'status': 'finished'})], [(0, {'status': 'failure'})]]
+            )
+
@@ -0,0 +1,108 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import pyfora.ObjectConverter as ObjectConverter
+import pyfora.ObjectRegistry as ObjectRegistry
+import pyfora.PureImplementationMappings as PureImplementationMappings
+import pyfora.PyObjectWalker as PyObjectWalker
+
+import unittest
+
+
+class RecordingRemoteConverter(object):
+    """Stands in for the server-side PyforaObjectConverter and records what it was sent."""
+    def __init__(self):
+        self.requests = []
+        self.knownContentHashes = set()
+        self.forgetEverything = False
+
+    def initialize(self, args, callbacks):
+        callbacks['onSuccess'](None)
+
+    def convert(self, args, callbacks):
+        self.requests.append(args)
+
+        if self.forgetEverything:
+            self.forgetEverything = False
+            self.knownContentHashes = set()
+
+        unknown = [
+            contentHash for objId, contentHash in args['objectIdToContentHash'].iteritems()
+            if objId not in args['objectIdToObjectDefinition'] and
+            contentHash not in self.knownContentHashes
+            ]
+        if unknown:
+            callbacks['onSuccess']({'unknownContentHashes': unknown})
+            return
+
+        self.knownContentHashes.update(args['objectIdToContentHash'].itervalues())
+        callbacks['onSuccess']({'objectId': args['objectId']})
+
+
+class RecordingWebObjectFactory(object):
+    def __init__(self):
+        self.remoteConverter = RecordingRemoteConverter()
+
+    def PyforaObjectConverter(self):
+        return self.remoteConverter
+
+
+class ObjectConverterTest(unittest.TestCase):
+    def setUp(self):
+        self.webObjectFactory = RecordingWebObjectFactory()
+        self.remote = self.webObjectFactory.remoteConverter
+        self.converter = ObjectConverter.ObjectConverter(self.webObjectFactory, None)
+        self.registry = ObjectRegistry.ObjectRegistry()
+
+    def convert(self, obj):
+        objectId = PyObjectWalker.PyObjectWalker(
+            purePythonClassMapping=PureImplementationMappings.PureImplementationMappings(),
+            objectRegistry=self.registry
+            ).walkPyObject(obj)
+
+        results = []
+        self.converter.convert(objectId, self.registry, results.append)
+        self.assertEqual(results, [objectId])
+
+    def test_large_primitives_are_only_sent_once(self):
+        bigList = [float(x) for x in range(1000)]
+
+        self.convert((bigList, 1))
+        self.convert((bigList, 2))
+
+        sentLists = [
+            definition
+            for request in self.remote.requests
+            for definition in request['objectIdToObjectDefinition'].itervalues()
+            if isinstance(definition, dict) and
+            definition['typeName'] == 'PackedHomogenousData'
+            ]
+        self.assertEqual(len(sentLists), 1)
+
+    def test_small_primitives_are_not_hashed(self):
+        self.convert([1, 2, 3])
+
+        self.assertEqual(self.remote.requests[0]['objectIdToContentHash'], {})
+
+    def test_resends_content_the_server_forgot(self):
+        bigList = [float(x) for x in range(1000)]
+
+        self.convert(bigList)
+        self.remote.forgetEverything = True
+        self.convert(bigList)
+
+        self.assertEqual(len(self.remote.requests), 3)
+        self.assertEqual(len(self.remote.requests[1]['objectIdToObjectDefinition']), 0)
+        self.assertEqual(len(self.remote.requests[2]['objectIdToObjectDefinition']), 1)
+
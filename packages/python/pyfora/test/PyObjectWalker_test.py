@@ -16,7 +16,11 @@ import pyfora.PureImplementationMappings as PureImplementationMappings
 import pyfora.PureImplementationMapping as PureImplementationMapping
 import pyfora.PyObjectWalker as PyObjectWalker
 import pyfora.NamedSingletons as NamedSingletons
+import pyfora.ObjectRegistry as ObjectRegistry
+import pyfora.TypeDescription as TypeDescription
 
+import base64
+import numpy
 import unittest
 
 class SomeRandomInstance:
@@ -60,6 +64,57 @@ class PyObjectWalkerTest(unittest.TestCase):
                 objectRegistry=None
                 )
 
+    def walk(self, pyObject):
+        registry = ObjectRegistry.ObjectRegistry()
+        objectId = PyObjectWalker.PyObjectWalker(
+            purePythonClassMapping=PureImplementationMappings.PureImplementationMappings(),
+            objectRegistry=registry
+            ).walkPyObject(pyObject)
+        return registry.objectIdToObjectDefinition[objectId]
+
+    def test_large_homogenous_lists_are_packed(self):
+        for values, dtype in [([float(x) for x in range(200)], '<f8'),
+                              (range(200), '<i8'),
+                              ([x % 3 == 0 for x in range(200)], '|b1')]:
+            definition = self.walk(values)
+
+            self.assertIsInstance(definition, TypeDescription.PackedHomogenousData)
+            self.assertEqual(definition.dtype, dtype)
+            self.assertEqual(
+                numpy.fromstring(base64.b64decode(definition.dataAsBytes), dtype=dtype).tolist(),
+                values
+                )
+
+    def test_small_and_mixed_lists_are_not_packed(self):
+        self.assertEqual(self.walk([1, 2, 3]), [1, 2, 3])
+
+        mixed = range(199) + [1.0]
+        self.assertEqual(self.walk(mixed), mixed)
+
+    def test_homogenous_numpy_lists_are_packed(self):
+        array = numpy.arange(10, dtype='int32')
+
+        definition = self.walk(PyObjectWalker.HomogenousNumpyList(array))
+
+        self.assertEqual(definition.dtype, '<i8')
+        self.assertEqual(
+            numpy.fromstring(base64.b64decode(definition.dataAsBytes), dtype='<i8').tolist(),
+            array.tolist()
+            )
+
+    def test_unsigned_numpy_lists_dont_wrap(self):
+        array = numpy.array([0, 1, 2 ** 63 - 1], dtype='uint64')
+        definition = self.walk(PyObjectWalker.HomogenousNumpyList(array))
+        self.assertEqual(
+            numpy.fromstring(base64.b64decode(definition.dataAsBytes), dtype='<i8').tolist(),
+            array.tolist()
+            )
+
+        #values past the int64 maximum aren't packed
+        array = numpy.array([0, 1, 2 ** 64 - 1], dtype='uint64')
+        definition = self.walk(PyObjectWalker.HomogenousNumpyList(array))
+        self.assertNotIsInstance(definition, TypeDescription.PackedHomogenousData)
+
 
 if __name__ == "__main__":
     unittest.main()
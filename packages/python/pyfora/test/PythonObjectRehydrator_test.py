@@ -0,0 +1,79 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import pyfora.PureImplementationMappings as PureImplementationMappings
+import pyfora.PythonObjectRehydrator as PythonObjectRehydrator
+
+import base64
+import numpy
+import unittest
+
+
+def homogenousListBufferJson(array):
+    return {
+        'root_id': '0',
+        'obj_definitions': {
+            '0': {
+                'homogenousListBuffer': base64.b64encode(array.tostring()),
+                'dtype': array.dtype.str if array.dtype.fields is None else array.dtype.descr,
+                'firstElement': '1',
+                'length': len(array)
+                },
+            '1': {'primitive': array[0].item()}
+            }
+        }
+
+
+class PythonObjectRehydratorTest(unittest.TestCase):
+    def setUp(self):
+        self.rehydrator = PythonObjectRehydrator.PythonObjectRehydrator(
+            PureImplementationMappings.PureImplementationMappings()
+            )
+
+    def test_homogenous_list_buffer_as_list(self):
+        array = numpy.arange(10, dtype='float64')
+
+        res = self.rehydrator.convertJsonResultToPythonObject(homogenousListBufferJson(array))
+
+        self.assertIsInstance(res, list)
+        self.assertEqual(res, array.tolist())
+        self.assertIsInstance(res[0], float)
+
+    def test_homogenous_list_buffer_as_numpy(self):
+        array = numpy.arange(10, dtype='int64')
+
+        res = self.rehydrator.convertJsonResultToPythonObject(
+            homogenousListBufferJson(array),
+            returnNumpyArrays=True
+            )
+
+        self.assertIsInstance(res, numpy.ndarray)
+        self.assertEqual(res.dtype, array.dtype)
+        self.assertTrue((res == array).all())
+
+    def test_structured_homogenous_list_buffer_is_list(self):
+        array = numpy.array([(1.0, 2), (3.0, 4)], dtype=[('f0', '<f8'), ('f1', '<i8')])
+
+        res = self.rehydrator.convertJsonResultToPythonObject(
+            homogenousListBufferJson(array),
+            returnNumpyArrays=True
+            )
+
+        self.assertEqual(res, [(1.0, 2), (3.0, 4)])
+
+    def test_dtype_from_json(self):
+        for dtype in [numpy.dtype('<f8'), numpy.dtype('bool'), numpy.dtype([('a', '<i4'), ('b', '<f4')])]:
+            asJson = dtype.str if dtype.fields is None else [list(x) for x in dtype.descr]
+            self.assertEqual(PythonObjectRehydrator.dtypeFromJson(asJson), dtype)
+
@@ -0,0 +1,116 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import pyfora
+import pyfora.MsgpackFraming as MsgpackFraming
+import pyfora.TcpMsgpackInterface as TcpMsgpackInterface
+
+import json
+import Queue
+import socket
+import threading
+import unittest
+
+
+def recvExactly(sock, size):
+    data = ''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise socket.error("closed")
+        data += chunk
+    return data
+
+
+def recvFrame(sock):
+    size = MsgpackFraming.frameHeader.unpack(
+        recvExactly(sock, MsgpackFraming.frameHeader.size)
+        )[0]
+    return recvExactly(sock, size)
+
+
+class EchoGateway(object):
+    """Accepts a single connection and answers every request with its own body."""
+    def __init__(self, handshake=MsgpackFraming.HANDSHAKE_OK):
+        self.handshake = handshake
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.bind(('127.0.0.1', 0))
+        self.listener.listen(1)
+        self.port = self.listener.getsockname()[1]
+        self.connectionRequests = Queue.Queue()
+        self.thread = threading.Thread(target=self.serve)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def serve(self):
+        sock, _ = self.listener.accept()
+        try:
+            self.connectionRequests.put(json.loads(recvFrame(sock)))
+            sock.sendall(MsgpackFraming.frame(MsgpackFraming.encode(self.handshake)))
+            while True:
+                request = MsgpackFraming.decodeRequest(recvFrame(sock))
+                request['responseType'] = 'Echo'
+                sock.sendall(MsgpackFraming.frame(MsgpackFraming.encode(request)))
+        except socket.error:
+            pass
+        finally:
+            sock.close()
+            self.listener.close()
+
+
+@unittest.skipUnless(MsgpackFraming.isAvailable(), "msgpack is not installed")
+class TcpMsgpackInterfaceTest(unittest.TestCase):
+    def test_request_roundtrip(self):
+        encoded = MsgpackFraming.encodeRequest(7, MsgpackFraming.encode({'a': [1, 2.5, 'x']}))
+
+        self.assertEqual(
+            MsgpackFraming.decodeRequest(encoded),
+            {'a': [1, 2.5, 'x'], 'messageId': 7}
+            )
+
+    def test_send_and_receive(self):
+        gateway = EchoGateway()
+        interface = TcpMsgpackInterface.TcpMsgpackInterface('127.0.0.1', gateway.port)
+        interface.connect(timeout=5.0)
+
+        request = gateway.connectionRequests.get(timeout=5.0)
+        self.assertEqual(request['encoding'], MsgpackFraming.ENCODING)
+
+        responses = Queue.Queue()
+        for ix in range(10):
+            interface.send({'objectId': ix, 'name': 'value'}, responses.put)
+
+        received = sorted(
+            [responses.get(timeout=5.0) for _ in range(10)],
+            key=lambda message: message['messageId']
+            )
+        self.assertEqual([message['objectId'] for message in received], range(10))
+        self.assertEqual([message['messageId'] for message in received], range(10))
+        self.assertIsInstance(received[0]['name'], str)
+
+        interface.close()
+        self.assertFalse(interface.isConnected())
+
+    def test_rejected_handshake(self):
+        gateway = EchoGateway(handshake="Version mismatch")
+        interface = TcpMsgpackInterface.TcpMsgpackInterface('127.0.0.1', gateway.port)
+
+        with self.assertRaises(pyfora.ConnectionError):
+            interface.connect(timeout=5.0)
+
+        self.assertFalse(interface.isConnected())
+
+
+if __name__ == "__main__":
+    unittest.main()
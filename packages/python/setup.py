@@ -33,6 +33,8 @@ version = read_package_version()
 
 install_requires = ['futures', 'socketIO-client>=0.6.5', 'numpy', 'wsaccel']
 
+extras_require = {'tcp': ['msgpack-python>=0.5.2']}
+
 
 setup(
     name='pyfora',
@@ -62,6 +64,7 @@ setup(
         },
     zip_safe=False,
     install_requires=install_requires,
+    extras_require=extras_require,
     entry_points={
         'console_scripts':
             ['pyfora_aws=pyfora.aws.pyfora_aws:main']
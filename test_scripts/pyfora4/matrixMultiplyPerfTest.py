@@ -0,0 +1,87 @@
+#   Copyright 2015-2016 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import time
+import unittest
+
+import ufora.config.Setup as Setup
+import ufora.test.PerformanceTestReporter as PerformanceTestReporter
+import ufora.test.ClusterSimulation as ClusterSimulation
+
+import pyfora
+import numpy as np
+
+
+class MatrixMultiplyPerfTest(unittest.TestCase):
+    """Times np.dot in pyfora against the same product in local numpy.
+
+    Each shape records two series, 'pyfora.numpy.matmul_<shape>' and
+    'numpy.local.matmul_<shape>', so the two can be compared in the
+    PerformanceDataset for a commit.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.config = Setup.config()
+        cls.simulation = ClusterSimulation.Simulator.createGlobalSimulator()
+        cls.simulation.startService()
+        cls.simulation.getDesirePublisher().desireNumberOfWorkers(1)
+        cls.ufora = pyfora.connect('http://localhost:30000')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.ufora.close()
+        cls.simulation.stopService()
+
+    def test_matmul_square_small(self):
+        self.compareMatrixMultiply(256, 256, 256)
+
+    def test_matmul_square_large(self):
+        self.compareMatrixMultiply(2000, 2000, 2000)
+
+    def test_matmul_wide_inner(self):
+        self.compareMatrixMultiply(50, 200000, 50)
+
+    def test_matmul_tall_result(self):
+        self.compareMatrixMultiply(200000, 20, 20)
+
+    def compareMatrixMultiply(self, rows, inner, columns):
+        shapeName = "%dx%dx%d" % (rows, inner, columns)
+
+        a = np.arange(rows * inner, dtype=float).reshape((rows, inner)) % 17.0
+        b = np.arange(inner * columns, dtype=float).reshape((inner, columns)) % 13.0
+
+        t0 = time.time()
+        expected = np.dot(a, b)
+        self.recordTime("numpy.local.matmul_" + shapeName, time.time() - t0)
+
+        with self.ufora.remotely:
+            remoteA = a
+            remoteB = b
+
+        t0 = time.time()
+        with self.ufora.remotely.downloadAll():
+            result = np.dot(remoteA, remoteB)
+        self.recordTime("pyfora.numpy.matmul_" + shapeName, time.time() - t0)
+
+        np.testing.assert_allclose(result, expected)
+
+    @staticmethod
+    def recordTime(testName, elapsed):
+        if PerformanceTestReporter.isCurrentlyTesting():
+            PerformanceTestReporter.recordTest(testName, elapsed, None)
+
+
+if __name__ == '__main__':
+    import ufora.config.Mainline as Mainline
+    Mainline.UnitTestMainline([])
@@ -26,6 +26,7 @@ import os
 import threading
 import time
 
+import ufora.BackendGateway.GatewayWorkerPool as GatewayWorkerPool
 import ufora.distributed.Stoppable as Stoppable
 import ufora.util.ManagedThread as ManagedThread
 import ufora.core.SubprocessRunner as SubprocessRunner
@@ -35,7 +36,13 @@ import ufora.native.CallbackScheduler as CallbackScheduler
 
 
 class BackendGatewayService(Stoppable.Stoppable):
-    def __init__(self, callbackScheduler, channelListener, sharedStateAddress):
+    """Accepts gateway connections and passes each one to a connection handler process.
+
+    By default every connection gets a freshly started handler. If 'workerPoolSize' is
+    positive, that many handlers are started up front and connections are spread across
+    them (see GatewayWorkerPool).
+    """
+    def __init__(self, callbackScheduler, channelListener, sharedStateAddress, workerPoolSize=0):
         Stoppable.Stoppable.__init__(self)
         self._lock = threading.Lock()
         self.callbackScheduler = callbackScheduler
@@ -52,6 +59,18 @@ class BackendGatewayService(Stoppable.Stoppable):
 
         self.cleanupThread = ManagedThread.ManagedThread(target=self.cleanupThread_)
 
+        self.workerPool = None
+        if workerPoolSize > 0:
+            self.workerPool = GatewayWorkerPool.GatewayWorkerPool(
+                workerPoolSize,
+                [sys.executable, self.handlerScriptName()],
+                {'sharedStateAddress': self.sharedStateAddress}
+                )
+
+    @staticmethod
+    def handlerScriptName():
+        return os.path.join(os.path.split(__file__)[0], 'handleBackendGatewayConnection.py')
+
     def cleanupThread_(self):
         while not self.shouldStop():
             try:
@@ -82,6 +101,8 @@ class BackendGatewayService(Stoppable.Stoppable):
     def startService(self, _):
         logging.info("Starting BackendGatewayService...")
         self.cleanupThread.start()
+        if self.workerPool is not None:
+            self.workerPool.start()
         self.channelListener.start()
         self.channelListener.blockUntilReady()
 
@@ -95,6 +116,9 @@ class BackendGatewayService(Stoppable.Stoppable):
         try:
             self.stop()
 
+            if self.workerPool is not None:
+                self.workerPool.stop()
+
             for sock in self.socketsToDisconnectOnExit:
                 try:
                     sock.shutdown(socket.SHUT_RDWR)
@@ -121,6 +145,10 @@ class BackendGatewayService(Stoppable.Stoppable):
             time.sleep(0.1)
 
     def onSubscribableConnection(self, sock, _):
+        if self.workerPool is not None:
+            self.passConnectionToWorkerPool(sock)
+            return
+
         logging.info("creating a new process to handle connection")
 
         handlerPid = None
@@ -128,8 +156,7 @@ class BackendGatewayService(Stoppable.Stoppable):
             if self.shouldStop():
                 return
 
-            scriptName = os.path.join(os.path.split(__file__)[0],
-                                      'handleBackendGatewayConnection.py')
+            scriptName = self.handlerScriptName()
 
             def onStdOut(line):
                 logging.info("%s > %s", handlerPid, line)
@@ -165,5 +192,14 @@ class BackendGatewayService(Stoppable.Stoppable):
 
         threading.Thread(target=waitForProcToFinish).start()
 
+    def passConnectionToWorkerPool(self, sock):
+        if self.shouldStop():
+            sock.close()
+            return
 
-
+        try:
+            if not self.workerPool.dispatch(sock):
+                logging.warn("Dropping a connection: the worker pool is stopped")
+        finally:
+            #the handler holds its own copy of the socket now
+            sock.close()
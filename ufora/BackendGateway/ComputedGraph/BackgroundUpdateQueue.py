@@ -39,6 +39,11 @@ queues = {}
 nextFrameQueues = {}
 queuesLock = threading.Lock()
 
+#for each graph, a map from key to the (update, pushIndex) most recently pushed with
+#'pushCoalesced' that hasn't run yet
+coalescedUpdates = {}
+coalescedPushCount = [0]
+
 #tell Tsunami not to reload this module if we hit F5
 _no_tsunami_reload = True
 
@@ -70,6 +75,45 @@ def makeDeferCallback(func):
 def push(func):
     getDeferredUpdateQueue().put(func)
 
+class CoalescedUpdate(object):
+    """Queue entry for an update pushed with 'pushCoalesced'.
+
+    Runs the update only if no later update was pushed for the same key."""
+    def __init__(self, pending, key, pushIndex):
+        self.pending = pending
+        self.key = key
+        self.pushIndex = pushIndex
+
+    def __call__(self):
+        with queuesLock:
+            func, pushIndex = self.pending.get(self.key, (None, None))
+            if pushIndex != self.pushIndex:
+                return
+            del self.pending[self.key]
+
+        func()
+
+def pushCoalesced(key, func):
+    """Push 'func', superseding any update pushed with the same 'key' that hasn't run yet.
+
+    This is for updates that overwrite state (e.g. setting the cpu counts of a
+    ComputedValue), where only the most recent one matters. 'key' must be hashable.
+    """
+    graph = ComputedGraph.ComputedGraph.currentGraph()
+    queue = getDeferredUpdateQueue()
+
+    with queuesLock:
+        pending = coalescedUpdates.get(graph)
+        if pending is None:
+            pending = {}
+            coalescedUpdates[graph] = pending
+
+        coalescedPushCount[0] += 1
+        pushIndex = coalescedPushCount[0]
+        pending[key] = (func, pushIndex)
+
+    queue.put(CoalescedUpdate(pending, key, pushIndex))
+
 def pushForNextFrame(func):
     getDeferredUpdateQueue(isNextFrameQueue = True).put(func)
 
@@ -118,3 +162,8 @@ def drainWithoutExecuting():
     except Queue.Empty:
         pass
 
+    with queuesLock:
+        pending = coalescedUpdates.get(ComputedGraph.ComputedGraph.currentGraph())
+        if pending is not None:
+            pending.clear()
+
@@ -14,6 +14,7 @@
 
 import unittest
 import time
+import ufora.BackendGateway.ComputedGraph.BackgroundUpdateQueue as BackgroundUpdateQueue
 import ufora.BackendGateway.ComputedGraph.ComputedGraph as ComputedGraph
 import ufora.BackendGateway.ComputedGraph.ComputedGraphTestHarness as ComputedGraphTestHarness
 import StringIO
@@ -68,6 +69,34 @@ class TestComputedGraph(unittest.TestCase):
 
         print "creations: ", ct
 
+    def test_coalesced_updates(self):
+        ComputedGraphTestHarness.ComputedGraphTestHarness().executeTest(self.coalescedUpdatesTest)
+
+    def coalescedUpdatesTest(self, harness):
+        location = SimpleLocation(value=10)
+        applied = []
+
+        def setter(value):
+            def update():
+                applied.append(value)
+                location.mutVal = value
+            return update
+
+        BackgroundUpdateQueue.pushCoalesced(location, setter(1))
+        BackgroundUpdateQueue.push(lambda: applied.append('other'))
+        BackgroundUpdateQueue.pushCoalesced(location, setter(2))
+        BackgroundUpdateQueue.pushCoalesced('anotherKey', lambda: applied.append('another'))
+
+        harness.refreshGraph()
+
+        self.assertEqual(applied, ['other', 2, 'another'])
+        self.assertEqual(location.mutValTimes2, 4)
+
+        BackgroundUpdateQueue.pushCoalesced(location, setter(3))
+        harness.refreshGraph()
+
+        self.assertEqual(applied[-1], 3)
+
 
 def executeTestAsMain():
     stringIO = StringIO.StringIO()
@@ -138,6 +138,15 @@ class ComputedValueVectorSlice(ComputedGraph.Location):
 
     isLoaded = ComputedGraph.Mutable(lambda: False)
 
+    #state of 'extractVectorDataAsNumpyArrayPipelined': the numpy chunks of each page
+    #extracted so far (by page index), the first element of the slice, the pages we hold a
+    #request on, and whether some loaded page couldn't be extracted as numpy data
+    pipelinedChunksByPage = ComputedGraph.Mutable(object, lambda: {})
+    pipelinedFirstElement = ComputedGraph.Mutable(object, lambda: None)
+    pipelinedRequestedPages = ComputedGraph.Mutable(object, lambda: set())
+    pipelinedExtractionFailed = ComputedGraph.Mutable(object, lambda: False)
+    pagesExtracted = ComputedGraph.Mutable(object, lambda: 0)
+
     @ComputedGraph.NotCached
     def vectorDataIds(self):
         if self.computedValueVector.vectorImplVal is None:
@@ -248,6 +257,101 @@ class ComputedValueVectorSlice(ComputedGraph.Location):
 
         return result
 
+    def pageSlices(self):
+        """The parts of this slice that fall on each page of the vector, in order."""
+        if self.computedValueVector.vectorImplVal is None:
+            return []
+
+        return [
+            self.computedValueVector.getMappableSlice(
+                max(low, self.lowIndex),
+                min(high, self.highIndex)
+                )
+            for low, high in self.computedValueVector.vectorImplVal.getVectorPageSliceRanges(
+                ComputedValueGateway.getGateway().vdm
+                )
+            if low < self.highIndex and high > self.lowIndex
+            ]
+
+    @ComputedGraph.ExposedProperty()
+    def downloadProgress(self):
+        """How far 'extractVectorDataAsNumpyArrayPipelined' has gotten."""
+        return {'pagesExtracted': self.pagesExtracted, 'pageCount': len(self.pageSlices)}
+
+    @ComputedGraph.Function
+    def pipelinedDownloadIsInProgress(self):
+        return not self.pipelinedExtractionFailed and self.pagesExtracted < len(self.pageSlices)
+
+    @ComputedGraph.Function
+    def extractVectorDataAsNumpyArrayPipelined(self, stepSize = 100000):
+        """Like 'extractVectorDataAsNumpyArrayInChunks', but loads the slice page by page.
+
+        The first call requests every page at once. Each later call (we're recomputed as
+        pages arrive) extracts the pages that have loaded and releases them, so the rest
+        keep loading while we encode. Returns (firstElementAsIVC, chunks) once every page
+        has been extracted, and None before that or if some page can't be represented as
+        numpy data (see 'pipelinedDownloadIsInProgress').
+        """
+        if self.computedValueVector.vectorImplVal is None:
+            return None
+
+        if self.pipelinedExtractionFailed:
+            return None
+
+        pageSlices = self.pageSlices
+        chunksByPage = self.pipelinedChunksByPage
+        requestedPages = self.pipelinedRequestedPages
+
+        for pageIndex, pageSlice in enumerate(pageSlices):
+            if pageIndex in chunksByPage:
+                continue
+
+            chunks = pageSlice.extractVectorDataAsNumpyArrayInChunks(stepSize)
+
+            if chunks is not None and pageIndex == 0:
+                self.pipelinedFirstElement = pageSlice.extractVectorItemAsIVC(self.lowIndex)
+                if self.pipelinedFirstElement is None:
+                    chunks = None
+
+            if chunks is not None:
+                chunksByPage[pageIndex] = chunks
+                if pageIndex in requestedPages:
+                    requestedPages.discard(pageIndex)
+                    pageSlice.decreaseRequestCount()
+            elif pageSlice.isLoaded and pageSlice.vdmThinksIsLoaded():
+                logging.info("%s can't be extracted as numpy data", pageSlice)
+                self.releasePipelinedPages_()
+                self.pipelinedExtractionFailed = True
+                return None
+            elif pageIndex not in requestedPages:
+                requestedPages.add(pageIndex)
+                pageSlice.increaseRequestCount()
+
+        if len(chunksByPage) != self.pagesExtracted:
+            self.pagesExtracted = len(chunksByPage)
+
+        if len(chunksByPage) < len(pageSlices):
+            return None
+
+        #hand the data over rather than holding a second copy of it
+        firstElement = self.pipelinedFirstElement
+        self.pipelinedChunksByPage = {}
+        self.pipelinedFirstElement = None
+
+        return (
+            firstElement,
+            [chunk for pageIndex in range(len(pageSlices)) for chunk in chunksByPage[pageIndex]]
+            )
+
+    @ComputedGraph.Function
+    def releasePipelinedPages_(self):
+        pageSlices = self.pageSlices
+        for pageIndex in self.pipelinedRequestedPages:
+            pageSlices[pageIndex].decreaseRequestCount()
+
+        self.pipelinedRequestedPages = set()
+        self.pipelinedChunksByPage = {}
+
     @ComputedGraph.Function
     def extractVectorItemAsIVC(self, ct):
         if self.computedValueVector.vectorImplVal is None:
@@ -24,6 +24,7 @@ import ufora.BackendGateway.ComputedGraph.BackgroundUpdateQueue as BackgroundUpd
 import ufora.native.Cumulus as CumulusNative
 import ufora.util.ThreadLocalStack as ThreadLocalStack
 import ufora.FORA.VectorDataManager.VectorDataManager as VectorDataManager
+import ufora.BackendGateway.ComputedValue.RamCachePolicy as RamCachePolicy
 import traceback
 
 _no_tsunami_reload = True
@@ -51,18 +52,106 @@ class ComputedValueGateway(ThreadLocalStack.ThreadLocalStackPushable):
         assert False, "Subclass should implement"
 
 
+class VectorDataCache(object):
+    """A VDM holding downloaded pages, which several CacheLoaders may share.
+
+    Every registered loader sees every page the VDM drops, regardless of which
+    loader collects the drops from the underlying TrackingOfflineStorage.
+
+    Which pages stay loaded is decided by a RamCachePolicy: loaders pin the pages that
+    slices have requested, and we evict unpinned pages once the cache is more than
+    'evictionThreshold' full, before the VDM has to drop pages on its own.
+    """
+    def __init__(self, callbackScheduler, ramCacheSize = None, evictionThreshold = None):
+        if ramCacheSize is None:
+            ramCacheSize = Setup.config().cumulusVectorRamCacheMB * 1024 * 1024
+
+        if evictionThreshold is None:
+            evictionThreshold = Setup.config().computedValueGatewayRAMCacheEvictionThreshold
+
+        self.lock_ = threading.Lock()
+        self.vdm = VectorDataManager.constructVDM(callbackScheduler, ramCacheSize)
+
+        #the VDM still drops pages if it fills up anyway (e.g. when everything is pinned).
+        #loaders reload any dropped page that's still wanted.
+        self.vdm.setDropUnreferencedPagesWhenFull(True)
+
+        self.ramCacheOffloadRecorder = CumulusNative.TrackingOfflineStorage(callbackScheduler)
+        self.vdm.setOfflineCache(self.ramCacheOffloadRecorder)
+
+        self.policy = RamCachePolicy.RamCachePolicy(int(ramCacheSize * evictionThreshold))
+
+        self.droppedForLoader_ = {}
+
+    def registerLoader(self, loader):
+        with self.lock_:
+            self.droppedForLoader_[id(loader)] = set()
+
+    def unregisterLoader(self, loader):
+        with self.lock_:
+            self.droppedForLoader_.pop(id(loader), None)
+
+    def extractDropped(self, loader):
+        with self.lock_:
+            dropped = self.ramCacheOffloadRecorder.extractDropped()
+            if dropped:
+                for vectorDataID in dropped:
+                    self.policy.onDropped(vectorDataID)
+                self.recordDropped_(dropped)
+
+            result = self.droppedForLoader_[id(loader)]
+            self.droppedForLoader_[id(loader)] = set()
+            return result
+
+    def pin(self, vectorDataID):
+        with self.lock_:
+            self.policy.pin(vectorDataID)
+
+    def unpin(self, vectorDataID):
+        with self.lock_:
+            self.evict_(self.policy.unpin(vectorDataID))
+
+    def onPageLoaded(self, vectorDataID):
+        with self.lock_:
+            self.evict_(self.policy.onLoaded(vectorDataID, vectorDataID.page.bytecount))
+
+    def evict_(self, vectorDataIDs):
+        if not vectorDataIDs:
+            return
+
+        logging.info("ComputedValue RamCache evicting %s unpinned pages", len(vectorDataIDs))
+
+        dropped = [v for v in vectorDataIDs if self.vdm.dropPageWithoutWritingToDisk(v.page)]
+        if len(dropped) < len(vectorDataIDs):
+            logging.info(
+                "ComputedValue RamCache couldn't drop %s pages",
+                len(vectorDataIDs) - len(dropped)
+                )
+
+        self.recordDropped_(dropped)
+
+    def recordDropped_(self, vectorDataIDs):
+        for pending in self.droppedForLoader_.itervalues():
+            pending.update(vectorDataIDs)
+
+
 class CacheLoader(object):
     """mixin class holding the background cacheloading functionality"""
-    def __init__(self, callbackSchedulerFactory, callbackScheduler, ramCacheSize = None):
+    def __init__(self,
+                 callbackSchedulerFactory,
+                 callbackScheduler,
+                 ramCacheSize = None,
+                 vectorDataCache = None):
         self.callbackScheduler = callbackScheduler
         self.lock_ = threading.RLock()
         self.vectorDataIDRequestCount_ = {}
         self.vectorDataIDToVectorSlices_ = {}
-        self.vdm = VectorDataManager.constructVDM(callbackScheduler, ramCacheSize)
-        self.vdm.setDropUnreferencedPagesWhenFull(True)
 
-        self.ramCacheOffloadRecorder = CumulusNative.TrackingOfflineStorage(self.callbackScheduler)
-        self.vdm.setOfflineCache(self.ramCacheOffloadRecorder)
+        if vectorDataCache is None:
+            vectorDataCache = VectorDataCache(callbackScheduler, ramCacheSize)
+        self.vectorDataCache = vectorDataCache
+        self.vectorDataCache.registerLoader(self)
+        self.vdm = vectorDataCache.vdm
 
 
     def extractVectorDataAsPythonArray(self, vectorCGLocation, low, high):
@@ -93,6 +182,8 @@ class CacheLoader(object):
             )
 
     def onCacheLoad(self, vectorDataID):
+        self.vectorDataCache.onPageLoaded(vectorDataID)
+
         with self.lock_:
             if vectorDataID in self.vectorDataIDToVectorSlices_:
                 cgLocations = self.vectorDataIDToVectorSlices_[vectorDataID]
@@ -102,10 +193,13 @@ class CacheLoader(object):
             self.collectOffloadedVectors_()
 
             for cgLocation in cgLocations:
-                BackgroundUpdateQueue.push(self.createSetIsLoadedFun(cgLocation, self.computeVectorSliceIsLoaded_(cgLocation)))
+                BackgroundUpdateQueue.pushCoalesced(
+                    ('isLoaded', cgLocation),
+                    self.createSetIsLoadedFun(cgLocation, self.computeVectorSliceIsLoaded_(cgLocation))
+                    )
 
     def collectOffloadedVectors_(self):
-        offloaded = self.ramCacheOffloadRecorder.extractDropped()
+        offloaded = self.vectorDataCache.extractDropped(self)
 
         if offloaded:
             logging.info("ComputedValue RamCache dropped %s", offloaded)
@@ -113,20 +207,24 @@ class CacheLoader(object):
         for offloadedVecDataID in offloaded:
             if offloadedVecDataID in self.vectorDataIDToVectorSlices_:
                 for cgLocation in self.vectorDataIDToVectorSlices_[offloadedVecDataID]:
-                    BackgroundUpdateQueue.push(self.createSetIsLoadedFun(cgLocation, False))
+                    BackgroundUpdateQueue.pushCoalesced(('isLoaded', cgLocation), self.createSetIsLoadedFun(cgLocation, False))
 
         if offloaded:
             #check if there's anything we need to load
-            self.sendReloadRequests()
+            self.sendReloadRequests(offloaded)
 
     def createSetIsLoadedFun(self, cgLocation, newIsLoadedVal):
         def setLoadedFun():
             cgLocation.markLoaded(newIsLoadedVal)
         return setLoadedFun
 
-    def sendReloadRequests(self):
-        #TODO BUG brax: ComputedValue doesn't know how to resubmit cacheload requests for unloaded items
-        pass
+    def sendReloadRequests(self, vectorDataIDs):
+        """Request the pages in 'vectorDataIDs' again if a slice is still waiting on them."""
+        for vectorDataID in vectorDataIDs:
+            if vectorDataID in self.vectorDataIDRequestCount_ and \
+                    not self.computeVectorDataIDIsLoaded_(vectorDataID):
+                logging.info("ComputedValue RamCache reloading dropped page %s", vectorDataID)
+                self.cumulusGateway.requestCacheItem(vectorDataID)
 
     def setVectorLoadFlag_(self, vectorSlice):
         isLoaded = self.computeVectorSliceIsLoaded_(vectorSlice)
@@ -171,6 +269,7 @@ class CacheLoader(object):
             return
         else:
             self.vectorDataIDRequestCount_[vectorDataID] = 1
+            self.vectorDataCache.pin(vectorDataID)
 
         if not self.computeVectorDataIDIsLoaded_(vectorDataID):
             self.cumulusGateway.requestCacheItem(vectorDataID)
@@ -189,6 +288,7 @@ class CacheLoader(object):
         self.vectorDataIDRequestCount_[vectorDataID] -= 1
         if self.vectorDataIDRequestCount_[vectorDataID] == 0:
             del self.vectorDataIDRequestCount_[vectorDataID]
+            self.vectorDataCache.unpin(vectorDataID)
             self.vectorDataIDToVectorSlices_[vectorDataID].discard(vectorSlice)
             if not self.vectorDataIDToVectorSlices_[vectorDataID]:
                 del self.vectorDataIDToVectorSlices_[vectorDataID]
@@ -207,7 +307,11 @@ class CumulusComputedValueGateway(CacheLoader, ComputedValueGateway, Stoppable.S
 
     """
 
-    def __init__(self, callbackSchedulerFactory, callbackScheduler, cumulusGatewayFactory):
+    def __init__(self,
+                 callbackSchedulerFactory,
+                 callbackScheduler,
+                 cumulusGatewayFactory,
+                 vectorDataCache = None):
         self.callbackScheduler = callbackScheduler
         ComputedValueGateway.__init__(self)
 
@@ -217,7 +321,8 @@ class CumulusComputedValueGateway(CacheLoader, ComputedValueGateway, Stoppable.S
             self,
             callbackSchedulerFactory,
             callbackScheduler,
-            Setup.config().computedValueGatewayRAMCacheMB * 1024 * 1024
+            Setup.config().computedValueGatewayRAMCacheMB * 1024 * 1024,
+            vectorDataCache
             )
 
         logging.info("cumulusGatewayFactory is %s", cumulusGatewayFactory)
@@ -253,6 +358,7 @@ class CumulusComputedValueGateway(CacheLoader, ComputedValueGateway, Stoppable.S
         self.stop()
 
         self.cumulusGateway.teardown()
+        self.vectorDataCache.unregisterLoader(self)
 
         self.cumulusGateway = None
         self.vdm = None
@@ -268,7 +374,7 @@ class CumulusComputedValueGateway(CacheLoader, ComputedValueGateway, Stoppable.S
             ViewOfEntireCumulusSystem.ViewOfEntireCumulusSystem().viewOfSystem_ = json.toSimple()
             PersistentCacheIndex.PersistentCacheIndex().update()
 
-        BackgroundUpdateQueue.push(updater)
+        BackgroundUpdateQueue.pushCoalesced('viewOfEntireCumulusSystem', updater)
 
     def onExternalIoTaskCompleted(self, msg):
         taskGuid = msg.taskId.guid
@@ -307,7 +413,8 @@ class CumulusComputedValueGateway(CacheLoader, ComputedValueGateway, Stoppable.S
             self.finishedResultsForComputations[computationId] = (result, statistics)
             if computationId in self.computedValuesForComputations:
                 for compVal in self.computedValuesForComputations[computationId]:
-                    BackgroundUpdateQueue.push(
+                    BackgroundUpdateQueue.pushCoalesced(
+                        ('result', compVal),
                         self.valueUpdater(
                             compVal,
                             result,
@@ -322,7 +429,8 @@ class CumulusComputedValueGateway(CacheLoader, ComputedValueGateway, Stoppable.S
 
             if computationId in self.computedValuesForComputations:
                 for compVal in self.computedValuesForComputations[computationId]:
-                    BackgroundUpdateQueue.push(
+                    BackgroundUpdateQueue.pushCoalesced(
+                        ('cpuCounts', compVal),
                         self.cpuCountSetter_(
                             compVal,
                             computationSystemwideCpuAssignment
@@ -385,7 +493,8 @@ class CumulusComputedValueGateway(CacheLoader, ComputedValueGateway, Stoppable.S
                 if computationId in self.finishedResultsForComputations:
                     del self.finishedResultsForComputations[computationId]
                 for compVal in self.computedValuesForComputations[computationId]:
-                    BackgroundUpdateQueue.push(
+                    BackgroundUpdateQueue.pushCoalesced(
+                        ('result', compVal),
                         self.valueUpdater(
                             compVal,
                             None,
@@ -395,7 +504,7 @@ class CumulusComputedValueGateway(CacheLoader, ComputedValueGateway, Stoppable.S
 
             for vecId in self.vectorDataIDToVectorSlices_:
                 for cgLocation in self.vectorDataIDToVectorSlices_[vecId]:
-                    BackgroundUpdateQueue.push(self.createSetIsLoadedFun(cgLocation, False))
+                    BackgroundUpdateQueue.pushCoalesced(('isLoaded', cgLocation), self.createSetIsLoadedFun(cgLocation, False))
 
             self.vectorDataIDRequestCount_ = {}
             self.vectorDataIDToVectorSlices_ = {}
@@ -457,7 +566,8 @@ class CumulusComputedValueGateway(CacheLoader, ComputedValueGateway, Stoppable.S
 
             if computationId in self.finishedResultsForComputations:
                 result, statistics = self.finishedResultsForComputations[computationId]
-                BackgroundUpdateQueue.push(
+                BackgroundUpdateQueue.pushCoalesced(
+                    ('result', compValue),
                     self.valueUpdater(
                         compValue,
                         result,
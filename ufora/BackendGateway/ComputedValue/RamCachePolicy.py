@@ -0,0 +1,90 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Decides which downloaded pages the gateway keeps in RAM.
+
+Pages that some vector slice has an outstanding request on are pinned. When the pages
+we hold exceed 'maxBytes', unpinned pages are evicted in least-recently-used order.
+Pinned pages are never chosen, so a large download keeps the pages it's waiting on
+while finished pages make room for the rest.
+"""
+
+import collections
+
+
+class RamCachePolicy(object):
+    def __init__(self, maxBytes):
+        self.maxBytes = maxBytes
+        self.totalBytes = 0
+        self.evictionCount = 0
+
+        self.pinCounts_ = {}
+
+        #key -> bytecount of every resident page, least recently used first
+        self.resident_ = collections.OrderedDict()
+
+    def pin(self, key):
+        self.pinCounts_[key] = self.pinCounts_.get(key, 0) + 1
+
+    def unpin(self, key):
+        """Release one pin on 'key'. Returns the keys to evict."""
+        count = self.pinCounts_.get(key, 0) - 1
+        if count > 0:
+            self.pinCounts_[key] = count
+            return []
+
+        self.pinCounts_.pop(key, None)
+
+        if key in self.resident_:
+            #the page was just in use, so it's the last thing we'd want to evict
+            self.resident_[key] = self.resident_.pop(key)
+
+        return self.evictionCandidates_()
+
+    def isPinned(self, key):
+        return key in self.pinCounts_
+
+    def onLoaded(self, key, bytecount):
+        """Record that 'key' is resident and holds 'bytecount' bytes. Returns the keys to evict."""
+        self.totalBytes -= self.resident_.pop(key, 0)
+        self.resident_[key] = bytecount
+        self.totalBytes += bytecount
+
+        return self.evictionCandidates_()
+
+    def onDropped(self, key):
+        """Record that 'key' is no longer resident, whoever dropped it."""
+        self.totalBytes -= self.resident_.pop(key, 0)
+
+    def isResident(self, key):
+        return key in self.resident_
+
+    def evictionCandidates_(self):
+        bytesOver = self.totalBytes - self.maxBytes
+        if bytesOver <= 0:
+            return []
+
+        toEvict = []
+        for key, bytecount in self.resident_.iteritems():
+            if bytesOver <= 0:
+                break
+            if key not in self.pinCounts_:
+                toEvict.append(key)
+                bytesOver -= bytecount
+
+        for key in toEvict:
+            self.onDropped(key)
+        self.evictionCount += len(toEvict)
+
+        return toEvict
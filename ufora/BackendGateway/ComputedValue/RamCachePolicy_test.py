@@ -0,0 +1,79 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import unittest
+
+import ufora.BackendGateway.ComputedValue.RamCachePolicy as RamCachePolicy
+
+
+class RamCachePolicyTest(unittest.TestCase):
+    def test_evicts_least_recently_loaded(self):
+        policy = RamCachePolicy.RamCachePolicy(100)
+
+        self.assertEqual(policy.onLoaded('a', 40), [])
+        self.assertEqual(policy.onLoaded('b', 40), [])
+        self.assertEqual(policy.onLoaded('c', 40), ['a'])
+
+        self.assertFalse(policy.isResident('a'))
+        self.assertEqual(policy.totalBytes, 80)
+        self.assertEqual(policy.evictionCount, 1)
+
+    def test_pinned_pages_are_never_evicted(self):
+        policy = RamCachePolicy.RamCachePolicy(100)
+        policy.pin('a')
+        policy.pin('b')
+
+        policy.onLoaded('a', 60)
+        policy.onLoaded('b', 60)
+
+        #everything is pinned, so we're over budget until something is released
+        self.assertEqual(policy.totalBytes, 120)
+        self.assertEqual(policy.onLoaded('c', 10), ['c'])
+
+        self.assertEqual(policy.unpin('a'), ['a'])
+        self.assertTrue(policy.isResident('b'))
+        self.assertEqual(policy.totalBytes, 60)
+
+    def test_pins_are_counted(self):
+        policy = RamCachePolicy.RamCachePolicy(50)
+        policy.pin('a')
+        policy.pin('a')
+        policy.onLoaded('a', 60)
+
+        self.assertEqual(policy.unpin('a'), [])
+        self.assertTrue(policy.isPinned('a'))
+        self.assertEqual(policy.unpin('a'), ['a'])
+        self.assertFalse(policy.isPinned('a'))
+
+    def test_unpinned_pages_become_most_recently_used(self):
+        policy = RamCachePolicy.RamCachePolicy(100)
+        policy.pin('a')
+        policy.onLoaded('a', 40)
+        policy.onLoaded('b', 40)
+        policy.unpin('a')
+
+        self.assertEqual(policy.onLoaded('c', 40), ['b'])
+
+    def test_external_drops(self):
+        policy = RamCachePolicy.RamCachePolicy(100)
+        policy.onLoaded('a', 40)
+        policy.onDropped('a')
+        policy.onDropped('never loaded')
+
+        self.assertEqual(policy.totalBytes, 0)
+        self.assertFalse(policy.isResident('a'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,268 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""A pool of pre-started BackendGateway connection handlers.
+
+Starting a handler process costs seconds of imports and setup, so in pool mode the
+BackendGatewayService starts 'poolSize' handlers up front and hands each incoming
+client socket to the least loaded one. Every handler owns one end of a unix socketpair
+(its "control socket"). The service sends client sockets down the control socket as
+file descriptors (SCM_RIGHTS), and the handler answers with single byte notifications:
+
+    READY - the handler finished initializing and can accept connections
+    CLOSED - one of the connections the handler was given has finished
+
+A handler serves each connection it receives on its own thread, so all of the
+connections in one handler process share its caches.
+"""
+
+import logging
+import multiprocessing.reduction as reduction
+import os
+import pickle
+import socket
+import struct
+import threading
+import traceback
+
+import ufora.core.SubprocessRunner as SubprocessRunner
+import ufora.util.ManagedThread as ManagedThread
+
+READY = 'r'
+CLOSED = 'c'
+
+
+def sendSocket(controlSocket, sock):
+    """Pass the file descriptor of 'sock' to the process on the other end of 'controlSocket'."""
+    reduction.send_handle(controlSocket, sock.fileno(), None)
+
+
+def receiveSocket(controlSocket):
+    """Block until a socket arrives on 'controlSocket'. Returns None if the other end closed."""
+    try:
+        fd = reduction.recv_handle(controlSocket)
+    except (RuntimeError, OSError, socket.error):
+        return None
+
+    sock = socket.fromfd(fd, socket.AF_INET, socket.SOCK_STREAM)
+    os.close(fd)
+    return sock
+
+
+class PooledWorker(object):
+    """The service's view of one handler process in the pool."""
+    def __init__(self, process, controlSocket):
+        self.process = process
+        self.controlSocket = controlSocket
+        self.isReady = False
+        self.activeConnections = 0
+
+    def __str__(self):
+        return "PooledWorker(pid=%s, ready=%s, active=%s)" % (
+            self.process.pid,
+            self.isReady,
+            self.activeConnections
+            )
+
+
+class GatewayWorkerPool(object):
+    """Keeps 'poolSize' handler processes running and assigns client sockets to them.
+
+    'workerArguments' is the command line of a handler. Each handler is sent
+    'startupData' (plus the number of its control socket under 'controlFd') on stdin
+    as a length-prefixed pickle, the same way single-connection handlers are started.
+    """
+    def __init__(self, poolSize, workerArguments, startupData):
+        assert poolSize > 0
+        self.poolSize = poolSize
+        self.workerArguments = workerArguments
+        self.startupData = startupData
+
+        self._lock = threading.Lock()
+        self._workersChanged = threading.Condition(self._lock)
+        self.workers = []
+        self.controlThreads = []
+        self.isStopped = False
+
+    def start(self):
+        for _ in range(self.poolSize):
+            self.startWorker_()
+
+    def stop(self):
+        with self._lock:
+            self.isStopped = True
+            workers = list(self.workers)
+            self._workersChanged.notify_all()
+
+        #each control loop sees the shutdown and stops its handler process
+        for worker in workers:
+            try:
+                worker.controlSocket.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+
+        for thread in self.controlThreads:
+            thread.join()
+
+    def readyWorkerCount(self):
+        with self._lock:
+            return len([w for w in self.workers if w.isReady])
+
+    def dispatch(self, sock, timeout=None):
+        """Hand 'sock' to the least loaded ready handler.
+
+        Blocks until a handler is ready. Returns False if the pool stopped or 'timeout'
+        elapsed first. The caller still owns its copy of 'sock' and should close it.
+        """
+        with self._lock:
+            waited = 0.0
+            while not self.isStopped:
+                readyWorkers = [w for w in self.workers if w.isReady]
+                if readyWorkers:
+                    worker = min(readyWorkers, key=lambda w: w.activeConnections)
+                    try:
+                        sendSocket(worker.controlSocket, sock)
+                    except (OSError, socket.error):
+                        logging.warn("Failed to pass a socket to %s", worker)
+                        worker.isReady = False
+                        continue
+
+                    worker.activeConnections += 1
+                    logging.info("Passed a connection to %s", worker)
+                    return True
+
+                if timeout is not None and waited >= timeout:
+                    return False
+
+                self._workersChanged.wait(1.0)
+                waited += 1.0
+
+            return False
+
+    def startWorker_(self):
+        serviceSide, workerSide = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        #the handler inherits 'workerSide' under the same descriptor number
+        startupData = dict(self.startupData)
+        startupData['controlFd'] = workerSide.fileno()
+
+        pidHolder = [None]
+        def onStdOut(line):
+            logging.info("%s > %s", pidHolder[0], line)
+
+        def onStdErr(line):
+            logging.error("%s > %s", pidHolder[0], line)
+
+        process = SubprocessRunner.SubprocessRunner(self.workerArguments, onStdOut, onStdErr)
+        try:
+            process.start()
+        finally:
+            workerSide.close()
+        pidHolder[0] = process.pid
+
+        toWrite = pickle.dumps(startupData)
+        process.write(struct.pack('I', len(toWrite)))
+        process.write(toWrite)
+        process.flush()
+
+        worker = PooledWorker(process, serviceSide)
+        with self._lock:
+            self.workers.append(worker)
+
+        thread = ManagedThread.ManagedThread(target=self.controlLoop_, args=(worker,))
+        self.controlThreads.append(thread)
+        thread.start()
+
+        logging.info("Started %s", worker)
+
+    def controlLoop_(self, worker):
+        try:
+            while True:
+                notification = worker.controlSocket.recv(1)
+                if not notification:
+                    break
+
+                with self._lock:
+                    if notification == READY:
+                        worker.isReady = True
+                    elif notification == CLOSED:
+                        worker.activeConnections -= 1
+                    else:
+                        logging.error("Unknown notification %s from %s", repr(notification), worker)
+                    self._workersChanged.notify_all()
+        except socket.error:
+            pass
+        except:
+            logging.error("Error in the control loop of %s:\n%s", worker, traceback.format_exc())
+
+        with self._lock:
+            self.workers.remove(worker)
+            shouldReplace = not self.isStopped
+            self._workersChanged.notify_all()
+
+        worker.controlSocket.close()
+        worker.process.stop()
+
+        if shouldReplace:
+            logging.error(
+                "%s exited with %s connections open. Starting a replacement.",
+                worker,
+                worker.activeConnections
+                )
+            self.startWorker_()
+
+
+class PoolWorkerConnection(object):
+    """The handler's end of the control socket."""
+    def __init__(self, controlFd):
+        self.controlSocket = socket.fromfd(controlFd, socket.AF_UNIX, socket.SOCK_STREAM)
+        os.close(controlFd)
+        self.writeLock = threading.Lock()
+
+    def notify_(self, notification):
+        with self.writeLock:
+            self.controlSocket.sendall(notification)
+
+    def serve(self, handleSocket):
+        """Call 'handleSocket' on its own thread for every socket the pool sends.
+
+        Returns once the pool closes the control socket.
+        """
+        self.notify_(READY)
+
+        while True:
+            sock = receiveSocket(self.controlSocket)
+            if sock is None:
+                logging.info("Worker pool closed the control socket.")
+                return
+
+            ManagedThread.ManagedThread(
+                target=self.handleAndNotify_,
+                args=(handleSocket, sock)
+                ).start()
+
+    def handleAndNotify_(self, handleSocket, sock):
+        try:
+            handleSocket(sock)
+        except:
+            logging.error("Error handling a pooled connection:\n%s", traceback.format_exc())
+        finally:
+            try:
+                sock.close()
+            except socket.error:
+                pass
+            try:
+                self.notify_(CLOSED)
+            except socket.error:
+                pass
@@ -0,0 +1,117 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import os
+import signal
+import socket
+import sys
+import time
+import unittest
+
+import ufora.BackendGateway.GatewayWorkerPool as GatewayWorkerPool
+
+#a handler that answers every connection with its pid and then echoes one message
+echoWorkerScript = """
+import os, pickle, struct, sys
+import ufora.BackendGateway.GatewayWorkerPool as GatewayWorkerPool
+
+size = struct.unpack('I', sys.stdin.read(struct.calcsize('I')))[0]
+data = pickle.loads(sys.stdin.read(size))
+
+def echo(sock):
+    sock.sendall('%s %s\\n' % (data['greeting'], os.getpid()))
+    sock.sendall(sock.recv(1024))
+
+GatewayWorkerPool.PoolWorkerConnection(data['controlFd']).serve(echo)
+"""
+
+def waitUntil(predicate, timeout=10.0):
+    t0 = time.time()
+    while not predicate():
+        if time.time() - t0 > timeout:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class GatewayWorkerPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.bind(('127.0.0.1', 0))
+        self.listener.listen(10)
+
+        self.pool = GatewayWorkerPool.GatewayWorkerPool(
+            2,
+            [sys.executable, '-c', echoWorkerScript],
+            {'greeting': 'hello'}
+            )
+        self.pool.start()
+        self.assertTrue(waitUntil(lambda: self.pool.readyWorkerCount() == 2))
+
+    def tearDown(self):
+        self.pool.stop()
+        self.listener.close()
+
+    def connect(self):
+        """Open a client connection and pass the server side of it to the pool."""
+        client = socket.create_connection(self.listener.getsockname())
+        server, _ = self.listener.accept()
+        try:
+            self.assertTrue(self.pool.dispatch(server, timeout=10.0))
+        finally:
+            server.close()
+        return client, client.makefile()
+
+    def test_passes_sockets_to_workers(self):
+        client, clientFile = self.connect()
+
+        greeting, pid = clientFile.readline().split()
+        self.assertEqual(greeting, 'hello')
+        self.assertIn(int(pid), [w.process.pid for w in self.pool.workers])
+
+        client.sendall('ping')
+        self.assertEqual(client.recv(4), 'ping')
+
+    def test_spreads_connections_across_workers(self):
+        connections = [self.connect() for _ in range(4)]
+        pids = [clientFile.readline().split()[1] for _, clientFile in connections]
+
+        self.assertEqual(len(set(pids)), 2)
+        self.assertEqual(sorted(pids.count(pid) for pid in set(pids)), [2, 2])
+
+        for client, _ in connections:
+            client.sendall('x')
+            client.recv(1)
+
+        self.assertTrue(
+            waitUntil(lambda: all(w.activeConnections == 0 for w in self.pool.workers))
+            )
+
+    def test_replaces_dead_workers(self):
+        deadPid = self.pool.workers[0].process.pid
+        os.kill(deadPid, signal.SIGKILL)
+
+        self.assertTrue(
+            waitUntil(
+                lambda: self.pool.readyWorkerCount() == 2 and
+                deadPid not in [w.process.pid for w in self.pool.workers]
+                )
+            )
+
+        _, clientFile = self.connect()
+        self.assertNotEqual(int(clientFile.readline().split()[1]), deadPid)
+
+
+if __name__ == "__main__":
+    unittest.main()
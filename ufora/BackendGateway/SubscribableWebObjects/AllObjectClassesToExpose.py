@@ -37,6 +37,7 @@ classMap = {
     "PersistentCacheIndex": PersistentCacheIndex.PersistentCacheIndex,
     "PyforaObjectConverter": PyforaObjectConverter.PyforaObjectConverter,
     "PyforaComputedValue": PyforaComputedValue.PyforaComputedValue,
+    "PyforaComputedValueBatch": PyforaComputedValue.PyforaComputedValueBatch,
     "WriteToS3Task": WriteToS3Task.WriteToS3Task,
     "PyforaDictionaryElement": PyforaComputedValue.PyforaDictionaryElement,
     "PyforaTupleElement": PyforaComputedValue.PyforaTupleElement,
@@ -19,6 +19,8 @@ import traceback
 import time
 
 import ufora.BackendGateway.SubscribableWebObjects.MessageProcessor as MessageProcessor
+import pyfora
+import pyfora.MsgpackFraming as MsgpackFraming
 
 import ufora.cumulus.distributed.CumulusActiveMachines as CumulusActiveMachines
 import ufora.cumulus.distributed.CumulusGatewayRemote as CumulusGatewayRemote
@@ -26,12 +28,31 @@ import ufora.BackendGateway.ComputedValue.ComputedValueGateway as ComputedValueG
 
 GRAPH_UPDATE_TIME = .1
 
+def decodeMsgpackRequest(message):
+    if not message:
+        return None
+    try:
+        return MsgpackFraming.decodeRequest(message)
+    except Exception as e:
+        raise MessageProcessor.MalformedMessageException(
+            "Failed to decode msgpack message: %s" % e
+            )
+
+
 class ConnectionHandler:
     """ConnectionHandler - adapts the MessageProcessor for use with TCP channels."""
-    def __init__(self, callbackScheduler, sharedStateViewFactory, channelFactoryFactory):
+    def __init__(self,
+                 callbackScheduler,
+                 sharedStateViewFactory,
+                 channelFactoryFactory,
+                 vectorDataCache=None):
+        """'vectorDataCache', if not None, is a ComputedValueGateway.VectorDataCache shared
+        by every connection this handler services. Otherwise each connection downloads
+        pages into its own cache."""
         self.callbackScheduler = callbackScheduler
         self.sharedStateViewFactory = sharedStateViewFactory
         self.channelFactoryFactory = channelFactoryFactory
+        self.vectorDataCache = vectorDataCache
 
         self.lock = threading.Lock()
         self.activeCount = 0
@@ -39,10 +60,42 @@ class ConnectionHandler:
     def stopService(self):
         pass
 
+    def acceptMsgpackConnection(self, jsonRequest, channel):
+        """Perform the handshake that the socket.io relay does on behalf of other clients."""
+        if not MsgpackFraming.isAvailable():
+            logging.error("Rejecting msgpack connection: the msgpack package is not installed")
+            return False
+
+        clientVersion = jsonRequest.get('version')
+        if clientVersion != pyfora.__version__:
+            logging.warn("Rejecting connection due to version mismatch: %s", clientVersion)
+            channel.write(
+                MsgpackFraming.encode(
+                    "Version mismatch. Server: '%s', Client: '%s'" % (pyfora.__version__, clientVersion)
+                    )
+                )
+            return False
+
+        channel.write(MsgpackFraming.encode(MsgpackFraming.HANDSHAKE_OK))
+        return True
+
     def serviceIncomingChannel(self, jsonRequest, channel):
         logging.info("Initiating ConnectionHandler: %s", jsonRequest)
         t0 = time.time()
 
+        encoding = jsonRequest.get('encoding')
+        if encoding == MsgpackFraming.ENCODING:
+            if not self.acceptMsgpackConnection(jsonRequest, channel):
+                channel.disconnect()
+                return
+            encodeResponse = MsgpackFraming.encode
+        elif encoding is None:
+            encodeResponse = json.dumps
+        else:
+            logging.error("Unsupported connection encoding: %s", encoding)
+            channel.disconnect()
+            return
+
         def createCumulusComputedValueGateway():
             def createCumulusGateway(callbackScheduler, vdm):
                 result = CumulusGatewayRemote.RemoteGateway(
@@ -58,13 +111,15 @@ class ConnectionHandler:
             return ComputedValueGateway.CumulusComputedValueGateway(
                 self.callbackScheduler.getFactory(),
                 self.callbackScheduler,
-                createCumulusGateway
+                createCumulusGateway,
+                self.vectorDataCache
                 )
 
         messageProcessor = MessageProcessor.MessageProcessor(
             self.callbackScheduler,
             self.sharedStateViewFactory,
-            createCumulusComputedValueGateway
+            createCumulusComputedValueGateway,
+            vdm=self.vectorDataCache.vdm if self.vectorDataCache is not None else None
             )
 
         logging.info("Initialized MessageProcessor in %s seconds", time.time() - t0)
@@ -77,7 +132,12 @@ class ConnectionHandler:
             with messageProcessor:
                 while True:
                     message = channel.getTimeout(GRAPH_UPDATE_TIME)
-                    responses = messageProcessor.handleIncomingMessage(message)
+                    if encoding == MsgpackFraming.ENCODING:
+                        responses = messageProcessor.handleDecodedMessage(
+                            decodeMsgpackRequest(message)
+                            )
+                    else:
+                        responses = messageProcessor.handleIncomingMessage(message)
                     responses += messageProcessor.extractPendingMessages()
 
                     if messageProcessor.isDisconnectedFromSharedState():
@@ -86,7 +146,7 @@ class ConnectionHandler:
 
                     for jsonMessage in responses:
                         try:
-                            channel.write(json.dumps(jsonMessage))
+                            channel.write(encodeResponse(jsonMessage))
                         except:
                             logging.error(
                                 "error writing response message: %s\n%s",
@@ -0,0 +1,107 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""A bounded LRU cache of computation results that have already been encoded for clients.
+
+Encoding a large result (and pulling its vectors out of the VDM) is expensive, and popular
+results get downloaded many times. Entries are keyed by the caller (e.g. by the hash of the
+computed value and the encoding parameters) and charged the number of bytes the encoder
+reported, so the cache holds at most 'maxBytes' worth of encoded results.
+"""
+
+import collections
+import threading
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class EncodedResultCache(object):
+    def __init__(self, maxBytes=DEFAULT_MAX_BYTES):
+        self.maxBytes = maxBytes
+        self.bytesUsed = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        #key -> (value, bytecount), least recently used first
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the value cached under 'key' (marking it as recently used), or None."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, bytecount):
+        """Cache 'value', which occupies roughly 'bytecount' bytes, under 'key'.
+
+        Values larger than the whole cache are not stored.
+        """
+        with self._lock:
+            existing = self._entries.pop(key, None)
+            if existing is not None:
+                self.bytesUsed -= existing[1]
+
+            if bytecount > self.maxBytes:
+                return
+
+            self._entries[key] = (value, bytecount)
+            self.bytesUsed += bytecount
+            self._evictUntilWithinBudget()
+
+    def setMaxBytes(self, maxBytes):
+        with self._lock:
+            self.maxBytes = maxBytes
+            self._evictUntilWithinBudget()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytesUsed = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytesUsed': self.bytesUsed,
+                'maxBytes': self.maxBytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+                }
+
+    def _evictUntilWithinBudget(self):
+        while self.bytesUsed > self.maxBytes:
+            _, (_, bytecount) = self._entries.popitem(last=False)
+            self.bytesUsed -= bytecount
+            self.evictions += 1
+
+
+_cache = None
+_cacheLock = threading.Lock()
+
+def getCache():
+    """The cache shared by every connection handled by this process."""
+    global _cache
+    with _cacheLock:
+        if _cache is None:
+            _cache = EncodedResultCache()
+        return _cache
@@ -0,0 +1,71 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import unittest
+
+import ufora.BackendGateway.SubscribableWebObjects.EncodedResultCache as EncodedResultCache
+
+
+class EncodedResultCacheTest(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = EncodedResultCache.EncodedResultCache(maxBytes=100)
+
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', {'result': 1}, 10)
+        self.assertEqual(cache.get('a'), {'result': 1})
+
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['bytesUsed'], 10)
+        self.assertEqual(stats['entries'], 1)
+
+    def test_evicts_least_recently_used(self):
+        cache = EncodedResultCache.EncodedResultCache(maxBytes=100)
+        cache.put('a', 'a', 40)
+        cache.put('b', 'b', 40)
+
+        #touching 'a' makes 'b' the eviction candidate
+        cache.get('a')
+        cache.put('c', 'c', 40)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'a')
+        self.assertEqual(cache.get('c'), 'c')
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertEqual(cache.stats()['bytesUsed'], 80)
+
+    def test_replacing_and_oversized_values(self):
+        cache = EncodedResultCache.EncodedResultCache(maxBytes=100)
+        cache.put('a', 'a', 40)
+        cache.put('a', 'a2', 50)
+        self.assertEqual(cache.stats()['bytesUsed'], 50)
+
+        cache.put('big', 'big', 101)
+        self.assertIsNone(cache.get('big'))
+        self.assertEqual(cache.get('a'), 'a2')
+
+    def test_shrinking_evicts(self):
+        cache = EncodedResultCache.EncodedResultCache(maxBytes=100)
+        for key in range(5):
+            cache.put(key, key, 20)
+
+        cache.setMaxBytes(50)
+        self.assertEqual(cache.stats()['entries'], 2)
+        self.assertEqual(cache.get(4), 4)
+        self.assertIsNone(cache.get(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
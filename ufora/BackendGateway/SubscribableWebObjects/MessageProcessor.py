@@ -30,6 +30,8 @@ import ufora.BackendGateway.ComputedGraph.ComputedGraph as ComputedGraph
 import ufora.FORA.VectorDataManager.VectorDataManager as VectorDataManager
 
 import ufora.BackendGateway.SubscribableWebObjects.AllObjectClassesToExpose as AllObjectClassesToExpose
+import ufora.BackendGateway.SubscribableWebObjects.ObjectClassesToExpose.PyforaObjectConverter \
+    as PyforaObjectConverter
 import ufora.BackendGateway.SubscribableWebObjects.Exceptions as Exceptions
 import ufora.BackendGateway.SubscribableWebObjects.Decorators as Decorators
 import ufora.BackendGateway.SubscribableWebObjects.Subscriptions as Subscriptions
@@ -215,7 +217,8 @@ class MessageProcessor(object):
     def __init__(self,
                  callbackScheduler,
                  sharedStateViewFactory,
-                 computedValueGatewayFactory):
+                 computedValueGatewayFactory,
+                 vdm=None):
         self.lock = threading.Lock()
         self.cacheLoadEvents = {}
 
@@ -240,9 +243,11 @@ class MessageProcessor(object):
         self.incomingObjectCache = IncomingObjectCache()
         self.outgoingObjectCache = OutgoingObjectCache()
 
-        self.VDM = VectorDataManager.constructVDM(callbackScheduler)
-        self.VDM.setDropUnreferencedPagesWhenFull(True)
-        logging.info("created a VDM")
+        if vdm is None:
+            vdm = VectorDataManager.constructVDM(callbackScheduler)
+            vdm.setDropUnreferencedPagesWhenFull(True)
+            logging.info("created a VDM")
+        self.VDM = vdm
 
         logging.info("got shared state view factory: %s", sharedStateViewFactory)
 
@@ -297,10 +302,9 @@ class MessageProcessor(object):
         try:
             if message:
                 jsonMessage = json.loads(message, object_hook=Unicode.convertToStringRecursively)
-                responses = self.handleJsonMessage(jsonMessage)
-                responses += self.tryFlushObjectIdCache()
+                responses = self.handleDecodedMessage(jsonMessage)
             else:
-                responses = self.updateGraphAndReturnMessages()
+                responses = self.handleDecodedMessage(None)
 
         except UnicodeEncodeError as err:
             self.expectedMessageId += 1
@@ -316,6 +320,19 @@ class MessageProcessor(object):
         return responses
 
 
+    def handleDecodedMessage(self, message):
+        """Handle a message that has already been decoded by the transport.
+
+        A 'message' of None means no message arrived and the graph should be updated.
+        """
+        if message is None:
+            return self.updateGraphAndReturnMessages()
+
+        responses = self.handleJsonMessage(message)
+        responses += self.tryFlushObjectIdCache()
+        return responses
+
+
     def handleJsonMessage(self, incomingJsonMessage):
         if not isinstance(incomingJsonMessage, dict):
             raise MalformedMessageException(
@@ -553,7 +570,8 @@ class MessageProcessor(object):
 
         value, otherSubscriptionChanges = self.subscriptions.addSubscription(
             jsonMessage['messageId'],
-            getValueFun
+            getValueFun,
+            acceptsDeltas=jsonMessage.get('acceptsDeltas', False)
             )
 
         if isinstance(value, Exceptions.SubscribableWebObjectsException):
@@ -562,7 +580,7 @@ class MessageProcessor(object):
             valueResponseJson = {
                 "messageId": jsonMessage["messageId"],
                 "responseType": "SubscribeResponse",
-                "value": self.outgoingObjectCache.convertResponseToJson(fieldFun(objectToRead))
+                "value": self.outgoingObjectCache.convertResponseToJson(value)
                 }
 
         return ([valueResponseJson] +
@@ -573,7 +591,7 @@ class MessageProcessor(object):
         result = []
 
         for messageId in changedSubscriptionIds:
-            value = self.subscriptions.getValueAndDropSubscription(messageId)
+            value, delta = self.subscriptions.getValueAndDeltaAndDropSubscription(messageId)
 
             try:
                 if isinstance(value, Exceptions.SubscribableWebObjectsException):
@@ -582,6 +600,12 @@ class MessageProcessor(object):
                         "responseType": "Exception",
                         "message": value.message
                         }
+                elif delta is not None:
+                    valueResponseJson = {
+                        "messageId": messageId,
+                        "responseType": "ValueChanged",
+                        "delta": self.outgoingObjectCache.convertResponseToJson(delta)
+                        }
                 else:
                     valueResponseJson = {
                         "messageId": messageId,
@@ -680,6 +704,7 @@ class MessageProcessor(object):
     def teardown(self):
         self.synchronizer.flush()
         self.computedValueGateway.teardown()
+        PyforaObjectConverter.discardConnection(self.graph)
         self.synchronizer = None
         self.graph = None
         self.computedValueGateway = None
@@ -22,6 +22,7 @@ import ufora.BackendGateway.SubscribableWebObjects.ObjectClassesToExpose.PyforaT
     as PyforaToJsonTransformer
 import ufora.BackendGateway.SubscribableWebObjects.ObjectClassesToExpose.PyforaObjectConverter \
     as PyforaObjectConverter
+import ufora.BackendGateway.SubscribableWebObjects.EncodedResultCache as EncodedResultCache
 import ufora.native.FORA as ForaNative
 import ufora.BackendGateway.ComputedValue.ComputedValueGateway as ComputedValueGateway
 
@@ -29,6 +30,12 @@ def validateObjectIds(ids):
     converter = PyforaObjectConverter.PyforaObjectConverter()
     return all([converter.hasObjectId(i) for i in ids if isinstance(i, int)])
 
+def validateBatchArgIds(argIdsList):
+    return argIdsList is None or all(validateObjectIds(argIds) for argIds in argIdsList)
+
+def validateEncoding(encoding):
+    return encoding is None or encoding in PyforaToJsonTransformer.ALL_ENCODINGS
+
 class PyforaComputedValue(ComputedValue.ComputedValue):
     argIds = ComputedGraph.Key(object, default=None, validator=validateObjectIds)
 
@@ -193,6 +200,53 @@ class PyforaComputedValue(ComputedValue.ComputedValue):
         else:
             return None
 
+class PyforaComputedValueBatch(ComputedGraph.Location):
+    """A group of PyforaComputedValues that are created, prioritized and watched together.
+
+    This lets a client run many computations with a fixed number of messages rather than
+    a few round trips per computation.
+    """
+    #a sequence of 'argIds', one for each PyforaComputedValue in the batch
+    argIdsList = ComputedGraph.Key(object, default=None, validator=validateBatchArgIds)
+
+    def computedValues(self):
+        return tuple(PyforaComputedValue(argIds=tuple(argIds)) for argIds in self.argIdsList)
+
+    @ComputedGraph.ExposedProperty()
+    def submittedComputedValues(self):
+        """The PyforaComputedValues of the batch, in order, or None until they've all been submitted."""
+        for computedValue in self.computedValues:
+            if computedValue.submittedComputationId is None:
+                return None
+        return self.computedValues
+
+    @ComputedGraph.ExposedFunction()
+    def increaseRequestCount(self, *args):
+        for computedValue in self.computedValues:
+            computedValue.increaseRequestCount()
+
+    @ComputedGraph.ExposedFunction()
+    def cancel(self, *args):
+        for computedValue in self.computedValues:
+            computedValue.cancel()
+
+    @ComputedGraph.ExposedProperty()
+    def jsonStatusRepresentations(self):
+        """A dict {str(index): jsonStatusRepresentation} of the finished computations in the batch.
+
+        This is a dict so that subscribers are sent deltas holding only the statuses that
+        changed, rather than every status each time another computation finishes.
+        """
+        result = {}
+        for index, computedValue in enumerate(self.computedValues):
+            jsonStatus = computedValue.jsonStatusRepresentation
+            if jsonStatus is not None:
+                result[str(index)] = jsonStatus
+        return result
+
+    def __str__(self):
+        return "PyforaComputedValueBatch(%s computations)" % len(self.argIdsList)
+
 class PyforaResultAsJson(ComputedGraph.Location):
     #the value to extract
     computedValue = object
@@ -202,6 +256,10 @@ class PyforaResultAsJson(ComputedGraph.Location):
     #fixed byte overhead for every object because of the json encoding
     maxBytecount = object
 
+    #the encoding the client wants for homogenous lists. One of
+    #PyforaToJsonTransformer.ALL_ENCODINGS, or None for the default json encoding.
+    encoding = ComputedGraph.Key(object, default=None, validator=validateEncoding)
+
     @ComputedGraph.ExposedProperty()
     def resultIsPopulated(self):
         return self.getResultAsJson() is not None
@@ -215,6 +273,30 @@ class PyforaResultAsJson(ComputedGraph.Location):
         if self.computedValue.valueIVC is None:
             return None
 
+        #finished results never change, so everyone downloading a result with the same
+        #limits and encoding can share one encoding of it
+        cache = EncodedResultCache.getCache()
+        cacheKey = (self.computedValue.hash, self.maxBytecount, self.encoding)
+
+        result = cache.get(cacheKey)
+        if result is not None:
+            return result
+
+        transformer = PyforaToJsonTransformer.PyforaToJsonTransformer(
+            self.maxBytecount,
+            self.encoding
+            )
+
+        result = self.encodeResultAsJson(transformer)
+
+        if result is not None:
+            cache.put(cacheKey, result, transformer.bytesEncoded)
+
+        return result
+
+    @ComputedGraph.Function
+    def encodeResultAsJson(self, transformer):
+        """Encode the result using 'transformer', or None if some of its data isn't loaded yet."""
         value = self.computedValue.valueIVC
 
         if self.computedValue.isException:
@@ -226,8 +308,6 @@ class PyforaResultAsJson(ComputedGraph.Location):
 
         #ask the objectConverter to convert this python object to something
         #we can send back to the server as json
-        transformer = PyforaToJsonTransformer.PyforaToJsonTransformer(self.maxBytecount)
-
         try:
             def extractVectorContents(vectorIVC):
                 if len(vectorIVC) == 0:
@@ -270,19 +350,15 @@ class PyforaResultAsJson(ComputedGraph.Location):
 
                 #see if it's simple enough to transmit as numpy data
                 if res is None and len(vectorIVC.getVectorElementsJOR()) == 1 and len(vectorIVC) > 1:
-                    res = vecSlice.extractVectorDataAsNumpyArrayInChunks()
+                    res = vecSlice.extractVectorDataAsNumpyArrayPipelined()
+
+                    if res is None and vecSlice.pipelinedDownloadIsInProgress():
+                        #the slice has requested its pages, and we'll be recomputed as they arrive
+                        return None
 
                     if res is not None:
-                        firstElement = vecSlice.extractVectorItemAsIVC(0)
-                        if firstElement is None:
-                            #note we can't import this at the top of the file because this file gets imported
-                            #during the build process, which doesn't have pyfora installed.
-                            import pyfora.Exceptions as Exceptions
-                            raise Exceptions.ForaToPythonConversionError(
-                                "Shouldn't be possible to download data as numpy, and then not get the first value"
-                                )
-
-                        res = {'firstElement': firstElement, 'contentsAsNumpyArrays': res}
+                        firstElement, chunks = res
+                        res = {'firstElement': firstElement, 'contentsAsNumpyArrays': chunks}
                     else:
                         if not vecSlice.vdmThinksIsLoaded():
                             #there's a race condition where the data could be loaded between now and
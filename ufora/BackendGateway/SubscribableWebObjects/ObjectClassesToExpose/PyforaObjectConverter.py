@@ -19,20 +19,29 @@ import traceback
 import ufora.BackendGateway.SubscribableWebObjects.Exceptions as Exceptions
 import ufora.BackendGateway.ComputedGraph.ComputedGraph as ComputedGraph
 import ufora.BackendGateway.ComputedValue.ComputedValueGateway as ComputedValueGateway
+import ufora.BackendGateway.SubscribableWebObjects.PyforaConverterSession as PyforaConverterSession
 import ufora.FORA.python.ModuleDirectoryStructure as ModuleDirectoryStructure
 
-#global variables to hold the state of the converter. This is OK because
-#the PyforaObjectConverter is a singleton
-objectIdToIvc_ = {}
-converter_ = [None]
-objectRegistry_ = [None]
+#the converter state of each connection, keyed by the connection's ComputedGraph. The
+#PyforaObjectConverter is a singleton within a graph, but a pooled gateway process
+#serves several connections, each with its own graph.
+sessions_ = PyforaConverterSession.PyforaConverterSessions()
+
+def currentSession():
+    session = sessions_.get(ComputedGraph.currentGraph())
+    if session is None:
+        raise Exceptions.InternalError("The PyforaObjectConverter has not been initialized")
+    return session
+
+def discardConnection(graph):
+    """Drop the converter state of the connection that owns 'graph'."""
+    sessions_.discard(graph)
 
 class PyforaObjectConverter(ComputedGraph.Location):
     @ComputedGraph.ExposedFunction(expandArgs=True)
     def initialize(self, purePythonMDSAsJson):
         """Initialize the converter assuming a set of pyfora builtins"""
         try:
-            import pyfora.ObjectRegistry as ObjectRegistry
             import ufora.FORA.python.PurePython.Converter as Converter
             import ufora.FORA.python.PurePython.PyforaSingletonAndExceptionConverter as PyforaSingletonAndExceptionConverter
             import ufora.native.FORA as ForaNative
@@ -41,10 +50,8 @@ class PyforaObjectConverter(ComputedGraph.Location):
 
             logging.info("Initializing the PyforaObjectConverter")
 
-            objectRegistry_[0] = ObjectRegistry.ObjectRegistry()
-
             if purePythonMDSAsJson is None:
-                converter_[0] = Converter.Converter()
+                converter = Converter.Converter()
             else:
                 purePythonModuleImplval = ModuleImporter.importModuleFromMDS(
                     ModuleDirectoryStructure.ModuleDirectoryStructure.fromJson(purePythonMDSAsJson),
@@ -85,7 +92,7 @@ class PyforaObjectConverter(ComputedGraph.Location):
 
                 foraBuiltinsImplVal = ModuleImporter.builtinModuleImplVal()
 
-                converter_[0] = Converter.Converter(
+                converter = Converter.Converter(
                     nativeListConverter=nativeListConverter,
                     nativeTupleConverter=nativeTupleConverter,
                     nativeDictConverter=nativeDictConverter,
@@ -95,68 +102,90 @@ class PyforaObjectConverter(ComputedGraph.Location):
                     purePythonModuleImplVal=purePythonModuleImplval,
                     foraBuiltinsImplVal=foraBuiltinsImplVal
                     )
+
+            #the registry, the converted values and the content hashes are all replaced
+            #together, so that a content hash never refers to an object we no longer hold
+            sessions_.set(
+                ComputedGraph.currentGraph(),
+                PyforaConverterSession.PyforaConverterSession(converter)
+                )
         except:
             logging.critical("Failed to initialize the PyforaObjectConverter: %s", traceback.format_exc())
             raise
 
     @ComputedGraph.Function
     def hasObjectId(self, objectId):
-        return objectId in objectIdToIvc_
+        return objectId in currentSession().objectIdToIvc
 
     @ComputedGraph.Function
     def getIvcFromObjectId(self, objectId):
-        return objectIdToIvc_[objectId]
+        return currentSession().objectIdToIvc[objectId]
 
     @ComputedGraph.Function
     def unwrapPyforaDictToDictOfAssignedVars(self, dictIVC):
         """Take a Pyfora dictionary, and return a dict {string->IVC}. Returns None if not possible."""
-        return converter_[0].unwrapPyforaDictToDictOfAssignedVars(dictIVC)
+        return currentSession().converter.unwrapPyforaDictToDictOfAssignedVars(dictIVC)
 
     @ComputedGraph.Function
     def unwrapPyforaTupleToTuple(self, tupleIVC):
         """Take a Pyfora tuple, and return a tuple {IVC}. Returns None if not possible."""
-        return converter_[0].unwrapPyforaTupleToTuple(tupleIVC)
+        return currentSession().converter.unwrapPyforaTupleToTuple(tupleIVC)
 
     @ComputedGraph.ExposedFunction(expandArgs=True)
-    def convert(self, objectId, objectIdToObjectDefinition):
-        import pyfora.TypeDescription as TypeDescription
+    def convert(self,
+                objectId,
+                objectIdToObjectDefinition,
+                objectIdToContentHash=None,
+                dependentObjectIdsToExpose=None):
+        """Convert 'objectId' to FORA.
+
+        objectIdToObjectDefinition - serialized definitions of the objects 'objectId' depends on
+            that we haven't seen yet.
+        objectIdToContentHash - content hashes (see pyfora.TypeDescription.contentHash) of
+            cacheable definitions. Definitions that are omitted from objectIdToObjectDefinition
+            are resolved by hash against content we received earlier.
+        dependentObjectIdsToExpose - objectIds that 'objectId' depends on which should also
+            be usable as computation arguments, as if each had been converted on its own.
+        """
         import pyfora.Exceptions as PyforaExceptions
 
-        result = [None]
-        def onConverted(r):
-            result[0] = r
-
         t0 = time.time()
 
-        objectRegistry_[0].objectIdToObjectDefinition.update({
-            int(k): TypeDescription.deserialize(v)
-            for k, v in objectIdToObjectDefinition.iteritems()
-            })
+        objectIdToObjectDefinition = {
+            int(k): v for k, v in objectIdToObjectDefinition.iteritems()
+            }
+        objectIdToContentHash = {
+            int(k): v for k, v in (objectIdToContentHash or {}).iteritems()
+            }
+
+        unknownContentHashes = currentSession().defineObjects(
+            objectIdToObjectDefinition,
+            objectIdToContentHash
+            )
+        if unknownContentHashes:
+            return {'unknownContentHashes': unknownContentHashes}
 
         logging.info("Updated object registry in %s seconds.", time.time() - t0)
         t0 = time.time()
 
         try:
-            converter_[0].convert(objectId, objectRegistry_[0], onConverted)
+            result = currentSession().convert(objectId, dependentObjectIdsToExpose)
         except Exception as e:
             logging.error("Converter raised an exception: %s", traceback.format_exc())
             raise Exceptions.InternalError("Unable to convert objectId %s" % objectId)
 
         logging.info("Converted to fora in %s seconds", time.time() - t0)
 
-        assert result[0] is not None
-
-        if isinstance(result[0], PyforaExceptions.PythonToForaConversionError):
-            return {'isException': True, 'message': result[0].message, 'trace': result[0].trace}
+        if isinstance(result, PyforaExceptions.PythonToForaConversionError):
+            return {'isException': True, 'message': result.message, 'trace': result.trace}
 
-        if isinstance(result[0], Exception):
-            raise Exceptions.SubscribableWebObjectsException(result[0].message)
+        if isinstance(result, Exception):
+            raise Exceptions.SubscribableWebObjectsException(result.message)
 
-        objectIdToIvc_[objectId] = result[0]
         return {'objectId': objectId}
 
     @ComputedGraph.Function
     def transformPyforaImplval(self, result, transformer, vectorContentsExtractor):
-        return converter_[0].transformPyforaImplval(result, transformer, vectorContentsExtractor)
+        return currentSession().converter.transformPyforaImplval(result, transformer, vectorContentsExtractor)
 
 
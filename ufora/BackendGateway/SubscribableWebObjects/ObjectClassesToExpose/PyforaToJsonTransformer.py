@@ -20,11 +20,34 @@ class HaltTransformationException(Exception):
 
 ASSUMED_OBJECT_BYTECOUNT_OVERHEAD = 20
 
+#encodings a client may request for a result. 'json' describes homogenous lists as a
+#sequence of base64 chunks with a pickled dtype. 'binary' sends a single raw typed buffer per list, described
+#by a plain numpy dtype string, which the client can adopt directly as a numpy array.
+ENCODING_JSON = 'json'
+ENCODING_BINARY = 'binary'
+
+ALL_ENCODINGS = (ENCODING_JSON, ENCODING_BINARY)
+
+def encodedBytecount(rawBytecount):
+    """The number of bytes 'rawBytecount' bytes occupy once base64 encoded."""
+    return (rawBytecount + 2) / 3 * 4
+
+def dtypeToJson(dtype):
+    """Describe a numpy dtype without using pickle.
+
+    Simple dtypes are described by their 'str' (e.g. '<f8'). Structured dtypes (e.g. for
+    lists of tuples) are described by their 'descr' list.
+    """
+    if dtype.fields is None:
+        return dtype.str
+    return dtype.descr
+
 class PyforaToJsonTransformer(object):
-    def __init__(self, maxBytecount = None):
+    def __init__(self, maxBytecount = None, encoding = None):
         self.anyListsThatNeedLoading = False
         self.bytesEncoded = 0
         self.maxBytecount = maxBytecount
+        self.encoding = encoding or ENCODING_JSON
 
     def transformListThatNeedsLoading(self, length):
         self.accumulateObjects(length)
@@ -54,6 +77,9 @@ class PyforaToJsonTransformer(object):
         return {'list': listMembers}
 
     def transformHomogenousList(self, firstElement, allElementsAsNumpyArrays):
+        if self.encoding == ENCODING_BINARY:
+            return self.transformHomogenousListAsBuffer(firstElement, allElementsAsNumpyArrays)
+
         numpyAsStrings = [{'data':base64.b64encode(x.tostring()).encode("utf8"), 'length':len(x)} for x in allElementsAsNumpyArrays]
         numpyDtypeAsString = base64.b64encode(cPickle.dumps(allElementsAsNumpyArrays[0].dtype))
 
@@ -66,6 +92,25 @@ class PyforaToJsonTransformer(object):
             'length': sum(len(x) for x in allElementsAsNumpyArrays)
             }
 
+    def transformHomogenousListAsBuffer(self, firstElement, allElementsAsNumpyArrays):
+        dtype = allElementsAsNumpyArrays[0].dtype
+        rawBytecount = sum(x.nbytes for x in allElementsAsNumpyArrays)
+
+        #check the threshold before we pay for the copy and the encoding
+        self.accumulateObjects(1, encodedBytecount(rawBytecount))
+
+        if len(allElementsAsNumpyArrays) == 1:
+            data = allElementsAsNumpyArrays[0].tostring()
+        else:
+            data = "".join(x.tostring() for x in allElementsAsNumpyArrays)
+
+        return {
+            'homogenousListBuffer': base64.b64encode(data),
+            'dtype': dtypeToJson(dtype),
+            'firstElement': firstElement,
+            'length': sum(len(x) for x in allElementsAsNumpyArrays)
+            }
+
     def transformDict(self, keys, values):
         self.accumulateObjects(1)
         return {
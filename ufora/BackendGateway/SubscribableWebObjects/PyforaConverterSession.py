@@ -0,0 +1,127 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""The server-side state of a client's PyforaObjectConverter.
+
+A session holds the object definitions a client has sent, the converter that turns them into
+FORA, the values converted so far, and the content hashes of cacheable definitions. All of it
+is reset together when the client initializes its converter, so a content hash never refers
+to an objectId the current registry hasn't seen.
+
+Each client connection has its own session. A pooled gateway process serves several
+connections at once, and every client allocates its objectIds from zero, so sharing a session
+would let one client's objects overwrite another's.
+"""
+
+import threading
+
+import pyfora.ObjectRegistry as ObjectRegistry
+import pyfora.TypeDescription as TypeDescription
+
+
+class PyforaConverterSession(object):
+    def __init__(self, converter):
+        self.converter = converter
+        self.objectRegistry = ObjectRegistry.ObjectRegistry()
+        self.objectIdToIvc = {}
+
+        #content hash -> the first objectId whose definition had that content
+        self.contentHashToObjectId = {}
+
+    def objectIdForContentHash(self, contentHash):
+        """The objectId of a definition we hold with this content, or None."""
+        objectId = self.contentHashToObjectId.get(contentHash)
+        if objectId is None or objectId not in self.objectRegistry.objectIdToObjectDefinition:
+            return None
+        return objectId
+
+    def defineObjects(self, objectIdToObjectDefinition, objectIdToContentHash):
+        """Add serialized definitions to the registry.
+
+        Objects in 'objectIdToContentHash' but not in 'objectIdToObjectDefinition' are aliased
+        to the definition we already hold with that content. Returns the list of content hashes
+        we don't hold, in which case nothing is defined and the client must resend them in full.
+        """
+        unknownContentHashes = [
+            contentHash for objId, contentHash in objectIdToContentHash.iteritems()
+            if objId not in objectIdToObjectDefinition and
+            self.objectIdForContentHash(contentHash) is None
+            ]
+        if unknownContentHashes:
+            return unknownContentHashes
+
+        self.objectRegistry.objectIdToObjectDefinition.update({
+            k: TypeDescription.deserialize(v)
+            for k, v in objectIdToObjectDefinition.iteritems()
+            })
+
+        for objId, contentHash in objectIdToContentHash.iteritems():
+            if objId in objectIdToObjectDefinition:
+                if self.objectIdForContentHash(contentHash) is None:
+                    self.contentHashToObjectId[contentHash] = objId
+            else:
+                self.aliasObjectId(objId, self.objectIdForContentHash(contentHash))
+
+        return []
+
+    def aliasObjectId(self, objectId, existingObjectId):
+        """Make 'objectId' refer to the same definition (and converted value) as 'existingObjectId'."""
+        objectIdToObjectDefinition = self.objectRegistry.objectIdToObjectDefinition
+        objectIdToObjectDefinition[objectId] = objectIdToObjectDefinition[existingObjectId]
+
+        convertedValues = self.converter.convertedValues
+        if existingObjectId in convertedValues:
+            convertedValues[objectId] = convertedValues[existingObjectId]
+
+    def convert(self, objectId, dependentObjectIdsToExpose=None):
+        """Convert 'objectId' with the session's converter and return the result.
+
+        The result is an exception if the conversion failed. Otherwise it's recorded as the value
+        of 'objectId', along with the values of 'dependentObjectIdsToExpose'.
+        """
+        result = [None]
+        def onConverted(r):
+            result[0] = r
+
+        self.converter.convert(objectId, self.objectRegistry, onConverted)
+
+        assert result[0] is not None
+
+        if not isinstance(result[0], Exception):
+            self.objectIdToIvc[objectId] = result[0]
+            for dependentObjectId in dependentObjectIdsToExpose or ():
+                self.objectIdToIvc[dependentObjectId] = \
+                    self.converter.convertedValues[dependentObjectId]
+
+        return result[0]
+
+
+class PyforaConverterSessions(object):
+    """The session of each connection served by this process, keyed by connection."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    def get(self, connection):
+        """The session of 'connection', or None if it hasn't initialized one."""
+        with self._lock:
+            return self._sessions.get(connection)
+
+    def set(self, connection, session):
+        with self._lock:
+            self._sessions[connection] = session
+
+    def discard(self, connection):
+        with self._lock:
+            self._sessions.pop(connection, None)
@@ -0,0 +1,171 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import base64
+import unittest
+
+import pyfora.ObjectConverter as ObjectConverter
+import pyfora.ObjectRegistry as ObjectRegistry
+import pyfora.PureImplementationMappings as PureImplementationMappings
+import pyfora.PyObjectWalker as PyObjectWalker
+import ufora.BackendGateway.SubscribableWebObjects.PyforaConverterSession as PyforaConverterSession
+
+
+class DefinitionConverter(object):
+    """Stands in for PurePython.Converter, 'converting' each object to its definition."""
+    def __init__(self):
+        self.convertedValues = {}
+
+    def convert(self, objectId, objectRegistry, callback):
+        for objId in objectRegistry.computeDependencyGraph(objectId):
+            self.convertedValues[objId] = objectRegistry.getDefinition(objId)
+        callback(self.convertedValues[objectId])
+
+
+class SessionRemoteConverter(object):
+    """Serves a client ObjectConverter from a PyforaConverterSession, like the gateway does."""
+    def __init__(self, sessions=None, connection=None):
+        if sessions is None:
+            sessions = PyforaConverterSession.PyforaConverterSessions()
+        self.sessions = sessions
+        self.connection = connection
+        self.requests = 0
+
+    @property
+    def session(self):
+        return self.sessions.get(self.connection)
+
+    def initialize(self, args, callbacks):
+        self.sessions.set(
+            self.connection,
+            PyforaConverterSession.PyforaConverterSession(DefinitionConverter())
+            )
+        callbacks['onSuccess'](None)
+
+    def convert(self, args, callbacks):
+        self.requests += 1
+
+        unknownContentHashes = self.session.defineObjects(
+            args['objectIdToObjectDefinition'],
+            args['objectIdToContentHash']
+            )
+        if unknownContentHashes:
+            callbacks['onSuccess']({'unknownContentHashes': unknownContentHashes})
+            return
+
+        self.session.convert(args['objectId'], args['dependentObjectIdsToExpose'])
+        callbacks['onSuccess']({'objectId': args['objectId']})
+
+
+class SessionWebObjectFactory(object):
+    def __init__(self, remoteConverter):
+        self.remoteConverter = remoteConverter
+
+    def PyforaObjectConverter(self):
+        return self.remoteConverter
+
+
+class PyforaConverterSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.remote = SessionRemoteConverter()
+
+    def connect(self, remote=None):
+        """Create a client converter, which (re)initializes the server-side session."""
+        return ObjectConverter.ObjectConverter(
+            SessionWebObjectFactory(remote or self.remote),
+            None
+            )
+
+    def convert(self, converter, registry, obj):
+        objectId = PyObjectWalker.PyObjectWalker(
+            purePythonClassMapping=PureImplementationMappings.PureImplementationMappings(),
+            objectRegistry=registry
+            ).walkPyObject(obj)
+
+        results = []
+        converter.convert(objectId, registry, results.append)
+        self.assertEqual(results, [objectId])
+        return objectId
+
+    def test_content_is_aliased_within_a_session(self):
+        bigList = [float(x) for x in range(1000)]
+        converter = self.connect()
+        registry = ObjectRegistry.ObjectRegistry()
+
+        self.convert(converter, registry, (bigList, 1))
+        objectId = self.convert(converter, registry, (bigList, 2))
+
+        self.assertEqual(self.remote.requests, 2)
+        self.assertTrue(objectId in self.remote.session.objectIdToIvc)
+
+    def test_resubmitting_after_reconnecting(self):
+        bigList = [float(x) for x in range(1000)]
+
+        firstConnection = self.connect()
+        firstRegistry = ObjectRegistry.ObjectRegistry()
+        #skip some ids so that the list's objectId differs between the two connections
+        for _ in range(100):
+            firstRegistry.allocateObject()
+        self.convert(firstConnection, firstRegistry, (bigList, 1))
+
+        #the client reconnects, and the server's session is replaced with an empty one
+        registry = ObjectRegistry.ObjectRegistry()
+        secondConnection = self.connect()
+        self.convert(secondConnection, registry, (bigList, 2))
+        objectId = self.convert(secondConnection, registry, (bigList, 3))
+
+        self.assertTrue(objectId in self.remote.session.objectIdToIvc)
+
+    def test_connections_have_separate_sessions(self):
+        sessions = PyforaConverterSession.PyforaConverterSessions()
+        firstRemote = SessionRemoteConverter(sessions, "first connection")
+        secondRemote = SessionRemoteConverter(sessions, "second connection")
+
+        #both clients allocate objectIds from zero, so these get the same objectId
+        firstObjectId = self.convert(
+            self.connect(firstRemote),
+            ObjectRegistry.ObjectRegistry(),
+            "first object"
+            )
+        secondObjectId = self.convert(
+            self.connect(secondRemote),
+            ObjectRegistry.ObjectRegistry(),
+            "second object"
+            )
+        self.assertEqual(firstObjectId, secondObjectId)
+
+        self.assertEqual(
+            base64.b64decode(firstRemote.session.objectIdToIvc[firstObjectId]),
+            "first object"
+            )
+        self.assertEqual(
+            base64.b64decode(secondRemote.session.objectIdToIvc[secondObjectId]),
+            "second object"
+            )
+
+        sessions.discard("first connection")
+        self.assertIsNone(firstRemote.session)
+        self.assertIsNotNone(secondRemote.session)
+
+    def test_hashes_of_objects_we_dont_hold_are_unknown(self):
+        session = PyforaConverterSession.PyforaConverterSession(DefinitionConverter())
+        session.contentHashToObjectId["someHash"] = 10
+
+        self.assertEqual(session.defineObjects({}, {11: "someHash"}), ["someHash"])
+        self.assertFalse(11 in session.objectRegistry.objectIdToObjectDefinition)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
@@ -17,6 +17,7 @@ import ufora.BackendGateway.control.Control as Control
 import ufora.distributed.SharedState.ComputedGraph.SharedStateSynchronizer as SharedStateSynchronizer
 import ufora.BackendGateway.ComputedGraph.BackgroundUpdateQueue as BackgroundUpdateQueue
 import ufora.BackendGateway.SubscribableWebObjects.Exceptions as Exceptions
+import ufora.BackendGateway.SubscribableWebObjects.ValueDeltas as ValueDeltas
 
 
 class SubscriptionKeys(ComputedGraph.Location):
@@ -49,6 +50,9 @@ class Subscriptions(object):
         self.subscriptionValues = {}
         self.changedSubscriptions = set()
 
+        #for subscriptions whose client accepts deltas, the value the client was sent
+        self.clientValues = {}
+
     def isDisconnectedFromSharedState(self):
         return self.sharedStateSynchronizer.isSharedStateDisconnected()
 
@@ -84,17 +88,33 @@ class Subscriptions(object):
         self.removeSubscription(subscriptionId)
         return result
 
+    def getValueAndDeltaAndDropSubscription(self, subscriptionId):
+        """Returns the current value of the subscription and, if its client accepts deltas
+        and a delta is smaller than the value, the delta from the value the client has."""
+        result = self.subscriptionValues[subscriptionId]
+
+        delta = None
+        if subscriptionId in self.clientValues:
+            delta = ValueDeltas.deltaIfSmaller(self.clientValues[subscriptionId], result)
+
+        self.removeSubscription(subscriptionId)
+        return result, delta
+
     def removeSubscription(self, subscriptionId):
         del self.subscriptionGetters[subscriptionId]
         del self.subscriptionValues[subscriptionId]
+        self.clientValues.pop(subscriptionId, None)
 
-    def addSubscription(self, subscriptionId, resultGetter):
+    def addSubscription(self, subscriptionId, resultGetter, acceptsDeltas=False):
         self.subscriptionGetters[subscriptionId] = resultGetter
 
         SubscriptionKeys().subscriptionKeys = list(self.subscriptionGetters.keys())
 
         changedSubscriptions = self.updateAndReturnChangedSubscriptionIds()
 
+        if acceptsDeltas:
+            self.clientValues[subscriptionId] = self.subscriptionValues[subscriptionId]
+
         return self.subscriptionValues[subscriptionId], changedSubscriptions
 
     def recomputeSubscription_(self, subscriptionId):
@@ -0,0 +1,74 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Compact descriptions of how a dictionary-valued subscription changed.
+
+A delta between two dictionaries 'old' and 'new' is a dictionary with the keys
+
+    'set' - {key: value} for keys that are new or whose value was replaced
+    'changed' - {key: delta} for keys whose values are both dictionaries
+    'removed' - [key] for keys that are no longer present
+
+Empty sections are omitted. Clients apply deltas with 'applySubscriptionDelta'
+in the generated SubscribableWebObjects wrapper.
+"""
+
+
+def computeDelta(old, new):
+    """Return the delta that turns 'old' into 'new', or None if either is not a dict."""
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return None
+
+    setValues = {}
+    changed = {}
+
+    for key, newValue in new.iteritems():
+        if key not in old:
+            setValues[key] = newValue
+            continue
+
+        oldValue = old[key]
+        if oldValue is newValue or oldValue == newValue:
+            continue
+
+        subDelta = computeDelta(oldValue, newValue)
+        if subDelta is not None and deltaSize(subDelta) < len(newValue):
+            changed[key] = subDelta
+        else:
+            setValues[key] = newValue
+
+    delta = {}
+    if setValues:
+        delta['set'] = setValues
+    if changed:
+        delta['changed'] = changed
+
+    removed = [key for key in old if key not in new]
+    if removed:
+        delta['removed'] = removed
+
+    return delta
+
+
+def deltaSize(delta):
+    """The number of keys a delta touches at its top level."""
+    return len(delta.get('set', ())) + len(delta.get('changed', ())) + len(delta.get('removed', ()))
+
+
+def deltaIfSmaller(old, new):
+    """Return the delta from 'old' to 'new' if sending it beats sending 'new' outright."""
+    delta = computeDelta(old, new)
+    if delta is None or deltaSize(delta) >= len(new):
+        return None
+    return delta
@@ -0,0 +1,89 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import unittest
+
+import ufora.BackendGateway.SubscribableWebObjects.ValueDeltas as ValueDeltas
+import ufora.BackendGateway.SubscribableWebObjects.generatePythonWrapper as generatePythonWrapper
+
+
+class IdentitySessionState(object):
+    def convertJsonToObject(self, value):
+        return value
+
+
+def generatedApplySubscriptionDelta():
+    namespace = {}
+    exec generatePythonWrapper.headerText in namespace
+    return namespace['applySubscriptionDelta']
+
+
+class ValueDeltasTest(unittest.TestCase):
+    def test_delta_of_non_dicts(self):
+        self.assertIsNone(ValueDeltas.computeDelta([1, 2], [1, 3]))
+        self.assertIsNone(ValueDeltas.computeDelta({'a': 1}, 'a'))
+
+    def test_delta_of_equal_dicts_is_empty(self):
+        self.assertEqual(ValueDeltas.computeDelta({'a': 1, 'b': [2]}, {'a': 1, 'b': [2]}), {})
+
+    def test_delta_sections(self):
+        old = {'a': 1, 'b': 2, 'c': {'x': 1, 'y': 2, 'z': 3}}
+        new = {'a': 1, 'c': {'x': 1, 'y': 5, 'z': 3}, 'd': 4}
+
+        self.assertEqual(
+            ValueDeltas.computeDelta(old, new),
+            {'set': {'d': 4}, 'changed': {'c': {'set': {'y': 5}}}, 'removed': ['b']}
+            )
+
+    def test_nested_dicts_that_changed_entirely_are_replaced(self):
+        old = {'a': 1, 'c': {'x': 1}}
+        new = {'a': 1, 'c': {'x': 2}}
+
+        self.assertEqual(ValueDeltas.computeDelta(old, new), {'set': {'c': {'x': 2}}})
+
+    def test_delta_if_smaller(self):
+        self.assertIsNone(ValueDeltas.deltaIfSmaller({'a': 1}, {'a': 2}))
+        self.assertEqual(ValueDeltas.deltaIfSmaller({'a': 1, 'b': 1}, {'a': 2, 'b': 1}), {'set': {'a': 2}})
+
+    def test_finishing_one_batch_computation_sends_one_status(self):
+        #the shape of PyforaComputedValueBatch.jsonStatusRepresentations
+        old = {str(index): {'status': 'finished', 'index': index} for index in range(100)}
+        new = dict(old)
+        new['100'] = {'status': 'finished', 'index': 100}
+
+        self.assertEqual(ValueDeltas.deltaIfSmaller(old, new), {'set': {'100': new['100']}})
+
+    def test_generated_client_applies_deltas(self):
+        applySubscriptionDelta = generatedApplySubscriptionDelta()
+
+        old = {
+            'status': 'running',
+            'stats': {'cpus': 4, 'seconds': 10.0, 'bytes': 100},
+            'log': ['a'],
+            'gone': None
+            }
+        new = {
+            'status': 'running',
+            'stats': {'cpus': 4, 'seconds': 12.5, 'bytes': 100},
+            'log': ['a', 'b'],
+            'extra': {'k': 'v'}
+            }
+
+        delta = ValueDeltas.computeDelta(old, new)
+        self.assertEqual(applySubscriptionDelta(IdentitySessionState(), old, delta), new)
+        self.assertIn('gone', old)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -36,6 +36,17 @@ headerText = """
 
 import json
 
+#apply a delta sent with a 'ValueChanged' message (see ValueDeltas) to a copy of 'value'
+def applySubscriptionDelta(sessionState, value, delta):
+    result = dict(value)
+    for key, newValue in delta.get('set', {}).iteritems():
+        result[key] = sessionState.convertJsonToObject(newValue)
+    for key, subDelta in delta.get('changed', {}).iteritems():
+        result[key] = applySubscriptionDelta(sessionState, result[key], subDelta)
+    for key in delta.get('removed', ()):
+        del result[key]
+    return result
+
 class WebObjectBase(object):
     def __init__(self, sessionState, inArgs=None):
         self.objectId_ = None
@@ -88,19 +99,24 @@ class WebObjectBase(object):
         req = {
             'objectDefinition': self.toJSONWireFormat(),
             'messageType': 'Subscribe',
-            'field': field
+            'field': field,
+            'acceptsDeltas': True
             }
+        lastValue = [None]
         def responseCallback(response, callbacks):
             if response['responseType'] == 'SubscribeResponse':
-                self.triggerSuccessCallback(
-                    callbacks,
-                    self.sessionState.convertJsonToObject(response['value'])
-                    )
+                lastValue[0] = self.sessionState.convertJsonToObject(response['value'])
+                self.triggerSuccessCallback(callbacks, lastValue[0])
             elif response['responseType'] == 'ValueChanged':
-                self.triggerChangedCallback(
-                    callbacks,
-                    self.sessionState.convertJsonToObject(response['value'])
-                    )
+                if 'delta' in response:
+                    lastValue[0] = applySubscriptionDelta(
+                        self.sessionState,
+                        lastValue[0],
+                        response['delta']
+                        )
+                else:
+                    lastValue[0] = self.sessionState.convertJsonToObject(response['value'])
+                self.triggerChangedCallback(callbacks, lastValue[0])
             else:
                 self.triggerFailureCallback(callbacks, response)
         self.sessionState.jsonInterface.send(req, lambda response: responseCallback(response, callbacks))
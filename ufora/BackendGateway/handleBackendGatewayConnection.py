@@ -24,6 +24,8 @@ import struct
 import sys
 import traceback
 
+import ufora.BackendGateway.ComputedValue.ComputedValueGateway as ComputedValueGateway
+import ufora.BackendGateway.GatewayWorkerPool as GatewayWorkerPool
 import ufora.BackendGateway.SubscribableWebObjects.ConnectionHandler as ConnectionHandler
 import ufora.FORA.python.FORA as FORA
 import ufora.config.Mainline as Mainline
@@ -36,6 +38,11 @@ import ufora.util.Unicode as Unicode
 
 
 class BackendGatewayRequestHandler(object):
+    """Services gateway connections.
+
+    If 'socketFd' is None, the handler is a member of a GatewayWorkerPool and services
+    every socket passed to 'handleSocket', with all connections sharing one page cache.
+    """
     def __init__(self,
                  socketFd,
                  sharedStateAddress):
@@ -54,12 +61,23 @@ class BackendGatewayRequestHandler(object):
             int(sharedStatePort)
             )
 
+        vectorDataCache = None
+        if socketFd is None:
+            vectorDataCache = ComputedValueGateway.VectorDataCache(
+                self.scheduler,
+                Setup.config().computedValueGatewayRAMCacheMB * 1024 * 1024
+                )
+
         self.subscribableHandler = ConnectionHandler.ConnectionHandler(
             self.scheduler,
             sharedStateViewFactory,
-            lambda: TcpChannelFactory.TcpStringChannelFactory(self.scheduler)
+            lambda: TcpChannelFactory.TcpStringChannelFactory(self.scheduler),
+            vectorDataCache
             )
-        self.sock = socket.fromfd(socketFd, socket.AF_INET, socket.SOCK_STREAM)
+
+        self.sock = None
+        if socketFd is not None:
+            self.sock = socket.fromfd(socketFd, socket.AF_INET, socket.SOCK_STREAM)
 
 
     def serviceRequest(self, channel):
@@ -90,20 +108,27 @@ class BackendGatewayRequestHandler(object):
 
     def handle(self):
         logging.info("all file descriptors closed")
+        self.handleSocket(self.sock)
+        logging.info("Killing self!")
+
+    def handleSocket(self, sock):
         callbackScheduler = \
             CallbackScheduler.createSimpleCallbackSchedulerFactory().createScheduler(
                 "BackendGatewayService",
                 1
                 )
 
-
         channel = SocketStringChannel.SocketStringChannel(
             callbackScheduler,
-            self.sock).makeQueuelike(callbackScheduler)
+            sock).makeQueuelike(callbackScheduler)
         logging.info("channel connected")
 
         self.serviceRequest(channel)
-        logging.info("Killing self!")
+
+def keptFileDescriptors(connectionData):
+    if 'controlFd' in connectionData:
+        return [connectionData['controlFd']]
+    return [connectionData['socketFd']]
 
 def main(*args):
     Setup.config().configureLoggingForBackgroundProgram()
@@ -113,20 +138,30 @@ def main(*args):
 
         connectionData = pickle.loads(data)
 
+        toKeep = keptFileDescriptors(connectionData)
         maxFD = os.sysconf("SC_OPEN_MAX")
         for fd in range(3, maxFD):
-            if fd != connectionData['socketFd']:
+            if fd not in toKeep:
                 try:
                     os.close(fd)
                 except:
                     pass
 
-        handler = BackendGatewayRequestHandler(
-            connectionData['socketFd'],
-            connectionData['sharedStateAddress']
-        )
+        if 'controlFd' in connectionData:
+            handler = BackendGatewayRequestHandler(
+                None,
+                connectionData['sharedStateAddress']
+                )
+            GatewayWorkerPool.PoolWorkerConnection(
+                connectionData['controlFd']
+                ).serve(handler.handleSocket)
+        else:
+            handler = BackendGatewayRequestHandler(
+                connectionData['socketFd'],
+                connectionData['sharedStateAddress']
+            )
 
-        handler.handle()
+            handler.handle()
     finally:
         sys.stderr.write(traceback.format_exc())
         sys.stderr.write("closing connection handler\n")
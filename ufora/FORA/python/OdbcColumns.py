@@ -0,0 +1,121 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Stream the rows of a query cursor into per-column pages.
+
+Rows are fetched from the cursor in batches and split into columns. Each column accumulates
+its values into a page: a packed array while every value has the same numeric type, and a
+plain list once it sees anything else. Full pages are handed to a callback as they fill, so
+only one batch of rows and one page per column are ever held in Python at a time.
+"""
+
+import array
+
+FETCH_BATCH_ROWS = 10000
+PAGE_ROWS = 128 * 1024
+
+KIND_FLOAT = "float"
+KIND_INT = "int"
+KIND_OBJECT = "object"
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+_arrayTypecodes = {KIND_FLOAT: 'd', KIND_INT: 'l'}
+
+assert array.array('l').itemsize == 8, "packed int columns need a 64-bit 'l' typecode"
+
+def valueKind(value):
+    # bool is a subclass of int, and was always loaded as one
+    if isinstance(value, float):
+        return KIND_FLOAT
+    if isinstance(value, (int, long)) and INT64_MIN <= value <= INT64_MAX:
+        return KIND_INT
+    return KIND_OBJECT
+
+
+def processColumnValue(val):
+    if isinstance(val, unicode):
+        return val.encode("ascii", "ignore")
+
+    return val
+
+
+class ColumnBuilder(object):
+    """Accumulates the values of one column into pages.
+
+    'flushPage' is called with (kind, values) for each page, in order. 'values' is an
+    array.array for KIND_FLOAT and KIND_INT pages and a list for KIND_OBJECT pages.
+    """
+    def __init__(self, flushPage, pageRows=PAGE_ROWS):
+        self.flushPage = flushPage
+        self.pageRows = pageRows
+        self.kind = None
+        self.values = None
+
+    def extend(self, values):
+        for value in values:
+            kind = valueKind(value)
+
+            if self.kind is None:
+                self.kind = kind
+                self.values = (
+                    list() if kind == KIND_OBJECT else array.array(_arrayTypecodes[kind])
+                    )
+            elif kind != self.kind and self.kind != KIND_OBJECT:
+                # once a page is mixed it stays a plain list until it's flushed, so that
+                # alternating types don't break the column into tiny pages
+                self.kind = KIND_OBJECT
+                self.values = self.values.tolist()
+
+            self.values.append(value)
+
+            if len(self.values) >= self.pageRows:
+                self.flush()
+
+    def flush(self):
+        if self.values:
+            self.flushPage(self.kind, self.values)
+        self.kind = None
+        self.values = None
+
+
+def streamColumns(cursor, makeFlushPage, fetchBatchRows=FETCH_BATCH_ROWS, pageRows=PAGE_ROWS):
+    """Read every row from a DB-API 'cursor', paging each column through a ColumnBuilder.
+
+    'makeFlushPage(columnIx, name)' returns the flushPage callback for a column. Returns the
+    tuple of column names, or an empty tuple if the query produced no result set.
+    """
+    if cursor.description is None:
+        return ()
+
+    names = tuple(column[0] for column in cursor.description)
+    builders = [
+        ColumnBuilder(makeFlushPage(columnIx, name), pageRows)
+        for columnIx, name in enumerate(names)
+        ]
+
+    while True:
+        rows = cursor.fetchmany(fetchBatchRows)
+        if not rows:
+            break
+
+        for builder, values in zip(builders, zip(*rows)):
+            builder.extend([processColumnValue(value) for value in values])
+
+    for builder in builders:
+        builder.flush()
+
+    return names
+
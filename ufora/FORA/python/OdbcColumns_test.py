@@ -0,0 +1,113 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import sqlite3
+import unittest
+
+import ufora.FORA.python.OdbcColumns as OdbcColumns
+
+class CountingCursor(object):
+    """Wraps a cursor to record how many rows each fetchmany call returned."""
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.description = cursor.description
+        self.batchSizes = []
+
+    def fetchmany(self, count):
+        rows = self.cursor.fetchmany(count)
+        self.batchSizes.append(len(rows))
+        return rows
+
+
+class OdbcColumnsTest(unittest.TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(":memory:")
+        self.connection.execute("create table t (i integer, x real, s text)")
+
+    def tearDown(self):
+        self.connection.close()
+
+    def insertRows(self, rows):
+        self.connection.executemany("insert into t values (?, ?, ?)", rows)
+
+    def stream(self, query, **kwds):
+        pages = {}
+
+        def makeFlushPage(columnIx, name):
+            pages[name] = []
+            return lambda kind, values: pages[name].append((kind, list(values)))
+
+        cursor = CountingCursor(self.connection.execute(query))
+        names = OdbcColumns.streamColumns(cursor, makeFlushPage, **kwds)
+
+        return names, pages, cursor.batchSizes
+
+    def test_columns_are_paged_by_type(self):
+        self.insertRows([(ix, ix / 2.0, u"row %s" % ix) for ix in range(10)])
+
+        names, pages, _ = self.stream("select i, x, s from t order by i", pageRows=4)
+
+        self.assertEqual(names, ("i", "x", "s"))
+        self.assertEqual(
+            pages["i"],
+            [("int", [0, 1, 2, 3]), ("int", [4, 5, 6, 7]), ("int", [8, 9])]
+            )
+        self.assertEqual([kind for kind, _ in pages["x"]], ["float"] * 3)
+        self.assertEqual(pages["s"][0], ("object", ["row 0", "row 1", "row 2", "row 3"]))
+        self.assertIsInstance(pages["s"][0][1][0], str)
+
+    def test_rows_are_fetched_in_batches(self):
+        self.insertRows([(ix, 0.0, "") for ix in range(25)])
+
+        _, pages, batchSizes = self.stream("select i from t", fetchBatchRows=10)
+
+        self.assertEqual(batchSizes, [10, 10, 5, 0])
+        self.assertEqual(sum(len(values) for _, values in pages["i"]), 25)
+
+    def test_mixed_pages_become_lists(self):
+        self.insertRows([(1, 1.0, ""), (None, None, ""), (3, 3.0, "")])
+
+        _, pages, _ = self.stream("select i, x from t")
+
+        self.assertEqual(pages["i"], [("object", [1, None, 3])])
+        self.assertEqual(pages["x"], [("object", [1.0, None, 3.0])])
+
+    def test_ints_outside_int64_are_objects(self):
+        pages = []
+        builder = OdbcColumns.ColumnBuilder(
+            lambda kind, values: pages.append((kind, list(values))),
+            pageRows=2
+            )
+
+        builder.extend([1, 2, 3, 2 ** 70, 5])
+        builder.flush()
+
+        self.assertEqual(pages, [("int", [1, 2]), ("object", [3, 2 ** 70]), ("int", [5])])
+
+    def test_empty_result_set(self):
+        names, pages, _ = self.stream("select i, s from t")
+
+        self.assertEqual(names, ("i", "s"))
+        self.assertEqual(pages, {"i": [], "s": []})
+
+    def test_statement_without_a_result_set(self):
+        names, pages, _ = self.stream("delete from t")
+
+        self.assertEqual(names, ())
+        self.assertEqual(pages, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
+
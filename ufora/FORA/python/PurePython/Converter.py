@@ -135,6 +135,8 @@ class Converter(object):
         objectDefinition = objectIdToObjectDefinition[objectId]
         if TypeDescription.isPrimitive(objectDefinition) or isinstance(objectDefinition, list):
             return self.convertPrimitive(objectDefinition)
+        elif isinstance(objectDefinition, TypeDescription.PackedHomogenousData):
+            return self.convertPackedHomogenousData(objectDefinition)
         elif isinstance(objectDefinition, TypeDescription.RemotePythonObject):
             return self.convertRemotePythonObject(objectDefinition)
         elif isinstance(objectDefinition, TypeDescription.NamedSingleton):
@@ -258,6 +260,12 @@ class Converter(object):
 
         return self.nativeConverterAdaptor.convertConstant(value)
 
+    def convertPackedHomogenousData(self, packedHomogenousData):
+        return self.nativeConverterAdaptor.createListOfPrimitivesFromBuffer(
+            base64.b64decode(packedHomogenousData.dataAsBytes),
+            str(packedHomogenousData.dtype)
+            )
+
     def _assertContainerDoesNotReferenceItself(self,
                                                containerId,
                                                dependencyGraph,
@@ -383,6 +391,9 @@ class Converter(object):
         if TypeDescription.isPrimitive(objectDefinition) or isinstance(objectDefinition, list):
             self.convertedValues[objectId] = self.convertPrimitive(objectDefinition)
 
+        elif isinstance(objectDefinition, TypeDescription.PackedHomogenousData):
+            self.convertedValues[objectId] = self.convertPackedHomogenousData(objectDefinition)
+
         elif isinstance(objectDefinition, (TypeDescription.FunctionDefinition,
                                            TypeDescription.ClassDefinition)):
             if isinstance(objectDefinition, TypeDescription.ClassDefinition):
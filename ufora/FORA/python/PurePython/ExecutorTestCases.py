@@ -443,3 +443,78 @@ class ExecutorTestCases(object):
             math.sin(arg)
             )
 
+
+    def test_toLocalIter_list(self):
+        def f(n):
+            return [x * 2 for x in xrange(n)]
+
+        with self.create_executor() as executor:
+            remote = executor.submit(f, 25).result()
+
+            chunks = list(remote.toLocalIter(chunkSize=10))
+
+            self.assertEqual([len(c) for c in chunks], [10, 10, 5])
+            self.assertEqual(sum(chunks, []), f(25))
+
+    def test_toLocalIter_dict(self):
+        def f(n):
+            return {x: x * 2 for x in xrange(n)}
+
+        with self.create_executor() as executor:
+            remote = executor.submit(f, 25).result()
+
+            merged = {}
+            for chunk in remote.toLocalIter(chunkSize=7):
+                self.assertTrue(len(chunk) <= 7)
+                merged.update(chunk)
+
+            self.assertEqual(merged, f(25))
+
+    def test_toLocalIter_unpageable(self):
+        def f():
+            return 10
+
+        with self.create_executor() as executor:
+            remote = executor.submit(f).result()
+
+            self.assertEqual(list(remote.toLocalIter()), [10])
+
+    def test_submitMany(self):
+        def f(x, y):
+            return x * 10 + y
+
+        with self.create_executor() as executor:
+            futures = executor.submitMany(f, [(x, x + 1) for x in range(20)])
+
+            self.assertEqual(
+                [future.result().toLocal().result() for future in futures],
+                [f(x, x + 1) for x in range(20)]
+                )
+
+    def test_submitMany_with_exceptions(self):
+        def f(x):
+            if x % 2 == 0:
+                raise ValueError(x)
+            return x
+
+        with self.create_executor() as executor:
+            futures = executor.submitMany(f, [(x,) for x in range(4)])
+
+            for x, future in enumerate(futures):
+                if x % 2 == 0:
+                    with self.assertRaises(pyfora.ComputationError):
+                        future.result().toLocal().result()
+                else:
+                    self.assertEqual(future.result().toLocal().result(), x)
+
+    def test_map(self):
+        def f(x, y):
+            return x + y
+
+        with self.create_executor() as executor:
+            results = [
+                remote.toLocal().result()
+                for remote in executor.map(f, range(10), range(10, 20))
+                ]
+
+            self.assertEqual(sorted(results), [x + x + 10 for x in range(10)])
@@ -230,3 +230,16 @@ class GradientBoostingTests(object):
             [elt for elt in self.evaluateWithExecutor(f)],
             [elt for elt in y.iloc[:,0]]
             )
+
+    def test_gradient_boosting_regression_binned(self):
+        def f():
+            x, y = generateRegressionData(0.1, 10)
+
+            binnedModel = GradientBoostedRegressorBuilder(2, 5, 1.0, numBins=32).fit(x, y)
+            model = GradientBoostedRegressorBuilder(2, 5, 1.0).fit(x, y)
+
+            return binnedModel.score(x, y), model.score(x, y)
+
+        binnedScore, score = self.evaluateWithExecutor(f)
+
+        self.assertTrue(numpy.isclose(binnedScore, score))
@@ -263,6 +263,46 @@ A,B,C
 
         self.assertIsInstance(res, Exception)
 
+    def test_pandas_read_csv_infer_types(self):
+        s = """
+A,B,C,D,E
+1,2.5,True,x,1
+4,,False,y,
+7,8.25,true,z,3
+            """
+
+        def f():
+            df = pyfora.pandas_util.read_csv_from_string(s, True)
+            return [df.iloc[:, ix].tolist() for ix in range(df.shape[1])]
+
+        res = self.evaluateWithExecutor(f)
+
+        self.assertEqual(res[0], [1, 4, 7])
+        self.assertIsInstance(res[0][0], int)
+        self.assertEqual(res[1][0], 2.5)
+        self.assertTrue(numpy.isnan(res[1][1]))
+        self.assertEqual(res[2], [True, False, True])
+        self.assertEqual(res[3], ['x', 'y', 'z'])
+        self.assertIsInstance(res[4][0], float)
+        self.assertTrue(numpy.isnan(res[4][1]))
+
+    def test_pandas_read_csv_infer_types_from_s3(self):
+        s = "A,B\n" + "".join("%s,%s\n" % (ix, ix * 0.5) for ix in range(1000))
+
+        with self.create_executor() as executor:
+            s3 = self.getS3Interface(executor)
+            key = "test_pandas_read_csv_infer_types_from_s3_key"
+            s3().setKeyValue("bucketname", key, s)
+
+            remoteCsv = executor.importS3Dataset("bucketname", key).result()
+
+            with executor.remotely.downloadAll():
+                df = pyfora.pandas_util.read_csv_from_string(remoteCsv, True)
+                columns = (df.iloc[:, 0].tolist(), df.iloc[:, 1].tolist())
+
+            self.assertEqual(columns[0], range(1000))
+            self.assertEqual(columns[1], [ix * 0.5 for ix in range(1000)])
+
     def test_pandas_read_csv_from_s3(self):
         s = """
 A,B,C
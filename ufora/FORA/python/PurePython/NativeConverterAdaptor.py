@@ -96,6 +96,13 @@ class NativeConverterAdaptor(object):
             self.vdm_
             )
 
+    def createListOfPrimitivesFromBuffer(self, data, dtype):
+        return self.nativeListConverter.createListOfPrimitivesFromBuffer(
+            data,
+            dtype,
+            self.constantConverter.nativeConstantConverter
+            )
+
     def convertConstant(self, value):
         return self.constantConverter.convert(value)
 
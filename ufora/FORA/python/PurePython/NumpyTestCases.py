@@ -12,6 +12,8 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import pyfora.pure_modules.pure_numpy as PureNumpy
+
 import numpy
 import numpy.testing
 import random
@@ -800,3 +802,130 @@ class NumpyTestCases(object):
         x = numpy.array([[-2.0,1.0],[-3.0,0.0]])
 
         self.equivalentEvaluationTest(f, x)
+
+    def test_numpy_strided_views(self):
+        x = numpy.arange(60.0).reshape((3, 4, 5))
+
+        def f(x):
+            return (
+                x.transpose(),
+                x[1],
+                x[-1, 2],
+                x[1, 2, 3],
+                x[::-1, 1:3, ::2],
+                x[:, 3],
+                x.transpose()[2:, ::-1]
+                )
+
+        self.equivalentEvaluationTest(f, x)
+
+    def test_numpy_reshape_after_transpose(self):
+        x = numpy.arange(12).reshape((3, 4))
+
+        def f(x):
+            return x.T.reshape((2, 6)), x[1:].reshape((8,)), x.T.tolist()
+
+        self.equivalentEvaluationTest(f, x)
+
+    def test_numpy_reductions_along_axes(self):
+        x = numpy.arange(24.0).reshape((2, 3, 4)) % 7.0
+
+        def f(x, axis):
+            return (
+                x.sum(axis),
+                x.mean(axis),
+                x.max(axis),
+                x.argmax(axis),
+                x.cumsum(axis)
+                )
+
+        for axis in [None, 0, 1, 2, -1]:
+            self.equivalentEvaluationTest(f, x, axis)
+            self.equivalentEvaluationTest(f, x.transpose(), axis)
+
+    def test_numpy_reduction_functions(self):
+        x = numpy.array([[3.0, 9.0, 9.0], [1.0, 4.0, 2.0]])
+
+        def f(x):
+            return (
+                numpy.sum(x),
+                numpy.mean(x, 0),
+                numpy.max(x, 1),
+                numpy.argmax(x),
+                numpy.cumsum(x[:, ::-1], 1)
+                )
+
+        self.equivalentEvaluationTest(f, x)
+
+    def test_numpy_tiled_matrix_multiply(self):
+        numpy.random.seed(42)
+        shapes = [(9, 3, 2), (3, 17, 5), (13, 11, 7), (30, 5, 30)]
+
+        def f(a, b, v):
+            return numpy.dot(a, b), numpy.dot(a.T.T, v), numpy.dot(a[::2, 1:], b[1:])
+
+        oldMaxUntiledElements = PureNumpy.MATMUL_MAX_UNTILED_ELEMENTS
+        try:
+            PureNumpy.MATMUL_MAX_UNTILED_ELEMENTS = 20
+            for rows, inner, columns in shapes:
+                a = numpy.random.uniform(-10, 10, (rows, inner))
+                b = numpy.random.uniform(-10, 10, (inner, columns))
+                v = numpy.random.uniform(-10, 10, inner)
+
+                for r1, r2 in zip(self.evaluateWithExecutor(f, a, b, v), f(a, b, v)):
+                    numpy.testing.assert_allclose(r1, r2)
+        finally:
+            PureNumpy.MATMUL_MAX_UNTILED_ELEMENTS = oldMaxUntiledElements
+
+    def test_numpy_small_views_dont_hold_their_parent(self):
+        x = numpy.arange(10000.0).reshape((100, 100))
+
+        def row(x):
+            return x[3]
+
+        def rows(x):
+            return x[2:4]
+
+        def column(x):
+            return x[:, 5]
+
+        def block(x):
+            return x[10:20, 10:20]
+
+        for f in [row, rows, column, block]:
+            numpy.testing.assert_array_equal(
+                f(x),
+                self.evaluateWithExecutor(f, x)
+                )
+
+        def heldValueCounts(x):
+            return (len(x[3].values), len(x[2:4].values), len(x[:, 5].values))
+
+        self.assertEqual(self.evaluateWithExecutor(heldValueCounts, x), (100, 200, 100))
+
+        def largeViewValueCount(x):
+            return len(x[1:].values)
+
+        #views of most of the array still share its values
+        self.assertEqual(self.evaluateWithExecutor(largeViewValueCount, x), 10000)
+
+    def test_numpy_mean_of_empty_arrays(self):
+        x = numpy.zeros((3, 0))
+
+        def meanOfAll(x):
+            return x.mean()
+
+        def meanAlongEmptyAxis(x):
+            return numpy.mean(x, 1)
+
+        def meanAlongOtherAxis(x):
+            return x.mean(0)
+
+        def meanOfEmptyList(x):
+            return numpy.mean([])
+
+        for f in [meanOfAll, meanAlongEmptyAxis, meanAlongOtherAxis, meanOfEmptyList]:
+            numpy.testing.assert_array_equal(
+                f(x),
+                self.evaluateWithExecutor(f, x)
+                )
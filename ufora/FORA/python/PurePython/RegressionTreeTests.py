@@ -144,3 +144,68 @@ class RegressionTreeTests(object):
         self.assertEqual(rule_0.jumpIfHigher, 16)
         self.assertTrue(numpy.isclose(rule_0.leafValue, 4.9992446496))
 
+
+    def test_FeatureBins_1(self):
+        def f():
+            x = PurePandas.PurePythonDataFrame(
+                [[float(ix % 4) for ix in xrange(100)]]
+                )
+            bins = regressionTreeBase.FeatureBins.fromDataframe(x, [0], 8)
+            return bins.splitPoints, bins.codes[0][:6]
+
+        splitPoints, codes = self.evaluateWithExecutor(f)
+
+        self.assertEqual(splitPoints, [[1.0, 2.0, 3.0]])
+        self.assertEqual(codes, [0, 1, 2, 3, 0, 1])
+
+    def test_RegressionTreeFitting_binned(self):
+        def f():
+            x, y = generateData(0.1, 10)
+            builder = RegressionTree.RegressionTreeBuilder(3, numBins=16)
+            regressionTree = builder.fit(x, y)
+            return regressionTree, regressionTree.score(x, y), \
+                RegressionTree.RegressionTreeBuilder(3).fit(x, y).score(x, y)
+
+        tree, binnedScore, score = self.evaluateWithExecutor(f)
+
+        self.assertEqual(len(tree.rules), 15)
+        # every predictor takes fewer than 16 distinct values, so binning loses nothing
+        self.assertTrue(numpy.isclose(binnedScore, score))
+
+    def test_RegressionTree_batch_predict(self):
+        def f():
+            x, y = generateData(0.1, 10)
+            regressionTree = RegressionTree.RegressionTreeBuilder(4).fit(x, y)
+            batchPredictions = regressionTree.predict(x)
+
+            return [
+                batchPredictions[ix] - regressionTree._predictionFunction(x.iloc[ix]) \
+                for ix in xrange(len(x))
+                ]
+
+        differences = self.evaluateWithExecutor(f)
+
+        self.assertEqual(max(abs(d) for d in differences), 0.0)
+
+    def test_RegressionTree_predict_to_depth(self):
+        def f():
+            x, y = generateData(0.1, 10)
+            regressionTree = RegressionTree.RegressionTreeBuilder(3).fit(x, y)
+
+            def predictionsToDepth(depth):
+                batchPredictions = regressionTree.predict(x, depth)
+                return (
+                    [batchPredictions[ix] for ix in xrange(len(x))],
+                    [regressionTree.predict(x.iloc[ix], depth) for ix in xrange(len(x))]
+                    )
+
+            return [predictionsToDepth(depth) for depth in xrange(4)]
+
+        predictions = self.evaluateWithExecutor(f)
+
+        for depth, (batchPredictions, rowPredictions) in enumerate(predictions):
+            self.assertEqual(batchPredictions, rowPredictions)
+            # a tree cut off at 'depth' has at most 2 ** depth leaves
+            self.assertLessEqual(len(set(rowPredictions)), 2 ** depth)
+
+        self.assertGreater(len(set(predictions[1][1])), 1)
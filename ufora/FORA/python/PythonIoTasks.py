@@ -12,12 +12,15 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import ufora.FORA.python.OdbcColumns as OdbcColumns
+import ufora.distributed.S3.RangeDownloadScheduler as RangeDownloadScheduler
 import ufora.distributed.S3.S3Interface as S3Interface
 import ufora.distributed.util.common as common
 import ufora.native.FORA as ForaNative
 import ufora.native.Cumulus as CumulusNative
 import ufora.config.Setup as Setup
 import ufora.util.ExponentialMovingAverage as ExponentialMovingAverage
+import ufora.util.SharedMemoryFile as SharedMemoryFile
 import logging
 import os
 import requests
@@ -29,7 +32,6 @@ import json
 import time
 import threading
 import traceback
-import sys
 
 class UserCausedException(Exception):
     """Represents a Python failure caused by bad user code,
@@ -621,28 +623,6 @@ def s3DatasetWithKeyname(s3Dataset, keyname):
         return ForaNative.S3Dataset.Internal(keyname)
 
 
-def extractColumnDataFromQueryCursor(cursor):
-    columns = []
-    names = []
-
-    for row in cursor:
-        if len(names) == 0:
-            names = tuple((x[0] for x in row.cursor_description))
-            columns = [[] for _ in names]
-
-        for columnIx in range(len(row)):
-            columns[columnIx].append(processColumnValue(row[columnIx]))
-
-    return columns, names
-
-
-def processColumnValue(val):
-    if isinstance(val, unicode):
-        return val.encode("ascii", "ignore")
-
-    return val
-
-
 def loadOdbcRequestDataset(request, vdm):
     try:
         logging.info("Initializing a connection.")
@@ -672,15 +652,40 @@ def loadOdbcRequestDataset(request, vdm):
 
 
 def convertListOfTuplesToTupleOfVectors(cursor, vdm):
-    #this should really be done using unixODBC's C Api. This implementation will work,
-    #but isn't smart enough to page the columns as we build them, and also has boost-python-barrier
-    #slowness
+    """Stream the rows of 'cursor' into one FORA vector per column.
+
+    Rows are fetched in batches and each column is built up a page at a time, so we never
+    hold the whole result set as Python objects."""
+    columns = []
+
+    def makeFlushPage(columnIx, name):
+        columns.append(ForaNative.getEmptyVector())
 
-    columns, names = extractColumnDataFromQueryCursor(cursor)
+        def flushPage(kind, values):
+            columns[columnIx] = ForaNative.concatenateVectors(
+                columns[columnIx],
+                columnPageToForaVector(kind, values, vdm),
+                vdm
+                )
+
+        return flushPage
 
-    columns = [listToForaVector(x, vdm) for x in columns]
+    names = OdbcColumns.streamColumns(cursor, makeFlushPage)
+
+    return columns, names
 
-    return columns, tuple(names)
+
+_packedColumnTypes = {
+    OdbcColumns.KIND_FLOAT: ForaNative.Float64,
+    OdbcColumns.KIND_INT: ForaNative.Int64
+    }
+
+def columnPageToForaVector(kind, values, vdm):
+    if kind in _packedColumnTypes:
+        # the VDM copies the packed values straight into a pagelet
+        return vdm.loadByteArrayIntoNewVector(values.tostring(), _packedColumnTypes[kind])
+
+    return listToForaVector(values, vdm)
 
 
 def listToForaVector(elements, vdm):
@@ -713,6 +718,23 @@ def normalComputationResult(result):
         )
 
 
+_downloadScheduler = [None]
+_downloadSchedulerLock = threading.Lock()
+
+def downloadScheduler():
+    """The long-lived scheduler that S3KeyDownloader runs range requests through in this process.
+
+    It's shared by every download in the process so that what it learns about throughput and
+    latency carries over from one slice to the next."""
+    with _downloadSchedulerLock:
+        if _downloadScheduler[0] is None:
+            _downloadScheduler[0] = RangeDownloadScheduler.RangeDownloadScheduler(
+                Setup.config().externalDatasetLoaderThreadcount,
+                maxConcurrency=Setup.config().externalDatasetLoaderMaxThreadcount
+                )
+        return _downloadScheduler[0]
+
+
 class S3KeyDownloader(object):
     def __init__(self, s3Interface, bucketname, keyname, lowOffset, highOffset):
         self.s3Interface = s3Interface
@@ -744,68 +766,31 @@ class S3KeyDownloader(object):
 
         t0 = time.time()
 
-        totalThreads = Setup.config().externalDatasetLoaderThreadcount
-
-        def downloadThread(ix):
-            def downloader():
-                low = start + (stop - start) * ix / totalThreads
-                high = start + (stop - start) * (ix + 1) / totalThreads
-
-                tries = 0
-                while True:
-                    try:
-                        results[ix] = self.s3Interface.getKeyValueOverRange(
-                            self.bucketname,
-                            self.keyname,
-                            low,
-                            high
-                            )
-                        return
-                    except:
-                        if tries < 10:
-                            logging.warn(
-                                "Task %s had an exception:%s\nTries = %s. We will fail the " +
-                                "request when 'tries' gets to 10",
-                                self,
-                                traceback.format_exc(),
-                                tries
-                                )
-                            tries += 1
-                        else:
-                            results[ix] = sys.exc_info()
-                            return
-
-            return downloader
-
-
-        results = []
-        threads = []
-        for ix in range(totalThreads):
-            results.append(None)
-            threads.append(
-                threading.Thread(target=downloadThread(ix))
-                )
-
-        for t in threads:
-            t.start()
-
-        for t in threads:
-            t.join()
-
-        for r in results:
-            if isinstance(r, tuple):
-                exc_info = r
-                raise exc_info[0], exc_info[1], exc_info[2]
+        target = SharedMemoryFile.SharedMemoryFile(stop - start, prefix="ufora_s3_")
 
-        result = "".join(results)
-
-        assert len(result) == stop - start
-
-        logging.info("Actually extracting %s from s3 took %s",
-                     len(result) / 1024 / 1024.0,
-                     time.time() - t0)
+        try:
+            if stop > start:
+                downloadScheduler().download(
+                    self.s3Interface,
+                    self.bucketname,
+                    self.keyname,
+                    start,
+                    stop,
+                    target.mapped
+                    )
+            target.close()
+        except:
+            target.unlink()
+            raise
+
+        logging.info("Actually extracting %s from s3 took %s. Scheduler stats: %s",
+                     (stop - start) / 1024 / 1024.0,
+                     time.time() - t0,
+                     downloadScheduler().stats())
 
-        return result
+        # the parent process loads the data straight out of the shared-memory file, so
+        # only its path crosses the pipe
+        return target
 
 
 class ObjectStoreUploader(object):
@@ -157,6 +157,10 @@ class Config(object):
         self.computedValueGatewayRAMCacheMB = long(
             self.getConfigValue("COMPUTED_VALUE_GATEWAY_RAM_MB", 400)
             )
+        #fraction of the gateway's RAM cache that may fill before it evicts unrequested pages
+        self.computedValueGatewayRAMCacheEvictionThreshold = float(
+            self.getConfigValue("COMPUTED_VALUE_GATEWAY_RAM_EVICTION_THRESHOLD", 0.9)
+            )
 
         self.cumulusDiskCacheStorageMB = int(self.getConfigValue("CUMULUS_DISK_STORAGE_MB", 50000))
         self.cumulusDiskCacheStorageFileCount = int(
@@ -180,6 +184,11 @@ class Config(object):
                                 5,
                                 checkEnviron=True)
             )
+        self.externalDatasetLoaderMaxThreadcount = int(
+            self.getConfigValue("EXTERNAL_DATASET_LOADER_MAX_THREADS",
+                                32,
+                                checkEnviron=True)
+            )
         self.externalDatasetLoaderServiceThreads = int(
             self.getConfigValue("EXTERNAL_DATASET_LOADER_SERVICE_THREADS",
                                 max(2, int(cpu_count() * 0.25)),
@@ -304,6 +313,17 @@ class Config(object):
             self.getConfigValue("SHARED_STATE_LOG_PRUNE_INTERVAL_SEC", 60 * 60)
             )
 
+        #number of KeyspaceManagers the SharedState server spreads keyspaces across
+        self.sharedStatePartitionCount = int(
+            self.getConfigValue("SHARED_STATE_PARTITION_COUNT", 1)
+            )
+
+        #how long SharedState holds key updates for a client so repeated updates to a key
+        #collapse into one. Zero (the default) sends every update immediately.
+        self.sharedStateEventCoalescingSeconds = float(
+            self.getConfigValue("SHARED_STATE_EVENT_COALESCING_SEC", 0)
+            )
+
         self.sharedStateCache = expandConfigPath(
             self.getConfigValue("SHARED_STATE_CACHE_DIR",
                                 os.path.join(self.rootDataDir, "ss_cache")))
@@ -66,7 +66,9 @@ class PythonIoTaskService(object):
                 self.threadcount,
                 #for the inmemory tests, we can't run out of process because the fork may happen
                 #before we populate the memory abstraction
-                actuallyRunOutOfProcess=s3Interface.isCompatibleWithOutOfProcessDownloadPool
+                actuallyRunOutOfProcess=s3Interface.isCompatibleWithOutOfProcessDownloadPool,
+                #start more children only while there are loads to run in them
+                minProcesses=1
                 )
 
     def loadLoop(self):
@@ -13,6 +13,7 @@
 #   limitations under the License.
 
 import ufora.distributed.S3.S3Interface as S3Interface
+import ufora.distributed.S3.S3ConnectionPool as S3ConnectionPool
 import datetime
 import boto
 import boto.utils
@@ -22,6 +23,7 @@ import traceback
 import StringIO
 
 BUFFER_SIZE_OVERRIDE = 256 * 1024 * 1024
+STREAMING_READ_SIZE = 1024 * 1024
 
 class BotoKeyFileObject(object):
     def __init__(self, key):
@@ -102,37 +104,53 @@ class ActualS3Interface(S3Interface.S3Interface):
         else:
             return boto.connect_s3(**boto_args)
 
+    def connectionPool_(self):
+        # looked up rather than stored so that the interface stays picklable
+        return S3ConnectionPool.poolFor(
+            (self.credentials_, os.getenv('AWS_AVAILABILITY_ZONE')),
+            self.connectS3
+            )
+
+    def connectionPoolStats(self):
+        """Return statistics about the S3 connections this process holds for our credentials."""
+        return self.connectionPool_().stats()
+
     def initiateMultipartUpload(self, bucketName, eventualKeyName):
-        b = self.openOrCreateBucket_(bucketName)
-        return str(b.initiate_multipart_upload(eventualKeyName).id)
+        with self.connectionPool_().connection() as pooled:
+            b = self.openOrCreateBucket_(pooled, bucketName)
+            return str(b.initiate_multipart_upload(eventualKeyName).id)
 
     def completeMultipartUpload(self, bucketName, eventualKeyName, uploadId):
         """Complete a multipart upload"""
-        b = self.openOrCreateBucket_(bucketName)
-        mp = boto.s3.multipart.MultiPartUpload(b)
-        mp.key_name = eventualKeyName
-        mp.id = uploadId
+        with self.connectionPool_().connection() as pooled:
+            b = self.openOrCreateBucket_(pooled, bucketName)
+            mp = boto.s3.multipart.MultiPartUpload(b)
+            mp.key_name = eventualKeyName
+            mp.id = uploadId
 
-        mp.complete_upload()
+            mp.complete_upload()
+
+        self.connectionPool_().invalidateKey(bucketName, eventualKeyName)
 
     def setMultipartUploadPart(self, bucketName, eventualKeyName, uploadId, oneBasedPartNumber, value):
         """Perform a portion of a multipart upload"""
         stringAsFile = StringIO.StringIO(value)
 
-        b = self.openOrCreateBucket_(bucketName)
-        mp = boto.s3.multipart.MultiPartUpload(b)
-        mp.key_name = eventualKeyName
-        mp.id = uploadId
+        with self.connectionPool_().connection() as pooled:
+            b = self.openOrCreateBucket_(pooled, bucketName)
+            mp = boto.s3.multipart.MultiPartUpload(b)
+            mp.key_name = eventualKeyName
+            mp.id = uploadId
 
-        mp.upload_part_from_file(stringAsFile, oneBasedPartNumber)
+            mp.upload_part_from_file(stringAsFile, oneBasedPartNumber)
 
     def close(self):
         pass
 
     def listBuckets(self):
         """return a list of bucket names available in s3"""
-        s3 = self.connectS3()
-        return [str(bucket.name) for bucket in s3.get_all_buckets()]
+        with self.connectionPool_().connection() as pooled:
+            return [str(bucket.name) for bucket in pooled.connection.get_all_buckets()]
 
     def listKeysAndSizes(self, bucketName):
         """return a list of (keyname,keysize) tuples in a bucket"""
@@ -141,94 +159,133 @@ class ActualS3Interface(S3Interface.S3Interface):
     def listKeysWithPrefix(self, bucketName, prefix):
         """return a list of (keyname,keysize) tuples in a bucket"""
         options = {} if prefix is None else {"prefix": prefix}
-        bucket = self.openBucket_(bucketName)
-        return [(str(key.name), key.size, parseS3Timestamp(key.last_modified))
-                for key in bucket.get_all_keys(**options)]
+        with self.connectionPool_().connection() as pooled:
+            bucket = self.openBucket_(pooled, bucketName)
+            return [(str(key.name), key.size, parseS3Timestamp(key.last_modified))
+                    for key in bucket.get_all_keys(**options)]
 
     def getKeyValue(self, bucketName, keyName):
         """return the value of a key. raises KeyNotFound if it doesn't exist."""
-        key = self.openKey_(bucketName, keyName)
-        return key.get_contents_as_string()
+        with self.connectionPool_().connection() as pooled:
+            key = self.openKey_(pooled, bucketName, keyName)
+            return key.get_contents_as_string()
 
     def getKeyValueOverRange(self, bucketName, keyName, lowIndex, highIndex):
-        key = self.openKey_(bucketName, keyName)
-        return key.get_contents_as_string(
-            headers={"Range": "bytes=%s-%s" % (lowIndex, highIndex - 1)}
-            )
+        with self.connectionPool_().connection() as pooled:
+            key = self.openKey_(pooled, bucketName, keyName)
+            return key.get_contents_as_string(
+                headers={"Range": "bytes=%s-%s" % (lowIndex, highIndex - 1)}
+                )
+
+    def readKeyRangeInto(self, bucketName, keyName, lowIndex, highIndex, buffer, bufferOffset):
+        with self.connectionPool_().connection() as pooled:
+            key = self.openKey_(pooled, bucketName, keyName)
+            key.open_read(headers={"Range": "bytes=%s-%s" % (lowIndex, highIndex - 1)})
+            try:
+                offset = bufferOffset
+                end = bufferOffset + highIndex - lowIndex
+                while offset < end:
+                    chunk = key.read(min(STREAMING_READ_SIZE, end - offset))
+                    if not chunk:
+                        raise IOError(
+                            "Connection closed after %s of %s bytes reading %s/%s" % (
+                                offset - bufferOffset,
+                                highIndex - lowIndex,
+                                bucketName,
+                                keyName
+                                )
+                            )
+                    buffer[offset:offset + len(chunk)] = chunk
+                    offset += len(chunk)
+            finally:
+                key.close()
 
     def getKeySize(self, bucketName, keyName):
-        return self.openKey_(bucketName, keyName).size
+        with self.connectionPool_().connection() as pooled:
+            return self.openKey_(pooled, bucketName, keyName).size
 
-    def openKey_(self, bucketName, keyName, overrides=None):
+    def openKey_(self, pooled, bucketName, keyName):
         """return a boto key object. raises KeyNotFound if it doesn't exist."""
         # we don't verify access to the bucket because it's possible that
         # we have acess to read the key but not the bucket
-        bucket = self.openBucket_(bucketName, verifyAccess=False)
-        key = bucket.get_key(keyName)
+        bucket = self.openBucket_(pooled, bucketName, verifyAccess=False)
+        key = self.connectionPool_().key(pooled, bucket, keyName)
         if key is None:
             raise S3Interface.KeyNotFound(bucketName, keyName)
         key.BufferSize = BUFFER_SIZE_OVERRIDE
         return key
 
-    def tryOpenBucket_(self, bucketName, verifyAccess=True):
-        s3 = self.connectS3()
+    def tryOpenBucket_(self, pooled, bucketName, verifyAccess=True):
         try:
-            bucket = s3.get_bucket(bucketName, validate=verifyAccess)
-            return bucket
+            return self.connectionPool_().bucket(pooled, bucketName, verifyAccess)
         except:
             return None
 
-    def openBucket_(self, bucketName, verifyAccess=True):
-        bucket = self.tryOpenBucket_(bucketName, verifyAccess)
+    def openBucket_(self, pooled, bucketName, verifyAccess=True):
+        bucket = self.tryOpenBucket_(pooled, bucketName, verifyAccess)
         if bucket is None:
             raise S3Interface.BucketNotFound(bucketName)
         return bucket
 
     def keyExists(self, bucketName, keyName):
         """Returns a bool indicating whether the key exists"""
-        # we don't verify access to the bucket because it's possible that
-        # we have acess to read the key but not the bucket
-        bucket = self.tryOpenBucket_(bucketName, verifyAccess=False)
-        if bucket is None:
-            return False
+        with self.connectionPool_().connection() as pooled:
+            # we don't verify access to the bucket because it's possible that
+            # we have acess to read the key but not the bucket
+            bucket = self.tryOpenBucket_(pooled, bucketName, verifyAccess=False)
+            if bucket is None:
+                return False
 
-        key = bucket.get_key(keyName)
-        return key is not None
+            key = bucket.get_key(keyName)
+            return key is not None
 
     def deleteKey(self, bucketName, keyName):
-        # we don't verify access to the bucket because it's possible that
-        # we have acess to read the key but not the bucket
-        bucket = self.tryOpenBucket_(bucketName, verifyAccess=False)
-        if bucket is None:
-            return False
+        with self.connectionPool_().connection() as pooled:
+            # we don't verify access to the bucket because it's possible that
+            # we have acess to read the key but not the bucket
+            bucket = self.tryOpenBucket_(pooled, bucketName, verifyAccess=False)
+            if bucket is None:
+                return False
 
-        key = bucket.get_key(keyName)
-        if key is None:
-            raise S3Interface.KeyNotFound(bucketName, keyName)
+            key = bucket.get_key(keyName)
+            if key is None:
+                raise S3Interface.KeyNotFound(bucketName, keyName)
+
+            key.delete()
+            pooled.keys.pop((bucketName, keyName), None)
 
-        key.delete()
+        self.connectionPool_().invalidateKey(bucketName, keyName)
 
     def bucketExists(self, bucketName):
         """Returns a bool indicating whether the bucket exists"""
-        bucket = self.tryOpenBucket_(bucketName)
-        return bucket is not None
+        with self.connectionPool_().connection() as pooled:
+            bucket = self.tryOpenBucket_(pooled, bucketName)
+            return bucket is not None
 
     def setKeyValue(self, bucketName, keyName, value):
         """sets key 'keyName' in bucket 'bucketName' to value.
 
         creates the key and the bucket if they don't exist.
         """
-        bucket = self.openOrCreateBucket_(bucketName)
-        k = self.openOrCreateKey_(bucket, keyName)
-        k.set_contents_from_string(value)
+        with self.connectionPool_().connection() as pooled:
+            bucket = self.openOrCreateBucket_(pooled, bucketName)
+            k = self.openOrCreateKey_(bucket, keyName)
+            k.set_contents_from_string(value)
+            pooled.keys.pop((bucketName, keyName), None)
+
+        self.connectionPool_().invalidateKey(bucketName, keyName)
 
     def setKeyValueFromFile(self, bucketName, keyName, filePath):
-        bucket = self.openOrCreateBucket_(bucketName)
-        k = self.openOrCreateKey_(bucket, keyName)
-        k.set_contents_from_filename(filePath)
+        with self.connectionPool_().connection() as pooled:
+            bucket = self.openOrCreateBucket_(pooled, bucketName)
+            k = self.openOrCreateKey_(bucket, keyName)
+            k.set_contents_from_filename(filePath)
+            pooled.keys.pop((bucketName, keyName), None)
+
+        self.connectionPool_().invalidateKey(bucketName, keyName)
 
-    def openOrCreateBucket_(self, bucketName):
-        s3 = self.connectS3()
+    def openOrCreateBucket_(self, pooled, bucketName):
+        s3 = pooled.connection
         bucket = None
         attempts = 0
 
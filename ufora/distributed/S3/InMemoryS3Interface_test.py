@@ -77,3 +77,14 @@ class TestInMemoryS3Interface(unittest.TestCase):
         self.assertEqual(publicInterface.getKeyValue("aBucket", "aKey"), "this is multipart")
 
 
+
+    def test_read_key_range_into(self):
+        interface = InMemoryS3Interface.InMemoryS3InterfaceFactory()()
+        interface.setKeyValue("aBucket", "aKey", "0123456789")
+
+        buf = bytearray("-" * 8)
+        interface.readKeyRangeInto("aBucket", "aKey", 2, 6, buf, 3)
+        self.assertEqual(str(buf), "---2345-")
+
+        with self.assertRaises(IOError):
+            interface.readKeyRangeInto("aBucket", "aKey", 8, 12, buf, 0)
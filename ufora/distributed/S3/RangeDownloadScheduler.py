@@ -0,0 +1,428 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Adaptive scheduling of S3 range requests.
+
+A RangeDownloadScheduler downloads a byte range of a key as a set of smaller range requests.
+It models each request as taking 'latency + bytes / throughput' seconds, fitting both terms to
+the requests it has recently made, and uses the model to
+
+    * size the ranges, so that each one is long enough to amortize the request latency but
+      short enough that a stall is noticed quickly,
+    * pick how many requests to run at once, by hill-climbing on the aggregate rate that each
+      level of concurrency has achieved, and
+    * hedge: when a range has taken several times longer than the model predicts, the same
+      range is requested again and whichever request finishes first wins. S3 occasionally
+      stalls a request for a long time, and without hedging a single stalled tail range
+      holds up the entire download.
+"""
+
+import collections
+import logging
+import math
+import sys
+import threading
+import time
+import traceback
+
+import ufora.util.ExponentialMovingAverage as ExponentialMovingAverage
+import ufora.util.ThreadPool as ThreadPool
+
+MB = 1024 * 1024
+
+class RequestModel(object):
+    """Fits 'seconds = latency + bytes / throughput' to recently observed requests.
+
+    Each observation carries the same weight, discounted by its age, so the fit tracks changing
+    conditions. When the observed requests are all about the same size the two terms can't be
+    separated, and we keep the last latency estimate and attribute the rest to throughput.
+    """
+    def __init__(self, decay, initialLatency, initialThroughput):
+        self.weight_ = ExponentialMovingAverage.ExponentialMovingAverage(decay)
+        self.bytes_ = ExponentialMovingAverage.ExponentialMovingAverage(decay)
+        self.seconds_ = ExponentialMovingAverage.ExponentialMovingAverage(decay)
+        self.bytesSquared_ = ExponentialMovingAverage.ExponentialMovingAverage(decay)
+        self.bytesTimesSeconds_ = ExponentialMovingAverage.ExponentialMovingAverage(decay)
+
+        self.latency = initialLatency
+        self.throughput = initialThroughput
+        self.observations = 0
+
+    def observe(self, byteCount, seconds, obsTime=None):
+        if obsTime is None:
+            obsTime = time.time()
+
+        byteCount = float(byteCount)
+
+        for ema, value in [(self.weight_, 1.0),
+                           (self.bytes_, byteCount),
+                           (self.seconds_, seconds),
+                           (self.bytesSquared_, byteCount * byteCount),
+                           (self.bytesTimesSeconds_, byteCount * seconds)]:
+            ema.observe(value, 1.0, obsTime)
+
+        self.observations += 1
+        self.refit_()
+
+    def expectedSeconds(self, byteCount):
+        return self.latency + byteCount / self.throughput
+
+    def refit_(self):
+        weight = self.weight_.currentRate()
+        meanBytes = self.bytes_.currentRate() / weight
+        meanSeconds = self.seconds_.currentRate() / weight
+
+        varianceBytes = self.bytesSquared_.currentRate() / weight - meanBytes * meanBytes
+        covariance = self.bytesTimesSeconds_.currentRate() / weight - meanBytes * meanSeconds
+
+        if varianceBytes > (0.1 * meanBytes) ** 2 and covariance > 0.0:
+            slope = covariance / varianceBytes
+            self.latency = min(max(meanSeconds - slope * meanBytes, 0.0), meanSeconds)
+            self.throughput = 1.0 / slope
+        else:
+            self.latency = min(self.latency, meanSeconds / 2.0)
+            self.throughput = meanBytes / max(meanSeconds - self.latency, 1e-6)
+
+
+class RangeDownloadScheduler(object):
+    def __init__(self,
+                 initialConcurrency,
+                 maxConcurrency=32,
+                 minRangeBytes=MB,
+                 maxRangeBytes=64 * MB,
+                 latencyAmortization=10.0,
+                 targetRequestSeconds=2.0,
+                 hedgeFactor=3.0,
+                 minHedgeSeconds=0.25,
+                 maxTries=10,
+                 initialLatency=0.05,
+                 initialThroughput=10.0 * MB,
+                 decay=60.0):
+        self.maxConcurrency = maxConcurrency
+        self.minRangeBytes = minRangeBytes
+        self.maxRangeBytes = maxRangeBytes
+        self.latencyAmortization = latencyAmortization
+        self.targetRequestSeconds = targetRequestSeconds
+        self.hedgeFactor = hedgeFactor
+        self.minHedgeSeconds = minHedgeSeconds
+        self.maxTries = maxTries
+
+        self.lock_ = threading.Lock()
+        self.model_ = RequestModel(decay, initialLatency, initialThroughput)
+        self.concurrency_ = max(1, min(initialConcurrency, maxConcurrency))
+        self.rateByConcurrency_ = {}
+
+        # stalled requests keep their thread until they time out, so leave room for hedges
+        self.threadPool_ = ThreadPool.ThreadPool(maxConcurrency * 2)
+
+        self.downloads = 0
+        self.requests = 0
+        self.hedgedRequests = 0
+        self.hedgesWon = 0
+        self.failedRequests = 0
+
+    def concurrency(self):
+        with self.lock_:
+            return self.concurrency_
+
+    def stats(self):
+        with self.lock_:
+            return {
+                'downloads': self.downloads,
+                'requests': self.requests,
+                'hedgedRequests': self.hedgedRequests,
+                'hedgesWon': self.hedgesWon,
+                'failedRequests': self.failedRequests,
+                'concurrency': self.concurrency_,
+                'latency': self.model_.latency,
+                'throughputPerConnection': self.model_.throughput
+                }
+
+    def planRanges(self, lowIndex, highIndex, concurrency=None):
+        """Split [lowIndex, highIndex) into ranges to request separately.
+
+        Ranges shrink toward the end so that the connections finish at about the same time.
+        This also gives the model a spread of request sizes to separate latency from
+        throughput with.
+        """
+        if concurrency is None:
+            concurrency = self.concurrency()
+
+        with self.lock_:
+            latency = self.model_.latency
+            throughput = self.model_.throughput
+
+        rangeBytes = min(
+            throughput * latency * self.latencyAmortization,
+            throughput * self.targetRequestSeconds
+            )
+        rangeBytes = int(min(max(rangeBytes, self.minRangeBytes), self.maxRangeBytes))
+
+        # tail ranges still need to be long enough to be worth a request
+        smallestRangeBytes = max(rangeBytes / 4, self.minRangeBytes)
+
+        ranges = []
+        low = lowIndex
+        while low < highIndex:
+            remaining = highIndex - low
+            size = max(
+                min(rangeBytes, int(math.ceil(remaining / float(concurrency)))),
+                smallestRangeBytes
+                )
+
+            if remaining - size < smallestRangeBytes:
+                # don't leave a sliver that costs a whole request on its own
+                if remaining <= self.maxRangeBytes:
+                    size = remaining
+                else:
+                    size = remaining - smallestRangeBytes
+
+            ranges.append((low, low + size))
+            low += size
+
+        return ranges
+
+    def hedgeDeadline(self, byteCount):
+        with self.lock_:
+            expected = self.model_.expectedSeconds(byteCount)
+        return max(self.minHedgeSeconds, expected * self.hedgeFactor)
+
+    def download(self,
+                 s3Interface,
+                 bucketName,
+                 keyName,
+                 lowIndex,
+                 highIndex,
+                 buffer,
+                 bufferOffset=0):
+        """Write bytes [lowIndex, highIndex) of a key into 'buffer' starting at 'bufferOffset'.
+
+        'buffer' must support slice assignment. Requests that stall may still be writing the
+        same bytes into 'buffer' for a short while after this returns.
+        """
+        t0 = time.time()
+
+        concurrency = self.concurrency()
+        ranges = self.planRanges(lowIndex, highIndex, concurrency)
+        concurrency = min(concurrency, max(len(ranges), 1))
+
+        RangeDownload(
+            self,
+            s3Interface,
+            bucketName,
+            keyName,
+            lowIndex,
+            ranges,
+            buffer,
+            bufferOffset,
+            concurrency
+            ).run()
+
+        elapsed = time.time() - t0
+        with self.lock_:
+            self.downloads += 1
+            if len(ranges) >= concurrency and elapsed > 0.0:
+                self.observeAggregateRate_(concurrency, (highIndex - lowIndex) / elapsed)
+
+    def observeRequest_(self, byteCount, seconds, hedged):
+        with self.lock_:
+            self.requests += 1
+            if hedged:
+                self.hedgesWon += 1
+            self.model_.observe(byteCount, seconds)
+
+    def observeFailure_(self):
+        with self.lock_:
+            self.failedRequests += 1
+
+    def observeHedge_(self):
+        with self.lock_:
+            self.hedgedRequests += 1
+
+    def observeAggregateRate_(self, concurrency, rate):
+        prior = self.rateByConcurrency_.get(concurrency)
+        self.rateByConcurrency_[concurrency] = rate if prior is None else (prior + rate) / 2.0
+
+        if concurrency < self.maxConcurrency and concurrency + 1 not in self.rateByConcurrency_:
+            # we haven't tried one more connection yet, so try it
+            self.concurrency_ = concurrency + 1
+            return
+
+        candidates = [c for c in (concurrency - 1, concurrency, concurrency + 1)
+                      if c in self.rateByConcurrency_]
+        self.concurrency_ = max(candidates, key=lambda c: self.rateByConcurrency_[c])
+
+
+class RangeDownload(object):
+    """The state of one RangeDownloadScheduler.download call.
+
+    The calling thread starts requests on the scheduler's thread pool and waits on 'condition'
+    for them to finish, hedge deadlines to pass, or a range to run out of retries.
+    """
+    def __init__(self,
+                 scheduler,
+                 s3Interface,
+                 bucketName,
+                 keyName,
+                 lowIndex,
+                 ranges,
+                 buffer,
+                 bufferOffset,
+                 concurrency):
+        self.scheduler = scheduler
+        self.s3Interface = s3Interface
+        self.bucketName = bucketName
+        self.keyName = keyName
+        self.lowIndex = lowIndex
+        self.ranges = ranges
+        self.buffer = buffer
+        self.bufferOffset = bufferOffset
+        self.concurrency = concurrency
+
+        self.condition = threading.Condition()
+        self.pending = collections.deque(range(len(ranges)))
+        self.attemptStartTimes = dict((ix, []) for ix in range(len(ranges)))
+        self.failures = collections.defaultdict(int)
+        self.completed = set()
+        self.error = None
+        self.finished = False
+
+    def run(self):
+        with self.condition:
+            try:
+                while len(self.completed) < len(self.ranges) and self.error is None:
+                    nextDeadline = self.hedgeStalledRequests_()
+
+                    while self.pending and self.rangesInFlight_() < self.concurrency:
+                        self.startRequest_(self.pending.popleft(), hedged=False)
+
+                    self.condition.wait(
+                        None if nextDeadline is None else max(nextDeadline - time.time(), 0.01)
+                        )
+            finally:
+                self.finished = True
+
+            if self.error is not None:
+                raise self.error[0], self.error[1], self.error[2]
+
+    def rangesInFlight_(self):
+        # a hedged range counts once: we assume its stalled request isn't using the network
+        return len([
+            ix for ix, startTimes in self.attemptStartTimes.iteritems()
+            if startTimes and ix not in self.completed
+            ])
+
+    def hedgeStalledRequests_(self):
+        """Hedge ranges that have run past their deadline and return the next deadline."""
+        now = time.time()
+        nextDeadline = None
+
+        for ix, startTimes in self.attemptStartTimes.iteritems():
+            # only ranges with a single request in flight are eligible
+            if ix in self.completed or len(startTimes) != 1:
+                continue
+
+            low, high = self.ranges[ix]
+            deadline = startTimes[0] + self.scheduler.hedgeDeadline(high - low)
+
+            if deadline <= now:
+                logging.info(
+                    "Hedging S3 range request %s/%s [%s, %s) after %s seconds",
+                    self.bucketName,
+                    self.keyName,
+                    low,
+                    high,
+                    now - startTimes[0]
+                    )
+                self.scheduler.observeHedge_()
+                self.startRequest_(ix, hedged=True)
+            elif nextDeadline is None or deadline < nextDeadline:
+                nextDeadline = deadline
+
+        return nextDeadline
+
+    def startRequest_(self, ix, hedged):
+        t0 = time.time()
+        self.attemptStartTimes[ix].append(t0)
+        self.scheduler.threadPool_.submit(lambda: self.request_(ix, hedged, t0))
+
+    def request_(self, ix, hedged, t0):
+        low, high = self.ranges[ix]
+        started = time.time()
+
+        try:
+            if hedged:
+                # the first request for this range may still be writing into 'buffer', so
+                # the hedge reads into its own memory and copies only if it wins
+                target = bytearray(high - low)
+                self.s3Interface.readKeyRangeInto(
+                    self.bucketName, self.keyName, low, high, target, 0
+                    )
+            else:
+                target = None
+                self.s3Interface.readKeyRangeInto(
+                    self.bucketName,
+                    self.keyName,
+                    low,
+                    high,
+                    self.buffer,
+                    self.bufferOffset + low - self.lowIndex
+                    )
+        except:
+            self.requestFailed_(ix, t0, sys.exc_info())
+            return
+
+        with self.condition:
+            if ix in self.completed or self.finished:
+                return
+
+            if target is not None:
+                offset = self.bufferOffset + low - self.lowIndex
+                self.buffer[offset:offset + len(target)] = target
+            self.completed.add(ix)
+            self.condition.notify_all()
+
+        # only winners are observed: a request that lost a hedge says little about throughput
+        self.scheduler.observeRequest_(high - low, time.time() - started, hedged)
+
+    def requestFailed_(self, ix, t0, excInfo):
+        with self.condition:
+            if ix in self.completed or self.finished:
+                return
+
+            self.scheduler.observeFailure_()
+            self.attemptStartTimes[ix].remove(t0)
+            self.failures[ix] += 1
+
+            low, high = self.ranges[ix]
+            if self.failures[ix] >= self.scheduler.maxTries:
+                # let a request that's still running for this range have its chance
+                if not self.attemptStartTimes[ix]:
+                    self.error = excInfo
+            else:
+                logging.warn(
+                    "Range request %s/%s [%s, %s) failed (try %s of %s):\n%s",
+                    self.bucketName,
+                    self.keyName,
+                    low,
+                    high,
+                    self.failures[ix],
+                    self.scheduler.maxTries,
+                    "".join(traceback.format_exception(*excInfo))
+                    )
+                if not self.attemptStartTimes[ix]:
+                    self.pending.appendleft(ix)
+
+            self.condition.notify_all()
+
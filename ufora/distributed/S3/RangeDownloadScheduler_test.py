@@ -0,0 +1,264 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import logging
+import threading
+import time
+import unittest
+
+import ufora.distributed.S3.InMemoryS3Interface as InMemoryS3Interface
+import ufora.distributed.S3.RangeDownloadScheduler as RangeDownloadScheduler
+import ufora.test.PerformanceTestReporter as PerformanceTestReporter
+import ufora.util.ThreadPool as ThreadPool
+
+MB = 1024 * 1024
+
+class SlowS3Interface(object):
+    """Wraps an S3 interface to add a fixed latency to every request and to stall every
+    'stallEvery'th request, unless it's a retry or hedge of a range we've already seen."""
+    def __init__(self, s3Interface, latency=0.0, stallEvery=None, stallSeconds=0.0):
+        self.s3Interface = s3Interface
+        self.latency = latency
+        self.stallEvery = stallEvery
+        self.stallSeconds = stallSeconds
+        self.lock = threading.Lock()
+        self.rangesSeen = set()
+        self.requests = 0
+
+    def forgetRanges(self):
+        with self.lock:
+            self.rangesSeen = set()
+
+    def readKeyRangeInto(self, bucketName, keyName, lowIndex, highIndex, buffer, bufferOffset):
+        with self.lock:
+            isFirstRequest = (lowIndex, highIndex) not in self.rangesSeen
+            self.rangesSeen.add((lowIndex, highIndex))
+            self.requests += 1
+            shouldStall = (
+                self.stallEvery is not None and
+                isFirstRequest and
+                self.requests % self.stallEvery == 0
+                )
+
+        time.sleep(self.latency + (self.stallSeconds if shouldStall else 0.0))
+
+        self.s3Interface.readKeyRangeInto(
+            bucketName, keyName, lowIndex, highIndex, buffer, bufferOffset
+            )
+
+
+class FailingS3Interface(object):
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def readKeyRangeInto(self, bucketName, keyName, lowIndex, highIndex, buffer, bufferOffset):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise IOError("connection reset")
+        buffer[bufferOffset:bufferOffset + highIndex - lowIndex] = "x" * (highIndex - lowIndex)
+
+
+def keyContents(size):
+    pattern = "".join(chr(ix) for ix in range(251))
+    return (pattern * (size / len(pattern) + 1))[:size]
+
+
+class RangeDownloadSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.factory = InMemoryS3Interface.InMemoryS3InterfaceFactory()
+        self.s3 = self.factory()
+
+    def makeKey(self, size):
+        contents = keyContents(size)
+        self.s3.setKeyValue("bucket", "key", contents)
+        return contents
+
+    def test_download_writes_every_byte(self):
+        contents = self.makeKey(100000)
+        scheduler = RangeDownloadScheduler.RangeDownloadScheduler(
+            4,
+            minRangeBytes=1000,
+            maxRangeBytes=7000
+            )
+
+        for low, high in [(0, 100000), (12345, 67890), (5, 6), (10, 10)]:
+            buf = bytearray(high - low + 3)
+            scheduler.download(self.s3, "bucket", "key", low, high, buf, 3)
+            self.assertEqual(str(buf[3:]), contents[low:high])
+
+    def test_plan_ranges_covers_the_range(self):
+        scheduler = RangeDownloadScheduler.RangeDownloadScheduler(
+            4,
+            minRangeBytes=1000,
+            maxRangeBytes=7000
+            )
+
+        ranges = scheduler.planRanges(17, 100017)
+        self.assertEqual(ranges[0][0], 17)
+        self.assertEqual(ranges[-1][1], 100017)
+        for (_, high), (low, _) in zip(ranges[:-1], ranges[1:]):
+            self.assertEqual(high, low)
+        self.assertTrue(all(high - low <= 7000 for low, high in ranges))
+
+    def test_ranges_grow_with_latency(self):
+        scheduler = RangeDownloadScheduler.RangeDownloadScheduler(
+            1,
+            minRangeBytes=1,
+            maxRangeBytes=1000 * MB,
+            initialLatency=0.01,
+            initialThroughput=10.0 * MB
+            )
+        shortLatencyRanges = scheduler.planRanges(0, 1000 * MB)
+
+        scheduler.model_.latency = 0.1
+        longLatencyRanges = scheduler.planRanges(0, 1000 * MB)
+
+        self.assertGreater(len(shortLatencyRanges), len(longLatencyRanges))
+
+    def test_model_separates_latency_and_throughput(self):
+        model = RangeDownloadScheduler.RequestModel(60.0, 1.0, 1.0)
+
+        t0 = time.time()
+        for ix in range(40):
+            byteCount = (ix % 8 + 1) * MB
+            model.observe(byteCount, 0.1 + byteCount / (20.0 * MB), t0 + ix * 0.01)
+
+        self.assertAlmostEqual(model.latency, 0.1, places=3)
+        self.assertAlmostEqual(model.throughput / MB, 20.0, places=1)
+
+    def test_stalled_ranges_are_hedged(self):
+        contents = self.makeKey(10 * MB)
+        self.factory.setThroughputPerMachine(100 * MB)
+
+        scheduler = RangeDownloadScheduler.RangeDownloadScheduler(
+            4,
+            minRangeBytes=MB,
+            maxRangeBytes=MB,
+            minHedgeSeconds=0.05
+            )
+
+        stalling = SlowS3Interface(self.s3, stallEvery=3, stallSeconds=3.0)
+
+        t0 = time.time()
+        buf = bytearray(10 * MB)
+        scheduler.download(stalling, "bucket", "key", 0, 10 * MB, buf)
+
+        self.assertLess(time.time() - t0, 2.0)
+        self.assertTrue(str(buf) == contents)
+        self.assertGreater(scheduler.stats()['hedgesWon'], 0)
+
+    def test_failed_requests_are_retried(self):
+        scheduler = RangeDownloadScheduler.RangeDownloadScheduler(1, minRangeBytes=10)
+
+        buf = bytearray(10)
+        scheduler.download(FailingS3Interface(3), "bucket", "key", 0, 10, buf)
+
+        self.assertEqual(str(buf), "x" * 10)
+        self.assertEqual(scheduler.stats()['failedRequests'], 3)
+
+    def test_download_fails_after_max_tries(self):
+        scheduler = RangeDownloadScheduler.RangeDownloadScheduler(
+            1,
+            minRangeBytes=10,
+            maxTries=3
+            )
+
+        with self.assertRaises(IOError):
+            scheduler.download(FailingS3Interface(3), "bucket", "key", 0, 10, bytearray(10))
+
+    def test_concurrency_climbs_while_it_helps(self):
+        self.makeKey(8 * MB)
+        self.factory.setThroughputPerMachine(40 * MB)
+
+        scheduler = RangeDownloadScheduler.RangeDownloadScheduler(
+            1,
+            maxConcurrency=4,
+            minRangeBytes=MB / 4,
+            maxRangeBytes=MB / 4
+            )
+
+        for _ in range(6):
+            scheduler.download(self.s3, "bucket", "key", 0, 8 * MB, bytearray(8 * MB))
+
+        self.assertGreaterEqual(scheduler.concurrency(), 3)
+
+    def downloadBenchmark(self, useScheduler, stallEvery=None):
+        megabytes = 32
+        downloads = 8
+        contents = self.makeKey(megabytes * MB)
+        self.factory.setThroughputPerMachine(50 * MB)
+
+        scheduler = RangeDownloadScheduler.RangeDownloadScheduler(5)
+        threadPool = ThreadPool.ThreadPool(5)
+
+        def evenSplit(s3, buf):
+            # what S3KeyDownloader did before it had a scheduler
+            def downloader(ix):
+                low = megabytes * MB * ix / 5
+                high = megabytes * MB * (ix + 1) / 5
+                return lambda: s3.readKeyRangeInto("bucket", "key", low, high, buf, low)
+
+            threadPool.runAll([downloader(ix) for ix in range(5)])
+
+        # S3 requests take tens of milliseconds to start, and about 1 in 10 stalls
+        s3 = SlowS3Interface(self.s3, latency=0.03, stallEvery=stallEvery, stallSeconds=1.0)
+
+        def download(buf):
+            s3.forgetRanges()
+            if useScheduler:
+                scheduler.download(s3, "bucket", "key", 0, megabytes * MB, buf)
+            else:
+                evenSplit(s3, buf)
+
+        buf = bytearray(megabytes * MB)
+
+        # the scheduler lives as long as the downloader process, so let it warm up
+        for _ in range(2):
+            download(buf)
+
+        t0 = time.time()
+        for _ in range(downloads):
+            download(buf)
+        elapsed = time.time() - t0
+
+        self.assertTrue(str(buf) == contents)
+
+        logging.info(
+            "Downloaded %s MB at %s MB/s%s",
+            megabytes * downloads,
+            megabytes * downloads / elapsed,
+            ". scheduler stats: %s" % scheduler.stats() if useScheduler else ""
+            )
+
+    @PerformanceTestReporter.PerfTest("python.S3.RangeDownload.EvenSplit")
+    def test_benchmark_even_split(self):
+        self.downloadBenchmark(False)
+
+    @PerformanceTestReporter.PerfTest("python.S3.RangeDownload.Adaptive")
+    def test_benchmark_adaptive(self):
+        self.downloadBenchmark(True)
+
+    @PerformanceTestReporter.PerfTest("python.S3.RangeDownload.EvenSplitWithStalls")
+    def test_benchmark_even_split_with_stalls(self):
+        self.downloadBenchmark(False, stallEvery=10)
+
+    @PerformanceTestReporter.PerfTest("python.S3.RangeDownload.AdaptiveWithStalls")
+    def test_benchmark_adaptive_with_stalls(self):
+        self.downloadBenchmark(True, stallEvery=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
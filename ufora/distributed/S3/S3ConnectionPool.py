@@ -0,0 +1,218 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Per-process pools of S3 connections.
+
+Opening a boto connection costs a TCP and TLS handshake, and looking up a bucket or a key
+costs a round trip. A pool hands each thread a connection that was opened (and whose
+sockets boto keeps alive) by an earlier request, together with the bucket and key handles
+looked up on it. A connection that raised while checked out is discarded, as is one that
+sat idle for longer than 'maxIdleSeconds', by which time S3 has usually closed its sockets.
+"""
+
+import contextlib
+import sys
+import threading
+import time
+
+import ufora.distributed.S3.S3Interface as S3Interface
+
+DEFAULT_MAX_IDLE_CONNECTIONS = 32
+DEFAULT_MAX_IDLE_SECONDS = 20.0
+DEFAULT_KEY_HANDLE_SECONDS = 30.0
+
+
+class PooledConnection(object):
+    """A connection and the handles looked up on it. Only one thread uses it at a time."""
+    def __init__(self, connection):
+        self.connection = connection
+        self.lastReleased = time.time()
+
+        #(bucketName, verifyAccess) -> bucket handle
+        self.buckets = {}
+
+        #(bucketName, keyName) -> (key handle, time it was looked up)
+        self.keys = {}
+
+
+class S3ConnectionPool(object):
+    def __init__(self,
+                 connect,
+                 maxIdleConnections=DEFAULT_MAX_IDLE_CONNECTIONS,
+                 maxIdleSeconds=DEFAULT_MAX_IDLE_SECONDS,
+                 keyHandleSeconds=DEFAULT_KEY_HANDLE_SECONDS):
+        self.connect_ = connect
+        self.maxIdleConnections = maxIdleConnections
+        self.maxIdleSeconds = maxIdleSeconds
+        self.keyHandleSeconds = keyHandleSeconds
+
+        self.lock_ = threading.Lock()
+
+        #most recently released last
+        self.idle_ = []
+        self.inUseCount_ = 0
+
+        self.stats_ = {
+            'connectionsCreated': 0,
+            'connectionsReused': 0,
+            'connectionsDiscarded': 0,
+            'bucketHandleHits': 0,
+            'bucketHandleMisses': 0,
+            'keyHandleHits': 0,
+            'keyHandleMisses': 0
+            }
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Check out a PooledConnection for the duration of a 'with' block.
+
+        If the block raises anything but an answer from S3, the connection is assumed to be
+        broken and is not reused.
+        """
+        pooled = self.acquire()
+        try:
+            yield pooled
+        except:
+            self.release(pooled, healthy=isServerResponse(sys.exc_info()[1]))
+            raise
+        else:
+            self.release(pooled)
+
+    def acquire(self):
+        with self.lock_:
+            now = time.time()
+            while self.idle_:
+                pooled = self.idle_.pop()
+                if now - pooled.lastReleased < self.maxIdleSeconds:
+                    self.inUseCount_ += 1
+                    self.stats_['connectionsReused'] += 1
+                    return pooled
+                self.stats_['connectionsDiscarded'] += 1
+                closeConnection(pooled)
+
+            self.inUseCount_ += 1
+            self.stats_['connectionsCreated'] += 1
+
+        try:
+            return PooledConnection(self.connect_())
+        except:
+            with self.lock_:
+                self.inUseCount_ -= 1
+            raise
+
+    def release(self, pooled, healthy=True):
+        with self.lock_:
+            self.inUseCount_ -= 1
+
+            if not healthy or len(self.idle_) >= self.maxIdleConnections:
+                self.stats_['connectionsDiscarded'] += 1
+                closeConnection(pooled)
+                return
+
+            pooled.lastReleased = time.time()
+            self.idle_.append(pooled)
+
+    def bucket(self, pooled, bucketName, verifyAccess):
+        """The bucket handle for 'bucketName' on 'pooled', looking it up if necessary.
+
+        Raises whatever the connection raises if the bucket can't be opened.
+        """
+        cacheKey = (bucketName, verifyAccess)
+        bucket = pooled.buckets.get(cacheKey)
+        if bucket is not None:
+            self.recordHit_('bucketHandle', True)
+            return bucket
+
+        self.recordHit_('bucketHandle', False)
+        bucket = pooled.connection.get_bucket(bucketName, validate=verifyAccess)
+        pooled.buckets[cacheKey] = bucket
+        return bucket
+
+    def key(self, pooled, bucket, keyName):
+        """The key handle for 'keyName' in 'bucket', or None if it doesn't exist.
+
+        Handles are reused for 'keyHandleSeconds', so a key's size may be that stale.
+        """
+        cacheKey = (bucket.name, keyName)
+        cached = pooled.keys.get(cacheKey)
+        if cached is not None and time.time() - cached[1] < self.keyHandleSeconds:
+            self.recordHit_('keyHandle', True)
+            return cached[0]
+
+        self.recordHit_('keyHandle', False)
+        key = bucket.get_key(keyName)
+        if key is None:
+            pooled.keys.pop(cacheKey, None)
+        else:
+            pooled.keys[cacheKey] = (key, time.time())
+        return key
+
+    def invalidateKey(self, bucketName, keyName):
+        """Forget cached handles for a key that was written or deleted."""
+        with self.lock_:
+            for pooled in self.idle_:
+                pooled.keys.pop((bucketName, keyName), None)
+
+    def stats(self):
+        with self.lock_:
+            stats = dict(self.stats_)
+            stats['idleConnections'] = len(self.idle_)
+            stats['connectionsInUse'] = self.inUseCount_
+            return stats
+
+    def clear(self):
+        with self.lock_:
+            for pooled in self.idle_:
+                closeConnection(pooled)
+            self.idle_ = []
+
+    def recordHit_(self, kind, hit):
+        with self.lock_:
+            self.stats_[kind + ('Hits' if hit else 'Misses')] += 1
+
+
+def isServerResponse(exception):
+    """Whether 'exception' reports something S3 said, rather than a failed connection."""
+    #boto's S3ResponseError carries the HTTP status of the response
+    return isinstance(exception, S3Interface.S3InterfaceError) or hasattr(exception, 'status')
+
+def closeConnection(pooled):
+    close = getattr(pooled.connection, 'close', None)
+    if close is not None:
+        try:
+            close()
+        except Exception:
+            pass
+
+
+_pools = {}
+_poolsLock = threading.Lock()
+
+def poolFor(poolKey, connect):
+    """The pool of this process for 'poolKey' (e.g. credentials and region).
+
+    'connect' creates a new connection if the pool doesn't exist yet.
+    """
+    with _poolsLock:
+        pool = _pools.get(poolKey)
+        if pool is None:
+            pool = _pools[poolKey] = S3ConnectionPool(connect)
+        return pool
+
+def allPoolStats():
+    """Statistics for every pool in this process, keyed by an anonymized pool id."""
+    with _poolsLock:
+        pools = list(_pools.values())
+    return dict(('pool_%s' % ix, pool.stats()) for ix, pool in enumerate(pools))
+
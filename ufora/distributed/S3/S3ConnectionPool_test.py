@@ -0,0 +1,140 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import unittest
+
+import ufora.distributed.S3.S3ConnectionPool as S3ConnectionPool
+import ufora.distributed.S3.S3Interface as S3Interface
+
+
+class FakeBucket(object):
+    def __init__(self, name, keys):
+        self.name = name
+        self.keys = keys
+        self.keyLookups = 0
+
+    def get_key(self, keyName):
+        self.keyLookups += 1
+        return self.keys.get(keyName)
+
+
+class FakeConnection(object):
+    def __init__(self):
+        self.bucketLookups = 0
+        self.closed = False
+
+    def get_bucket(self, bucketName, validate=True):
+        self.bucketLookups += 1
+        return FakeBucket(bucketName, {'key': 'a key handle'})
+
+    def close(self):
+        self.closed = True
+
+
+class S3ConnectionPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.connections = []
+        self.pool = S3ConnectionPool.S3ConnectionPool(self.connect)
+
+    def connect(self):
+        self.connections.append(FakeConnection())
+        return self.connections[-1]
+
+    def test_connections_are_reused(self):
+        with self.pool.connection() as pooled:
+            first = pooled
+        with self.pool.connection() as pooled:
+            self.assertIs(pooled, first)
+
+        self.assertEqual(len(self.connections), 1)
+        self.assertEqual(self.pool.stats()['connectionsReused'], 1)
+
+    def test_concurrent_users_get_separate_connections(self):
+        first = self.pool.acquire()
+        second = self.pool.acquire()
+        self.assertIsNot(first, second)
+        self.assertEqual(self.pool.stats()['connectionsInUse'], 2)
+
+        self.pool.release(first)
+        self.pool.release(second)
+        self.assertEqual(self.pool.stats()['idleConnections'], 2)
+
+    def test_failed_connections_are_discarded(self):
+        with self.assertRaises(IOError):
+            with self.pool.connection():
+                raise IOError("connection reset")
+
+        self.assertTrue(self.connections[0].closed)
+        with self.pool.connection():
+            pass
+        self.assertEqual(len(self.connections), 2)
+
+    def test_server_errors_keep_the_connection(self):
+        with self.assertRaises(S3Interface.KeyNotFound):
+            with self.pool.connection():
+                raise S3Interface.KeyNotFound('bucket', 'key')
+
+        self.assertFalse(self.connections[0].closed)
+        self.assertEqual(self.pool.stats()['idleConnections'], 1)
+
+    def test_idle_connections_expire(self):
+        self.pool.maxIdleSeconds = 0.0
+        with self.pool.connection():
+            pass
+        with self.pool.connection():
+            pass
+
+        self.assertEqual(len(self.connections), 2)
+        self.assertTrue(self.connections[0].closed)
+
+    def test_bucket_and_key_handles_are_cached(self):
+        with self.pool.connection() as pooled:
+            bucket = self.pool.bucket(pooled, 'bucket', False)
+            self.assertEqual(self.pool.key(pooled, bucket, 'key'), 'a key handle')
+
+        with self.pool.connection() as pooled:
+            self.assertIs(self.pool.bucket(pooled, 'bucket', False), bucket)
+            self.assertEqual(self.pool.key(pooled, bucket, 'key'), 'a key handle')
+
+        self.assertEqual(self.connections[0].bucketLookups, 1)
+        self.assertEqual(bucket.keyLookups, 1)
+
+        stats = self.pool.stats()
+        self.assertEqual(stats['bucketHandleHits'], 1)
+        self.assertEqual(stats['keyHandleMisses'], 1)
+
+    def test_invalidated_keys_are_looked_up_again(self):
+        with self.pool.connection() as pooled:
+            bucket = self.pool.bucket(pooled, 'bucket', False)
+            self.pool.key(pooled, bucket, 'key')
+
+        self.pool.invalidateKey('bucket', 'key')
+
+        with self.pool.connection() as pooled:
+            self.pool.key(pooled, bucket, 'key')
+
+        self.assertEqual(bucket.keyLookups, 2)
+
+    def test_missing_keys_are_not_cached(self):
+        with self.pool.connection() as pooled:
+            bucket = self.pool.bucket(pooled, 'bucket', False)
+            self.assertIsNone(self.pool.key(pooled, bucket, 'missing'))
+            self.assertIsNone(self.pool.key(pooled, bucket, 'missing'))
+
+        self.assertEqual(bucket.keyLookups, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
@@ -188,6 +188,22 @@ class S3Interface(object):
         """return the value of a key. raises KeyNotFound if it doesn't exist."""
         assert False, "Subclasses implement"
 
+    def readKeyRangeInto(self, bucketName, keyName, lowIndex, highIndex, buffer, bufferOffset):
+        """write bytes [lowIndex, highIndex) of a key into 'buffer' starting at 'bufferOffset'.
+
+        'buffer' may be anything supporting slice assignment (e.g. an mmap or bytearray).
+        Subclasses that can stream should override this to avoid holding the whole range
+        in memory. raises KeyNotFound if the key doesn't exist.
+        """
+        data = self.getKeyValueOverRange(bucketName, keyName, lowIndex, highIndex)
+        if len(data) != highIndex - lowIndex:
+            raise IOError(
+                "Expected %s bytes from %s/%s but got %s" % (
+                    highIndex - lowIndex, bucketName, keyName, len(data)
+                    )
+                )
+        buffer[bufferOffset:bufferOffset + len(data)] = data
+
     def getKeySize(self, bucketName, keyName):
         """return the size of a key. raises KeyNotFound if it doesn't exist."""
         assert False, "Subclasses implement"
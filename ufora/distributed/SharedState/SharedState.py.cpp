@@ -218,6 +218,8 @@ struct KeyspaceStorageWrapper {
 
 	static void compress(PolymorphicSharedPtr<KeyspaceStorage>& inStorage)
 		{
+		ScopedPyThreads releaseTheGil;
+
 		inStorage->compress();
 		}
 
@@ -23,6 +23,7 @@
 #include "Common.hpp"
 #include "Types.hppml"
 #include "KeyspaceManager.hppml"
+#include "PartitionedKeyspaceManager.hppml"
 #include "Storage/FileStorage.hppml"
 #include "KeyRangeSet.hppml"
 #include "Storage/LogEntry.hppml"
@@ -764,6 +765,67 @@ public:
 			return inHolder->storage();
 			}
 
+		static void keyspace_manager_set_event_coalescing_interval(
+										KeyspaceManager::pointer_type& inHolder,
+										double seconds
+										)
+			{
+			inHolder->setEventCoalescingInterval(seconds);
+			}
+
+		static PartitionedKeyspaceManager::pointer_type* createPartitionedKeyspaceManager(
+				PolymorphicSharedPtr<CallbackScheduler> inCallbackScheduler,
+				boost::python::list partitions
+				)
+			{
+			vector<KeyspaceManager::pointer_type> managers;
+			Ufora::python::toCPP(partitions, managers);
+
+			return new PartitionedKeyspaceManager::pointer_type(
+				new PartitionedKeyspaceManager(inCallbackScheduler, managers)
+				);
+			}
+
+		static void partitioned_keyspace_manager_add(
+										PartitionedKeyspaceManager::pointer_type& inHolder,
+										manager_channel_ptr_type& inChannel
+										)
+			{
+			inHolder->add(inChannel);
+			}
+
+		static void partitioned_keyspace_manager_check(PartitionedKeyspaceManager::pointer_type& inHolder)
+			{
+			inHolder->check();
+			}
+
+		static void partitioned_keyspace_manager_shutdown(PartitionedKeyspaceManager::pointer_type& inHolder)
+			{
+			inHolder->shutdown();
+			}
+
+		static boost::python::object partitioned_keyspace_manager_get_all_keyspaces(
+										PartitionedKeyspaceManager::pointer_type& inHolder
+										)
+			{
+			vector<Keyspace> tr = inHolder->getAllKeyspaces();
+			return iteratorPairToList(tr.begin(), tr.end());
+			}
+
+		static PolymorphicSharedPtr<FileStorage> partitioned_keyspace_manager_storage(
+										PartitionedKeyspaceManager::pointer_type& inHolder
+										)
+			{
+			return inHolder->storage();
+			}
+
+		static uint32_t partitioned_keyspace_manager_partition_count(
+										PartitionedKeyspaceManager::pointer_type& inHolder
+										)
+			{
+			return inHolder->partitionCount();
+			}
+
 		template<typename channel_type, typename out_message_type>
 		static out_message_type channel_get(channel_type& channel)
 			{
@@ -885,9 +947,20 @@ public:
 				.def("check", &keyspace_manager_check)
 				.def("shutdown", &keyspace_manager_shutdown)
 				.def("getAllKeyspaces", &keyspace_manager_get_all_keyspaces)
+				.def("setEventCoalescingInterval", &keyspace_manager_set_event_coalescing_interval)
 				.add_property("storage", &keyspace_manager_storage)
 				;
 
+			class_<PartitionedKeyspaceManager::pointer_type >("PartitionedKeyspaceManager", no_init)
+				.def("__init__", make_constructor(&createPartitionedKeyspaceManager))
+				.def("add", &partitioned_keyspace_manager_add)
+				.def("check", &partitioned_keyspace_manager_check)
+				.def("shutdown", &partitioned_keyspace_manager_shutdown)
+				.def("getAllKeyspaces", &partitioned_keyspace_manager_get_all_keyspaces)
+				.add_property("storage", &partitioned_keyspace_manager_storage)
+				.add_property("partitionCount", &partitioned_keyspace_manager_partition_count)
+				;
+
 
 			Ufora::python::CPPMLWrapper<LogEntry>(true).class_()
 				.def("__cmp__", cppmlCmpPy<LogEntry>)
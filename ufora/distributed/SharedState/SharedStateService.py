@@ -14,6 +14,7 @@
 
 import logging
 import os
+import Queue
 import threading
 import time
 import traceback
@@ -43,13 +44,7 @@ def createServerSocketChannel(callbackScheduler, sock):
     return SharedStateNative.ServerSocketChannel(callbackScheduler, sock.fileno())
 
 
-def KeyspaceManager(randomSeed,
-                    numManagers,
-                    backupInterval=60*10,
-                    pingInterval=20,
-                    cachePathOverride=None,
-                    maxOpenFiles=None,
-                    maxLogFileSizeMb=10):
+def FileStorage(cachePathOverride=None, maxOpenFiles=None, maxLogFileSizeMb=10):
     if cachePathOverride is None:
         cachePathOverride = Setup.config().sharedStateCache
 
@@ -57,30 +52,99 @@ def KeyspaceManager(randomSeed,
         import resource
         maxOpenFiles = min(resource.getrlimit(resource.RLIMIT_NOFILE)[0] / 2, 1000)
 
-    if cachePathOverride != "":
-        logging.info(
-            "Creating FileStorage(cachePathOverride=%s, maxOpenFiles=%s, maxLogFileSizeMb=%s)",
-            cachePathOverride,
-            maxOpenFiles,
-            maxLogFileSizeMb)
-        storage = SharedStateNative.Storage.FileStorage(cachePathOverride,
-                                                        maxOpenFiles,
-                                                        maxLogFileSizeMb)
-    else:
-        storage = None
-
-    return SharedStateNative.KeyspaceManager(
+    if cachePathOverride == "":
+        return None
+
+    logging.info(
+        "Creating FileStorage(cachePathOverride=%s, maxOpenFiles=%s, maxLogFileSizeMb=%s)",
+        cachePathOverride,
+        maxOpenFiles,
+        maxLogFileSizeMb)
+    return SharedStateNative.Storage.FileStorage(cachePathOverride,
+                                                 maxOpenFiles,
+                                                 maxLogFileSizeMb)
+
+
+def createKeyspaceManager_(randomSeed,
+                           numManagers,
+                           backupInterval,
+                           pingInterval,
+                           storage,
+                           eventCoalescingInterval):
+    if eventCoalescingInterval is None:
+        eventCoalescingInterval = Setup.config().sharedStateEventCoalescingSeconds
+
+    manager = SharedStateNative.KeyspaceManager(
         randomSeed,
         numManagers,
         backupInterval,
         pingInterval,
         storage
         )
+    manager.setEventCoalescingInterval(eventCoalescingInterval)
+    return manager
+
+
+def KeyspaceManager(randomSeed,
+                    numManagers,
+                    backupInterval=60*10,
+                    pingInterval=20,
+                    cachePathOverride=None,
+                    maxOpenFiles=None,
+                    maxLogFileSizeMb=10,
+                    eventCoalescingInterval=None):
+    return createKeyspaceManager_(
+        randomSeed,
+        numManagers,
+        backupInterval,
+        pingInterval,
+        FileStorage(cachePathOverride, maxOpenFiles, maxLogFileSizeMb),
+        eventCoalescingInterval
+        )
+
+
+def PartitionedKeyspaceManager(callbackScheduler,
+                               partitionCount,
+                               randomSeed,
+                               numManagers,
+                               backupInterval=60*10,
+                               pingInterval=20,
+                               cachePathOverride=None,
+                               maxOpenFiles=None,
+                               maxLogFileSizeMb=10,
+                               eventCoalescingInterval=None):
+    """A manager that spreads keyspaces across 'partitionCount' KeyspaceManagers.
+
+    Each partition handles its channels on its own threads. Clients connect exactly as they
+    would to a single KeyspaceManager. The partitions share one FileStorage.
+    """
+    storage = FileStorage(cachePathOverride, maxOpenFiles, maxLogFileSizeMb)
+
+    return SharedStateNative.PartitionedKeyspaceManager(
+        callbackScheduler,
+        [
+            createKeyspaceManager_(
+                randomSeed + partition,
+                numManagers,
+                backupInterval,
+                pingInterval,
+                storage,
+                eventCoalescingInterval
+                )
+            for partition in range(partitionCount)
+            ]
+        )
 
 
 class SharedStateService(CloudService.Service):
-    def __init__(self, callbackScheduler, cachePathOverride=None, port=None):
+    def __init__(self,
+                 callbackScheduler,
+                 cachePathOverride=None,
+                 port=None,
+                 compressionThreadCount=8,
+                 partitionCount=None):
         self.callbackScheduler = callbackScheduler
+        self.compressionThreadCount = compressionThreadCount
         port = Setup.config().sharedStatePort
         logging.info("Initializing SharedStateService with port = %s", port)
 
@@ -92,12 +156,26 @@ class SharedStateService(CloudService.Service):
 
         CloudService.Service.__init__(self)
         self.socketServer = SimpleServer.SimpleServer(port)
-        self.keyspaceManager = KeyspaceManager(
-            0,
-            1,
-            pingInterval=120,
-            cachePathOverride=cachePathOverride
-            )
+        if partitionCount is None:
+            partitionCount = Setup.config().sharedStatePartitionCount
+
+        if partitionCount > 1:
+            logging.info("Partitioning SharedState keyspaces across %s managers", partitionCount)
+            self.keyspaceManager = PartitionedKeyspaceManager(
+                callbackScheduler,
+                partitionCount,
+                0,
+                1,
+                pingInterval=120,
+                cachePathOverride=cachePathOverride
+                )
+        else:
+            self.keyspaceManager = KeyspaceManager(
+                0,
+                1,
+                pingInterval=120,
+                cachePathOverride=cachePathOverride
+                )
 
 
         self.socketServer._onConnect = self.onConnect
@@ -126,6 +204,7 @@ class SharedStateService(CloudService.Service):
                 time.sleep(1)
 
     def compressOrphandLogFiles(self):
+        toCompress = Queue.Queue()
         for keyspaceDir in os.listdir(self.cachePath):
             keyspaceType, dimensions, keyspaceName = keyspaceDir.split('::')
             dimensions = int(dimensions)
@@ -134,9 +213,44 @@ class SharedStateService(CloudService.Service):
                                             NativeJson.Json.parse(keyspaceName),
                                             dimensions)
             for i in range(dimensions):
-                logging.info("Compressing keyspace: %s", keyspaceName)
-                keyspaceStorage = self.keyspaceManager.storage.storageForKeyspace(keyspace, i)
+                toCompress.put((keyspace, keyspaceName, i))
+
+        # compression releases the GIL, so keyspaces compress in parallel
+        failures = []
+        threads = [
+            ManagedThread.ManagedThread(
+                target=self.compressionLoop,
+                args=(toCompress, failures)
+                )
+            for _ in range(max(1, min(self.compressionThreadCount, toCompress.qsize())))
+            ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if failures:
+            raise SharedStateException("Failed to compress keyspaces: %s" % failures)
+
+    def compressionLoop(self, toCompress, failures):
+        while True:
+            try:
+                keyspace, keyspaceName, dimension = toCompress.get_nowait()
+            except Queue.Empty:
+                return
+
+            logging.info("Compressing keyspace: %s", keyspaceName)
+            try:
+                keyspaceStorage = self.keyspaceManager.storage.storageForKeyspace(
+                    keyspace,
+                    dimension
+                    )
                 keyspaceStorage.compress()
+            except:
+                logging.error("Error compressing keyspace %s:\n%s",
+                              keyspaceName,
+                              traceback.format_exc())
+                failures.append(keyspaceName)
 
     def onConnect(self, sock, address):
         if not self.socketServer._started:
@@ -19,6 +19,7 @@
 #include <string>
 #include <vector>
 #include <stdexcept>
+#include <unistd.h>
 
 #include <boost/crc.hpp>
 #include <boost/enable_shared_from_this.hpp>
@@ -72,7 +73,8 @@ ChecksummedWriter::ChecksummedWriter(string path) :
     mFile(NULL),
     mPath(path),
     mDataError(false),
-    mIsDirty(false)
+    mIsDirty(false),
+    mIsUnsynced(false)
     {
     LOG_INFO << "Checksummed writer opening file " << mPath;
 
@@ -84,7 +86,7 @@ ChecksummedWriter::~ChecksummedWriter()
     if(mFile != nullptr)
         {
         LOG_INFO << "Checksummed writer closing file " << mPath;
-        flush();
+        sync();
         fclose(mFile);
         }
     }
@@ -103,6 +105,19 @@ void ChecksummedWriter::flush()
     mIsDirty = false;
     }
 
+void ChecksummedWriter::sync()
+    {
+    if (!mIsUnsynced)
+        return;
+
+    flush();
+    if (fdatasync(fileno(mFile)) != 0) {
+        LOG_ERROR << "Checksummed writer failed to sync file " << mPath << ". Error:" << errno;
+        return;
+        }
+    mIsUnsynced = false;
+    }
+
 size_t ChecksummedWriter::written() const
     {
     // return number of bytes written to this file..
@@ -139,6 +154,7 @@ void ChecksummedWriter::writeString(const string& str)
         detail::onWriteError(mPath);
 
     mIsDirty = true;
+    mIsUnsynced = true;
     }
 
 
@@ -47,6 +47,9 @@ namespace ChecksummedFile {
 
 			void flush();
 
+			// flush, then wait until the OS has written everything to the device
+			void sync();
+
 			size_t written() const;
 
 			uint64_t fileSize() const;
@@ -65,6 +68,7 @@ namespace ChecksummedFile {
 			std::string				mPath;
 			bool					mDataError;
 			bool					mIsDirty;
+			bool					mIsUnsynced;
 	};
 
 
@@ -87,6 +87,26 @@ class FileIOTest(unittest.TestCase):
         os.unlink(path)
 
 
+    def test_sync(self):
+        path = self.nextTempFilePath()
+        writer = Storage.ChecksummedWriter(path)
+
+        #nothing written yet, so there's nothing to sync
+        writer.sync()
+        self.assertEqual(os.stat(path).st_size, 0)
+
+        toWrite = ['asdfasdfasdf', 'asdfasdfasdfasdfasdf']
+        for string in toWrite:
+            writer.writeString(string)
+        writer.sync()
+        writer.sync()
+
+        self.assertEqual(os.stat(path).st_size, writer.written())
+        success, contents = Storage.readToVector(path)
+        self.assertTrue(success)
+        self.assertEqual(tuple(toWrite), tuple(contents))
+
+
     def corrupted_read(self, writerFactory, toWrite, lastData, corruptFun, successExpected):
         path = self.nextTempFilePath()
         writer = writerFactory(path)
@@ -14,11 +14,18 @@
 
 import unittest
 import os
+import shutil
+import tempfile
 
 import ufora.native.Storage as Storage
+import ufora.native.SharedState as SharedStateNative
 import ufora.native.Json as NativeJson
 import ufora.distributed.SharedState.SharedState as SharedState
 
+#these mirror the thresholds in FileKeyspaceStorage.cppml
+MIN_LOG_BYTES_PER_STATE_BYTE = 0.25
+MAX_LOG_FILES_BEFORE_COMPRESS = 32
+
 
 
 
@@ -75,3 +82,112 @@ class FileKeyspaceCacheTest(unittest.TestCase):
         success, readEntries = Storage.deserializeAllLogEntries(logEntries.values()[0])
         self.assertEqual(tuple(readEntries), tuple(entries))
 
+
+class FileKeyspaceStorageCompressionTest(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.keyspace = SharedState.Keyspace("TakeHighestIdKeyType", json('test_keyspace'), 1)
+        self.nextEventId = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir, ignore_errors=True)
+
+    def filesWithPrefix(self, prefix):
+        return sorted(
+            os.path.join(directory, name)
+            for directory, _, names in os.walk(self.tempDir)
+            for name in names if name.startswith(prefix)
+            )
+
+    def inSession(self, f):
+        """Open the keyspace's storage like a restarted manager would, call 'f' on it,
+        and close its files."""
+        fileStorage = SharedStateNative.Storage.FileStorage(self.tempDir, 100, 10)
+        try:
+            return f(fileStorage.storageForKeyspace(self.keyspace, 0))
+        finally:
+            fileStorage.shutdown()
+
+    def writeSession(self, keyCount, valueSize=64):
+        def write(storage):
+            for ix in range(keyCount):
+                self.nextEventId += 1
+                storage.writeLogEntry(
+                    Storage.createLogEntryEvent(
+                        SharedState.Key(self.keyspace, (json('key-%s' % self.nextEventId),)),
+                        json('x' * valueSize),
+                        self.nextEventId
+                        )
+                    )
+        self.inSession(write)
+
+    def compressSession(self):
+        self.inSession(lambda storage: storage.compress())
+
+    def readKeyCount(self):
+        return self.inSession(lambda storage: len(storage.readKeyValueMap()))
+
+    def createStateFile(self, keyCount=1000):
+        #a single log file is never compressed, so write two
+        self.writeSession(keyCount / 2)
+        self.writeSession(keyCount / 2)
+        self.compressSession()
+        self.assertEqual(len(self.filesWithPrefix('STATE-')), 1)
+
+    def test_small_earlier_logs_are_replayed(self):
+        self.createStateFile()
+
+        self.writeSession(1)
+        self.writeSession(1)
+        self.compressSession()
+
+        self.assertEqual(len(self.filesWithPrefix('STATE-')), 1)
+        self.assertEqual(self.readKeyCount(), 1002)
+
+    def test_earlier_logs_are_compressed_past_a_fraction_of_the_state(self):
+        self.createStateFile()
+        stateFile = self.filesWithPrefix('STATE-')[-1]
+        threshold = os.stat(stateFile).st_size * MIN_LOG_BYTES_PER_STATE_BYTE
+
+        def iteration(path):
+            return os.path.split(path)[1].split('-')[1]
+
+        def earlierLogBytes():
+            return sum(
+                os.stat(path).st_size for path in self.filesWithPrefix('LOG-')
+                if iteration(path) > iteration(stateFile)
+                )
+
+        keysWritten = 0
+        while earlierLogBytes() < threshold:
+            self.compressSession()
+            self.assertEqual(len(self.filesWithPrefix('STATE-')), 1)
+
+            self.writeSession(20)
+            keysWritten += 20
+
+        self.compressSession()
+
+        self.assertEqual(len(self.filesWithPrefix('STATE-')), 2)
+        self.assertEqual(self.readKeyCount(), 1000 + keysWritten)
+
+    def test_earlier_logs_are_compressed_when_there_are_many(self):
+        self.createStateFile()
+
+        while len(self.filesWithPrefix('LOG-')) < MAX_LOG_FILES_BEFORE_COMPRESS - 1:
+            self.writeSession(1)
+        self.compressSession()
+        self.assertEqual(len(self.filesWithPrefix('STATE-')), 1)
+
+        self.writeSession(1)
+        self.compressSession()
+
+        self.assertEqual(len(self.filesWithPrefix('STATE-')), 2)
+        self.assertEqual(
+            self.readKeyCount(),
+            1000 + MAX_LOG_FILES_BEFORE_COMPRESS - 2
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -20,8 +20,10 @@
 
 namespace SharedState {
 
-OpenFiles::OpenFiles(uint32_t maxOpenFiles) :
+OpenFiles::OpenFiles(uint32_t maxOpenFiles, double groupCommitWindowSeconds) :
 		mIsShutdown(false),
+		mGroupCommitWindowSeconds(groupCommitWindowSeconds),
+		mDurableAccessCount(0),
 		mMaxOpenFiles(maxOpenFiles),
 		mFileAccessCount(0)
 	{
@@ -44,6 +46,25 @@ bool OpenFiles::readFileAsStringVector(const std::string& path, std::vector<std:
     return ChecksummedFile::readAllToVector(path, out);
     }
 
+void OpenFiles::whenAppendsAreDurable(boost::function0<void> callback)
+	{
+		{
+		boost::recursive_mutex::scoped_lock lock(mMutex);
+		if (!mIsShutdown && mFileAccessCount > mDurableAccessCount)
+			{
+			// the first waiter wakes the flush loop, which then waits out the
+			// group commit window so that concurrent writers share its sync
+			if (mDurabilityCallbacks.empty())
+				mFlushLoopCondition.notify_all();
+
+			mDurabilityCallbacks.push_back(make_pair(mFileAccessCount, callback));
+			return;
+			}
+		}
+
+	callback();
+	}
+
 void OpenFiles::append(const std::string& path, const std::string& contents)
 	{
 	boost::recursive_mutex::scoped_lock lock(mMutex);
@@ -99,6 +120,7 @@ void OpenFiles::flush(const std::string& path)
 
 void OpenFiles::closeFile(const std::string& path)
 	{
+	boost::recursive_mutex::scoped_lock lock(mMutex);
 	auto it = mOpenFiles.find(path);
 	if(it != mOpenFiles.end())
 		mOpenFiles.erase(it);
@@ -126,7 +148,7 @@ void OpenFiles::shutdown()
 		{
 		boost::recursive_mutex::scoped_lock lock(mMutex);
 		mIsShutdown = true;
-		mShutdownCondition.notify_all();
+		mFlushLoopCondition.notify_all();
 		}
 
 	if (mFlushLoopThread.joinable())
@@ -137,6 +159,9 @@ void OpenFiles::shutdown()
 
 	while (mOpenFiles.size())
 		closeAFile();
+
+	// closing a file syncs it
+	markDurable(mFileAccessCount);
 	}
 
 void OpenFiles::recordFileAccess(const std::string& filename)
@@ -189,10 +214,19 @@ void OpenFiles::flushLoop()
 			{
 			flushFiles(lastSeenAccess+1, currentAccess);
 			lastSeenAccess = currentAccess;
+			markDurable(lastSeenAccess);
 			}
 
 		boost::recursive_mutex::scoped_lock lock(mMutex);
-		mShutdownCondition.timed_wait(lock, boost::posix_time::milliseconds(1000));
+		if (!mIsShutdown && mDurabilityCallbacks.empty())
+			mFlushLoopCondition.timed_wait(lock, boost::posix_time::milliseconds(1000));
+
+		if (!mIsShutdown && !mDurabilityCallbacks.empty())
+			mFlushLoopCondition.timed_wait(
+				lock,
+				boost::posix_time::microseconds(mGroupCommitWindowSeconds * 1000000)
+				);
+
 		shuttingDown = mIsShutdown;
 		currentAccess = mFileAccessCount;
 		}
@@ -219,15 +253,34 @@ void OpenFiles::flushFiles(uint64_t fromAccess, uint64_t toAccess)
 			}
 		}
 
+	// one fdatasync per written file covers every append in the range, which is
+	// what lets concurrent transactions share a commit
 	for (writer_ptr_type fileWriter: accessedFiles)
+		fileWriter->sync();
+	}
+
+
+void OpenFiles::markDurable(uint64_t throughAccess)
+	{
+	std::vector<boost::function0<void> > toCall;
 		{
-		if (fileWriter->isDirty())
-			{
-			fileWriter->flush();
-			}
+		boost::recursive_mutex::scoped_lock lock(mMutex);
+		mDurableAccessCount = std::max(mDurableAccessCount, throughAccess);
+
+		auto it = mDurabilityCallbacks.begin();
+		while (it != mDurabilityCallbacks.end())
+			if (it->first <= mDurableAccessCount)
+				{
+				toCall.push_back(it->second);
+				it = mDurabilityCallbacks.erase(it);
+				}
+			else
+				++it;
 		}
-	}
 
+	for (auto& callback: toCall)
+		callback();
+	}
 
 OpenFiles::writer_ptr_type OpenFiles::getFile(const std::string& filename)
 	{
@@ -17,6 +17,7 @@
 
 #include <unordered_map>
 #include <boost/enable_shared_from_this.hpp>
+#include <boost/function.hpp>
 #include "../../../core/containers/MapWithIndex.hpp"
 #include <boost/thread.hpp>
 
@@ -43,6 +44,9 @@ public:
 
 	virtual bool readFileAsStringVector(const std::string& path,
 										std::vector<std::string>& out) const = 0;
+
+	// call 'callback' once everything appended so far has been synced to disk
+	virtual void whenAppendsAreDurable(boost::function0<void> callback) = 0;
 };
 
 
@@ -52,7 +56,9 @@ public:
 	typedef boost::shared_ptr<writer_type> writer_ptr_type;
 	typedef boost::shared_ptr<const writer_type> const_writer_ptr_type;
 
-	OpenFiles(uint32_t);
+	// appends that arrive within 'groupCommitWindowSeconds' of a request for durability
+	// are synced to disk together
+	OpenFiles(uint32_t maxOpenFiles, double groupCommitWindowSeconds = 0.005);
 
 	virtual ~OpenFiles();
 
@@ -73,10 +79,13 @@ public:
 	virtual bool readFileAsStringVector(const std::string& path,
 										std::vector<std::string>& out) const;
 
+	virtual void whenAppendsAreDurable(boost::function0<void> callback);
+
 private:
 	bool isFlushLoopRunning() const;
 	void flushLoop();
 	void flushFiles(uint64_t fromAccess, uint64_t toAccess);
+	void markDurable(uint64_t throughAccess);
 
 	void recordFileAccess(const std::string& filename);
 	void closeFilesIfNecessary();
@@ -92,9 +101,15 @@ private:
 
 	mutable boost::recursive_mutex mMutex;
 	boost::thread mFlushLoopThread;
-	boost::condition_variable_any mShutdownCondition;
+	boost::condition_variable_any mFlushLoopCondition;
 	bool mIsShutdown;
 
+	double mGroupCommitWindowSeconds;
+
+	uint64_t mDurableAccessCount;
+
+	std::vector<std::pair<uint64_t, boost::function0<void> > > mDurabilityCallbacks;
+
 	std::unordered_map<std::string, writer_ptr_type> mOpenFiles;
 
 	uint32_t mMaxOpenFiles;
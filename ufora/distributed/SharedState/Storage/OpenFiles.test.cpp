@@ -0,0 +1,229 @@
+/***************************************************************************
+   Copyright 2015 Ufora Inc.
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+****************************************************************************/
+#include "OpenFiles.hpp"
+#include "ChecksummedFile.hpp"
+#include "../../../core/UnitTest.hpp"
+#include "../../../core/Clock.hpp"
+
+#include <boost/bind.hpp>
+#include <boost/filesystem.hpp>
+
+using namespace SharedState;
+using namespace boost::filesystem;
+
+namespace {
+
+// records what was on disk for 'path' when the durability callback fired
+class DurabilityObserver {
+public:
+	DurabilityObserver(std::string path) :
+			mPath(path),
+			mFired(false)
+		{
+		}
+
+	boost::function0<void> callback()
+		{
+		return boost::bind(&DurabilityObserver::onDurable, this);
+		}
+
+	bool waitUntilFired(double timeout)
+		{
+		double t0 = curClock();
+
+		while (!fired())
+			{
+			if (curClock() - t0 > timeout)
+				return false;
+			sleepSeconds(.001);
+			}
+
+		return true;
+		}
+
+	bool fired()
+		{
+		boost::mutex::scoped_lock lock(mMutex);
+		return mFired;
+		}
+
+	std::vector<std::string> contentsWhenFired()
+		{
+		boost::mutex::scoped_lock lock(mMutex);
+		return mContents;
+		}
+
+private:
+	void onDurable()
+		{
+		std::vector<std::string> contents;
+		ChecksummedFile::readAllToVector(mPath, contents);
+
+		boost::mutex::scoped_lock lock(mMutex);
+		mContents = contents;
+		mFired = true;
+		}
+
+	boost::mutex mMutex;
+	std::string mPath;
+	bool mFired;
+	std::vector<std::string> mContents;
+};
+
+std::vector<std::string> someContents()
+	{
+	std::vector<std::string> contents;
+	for (long k = 0; k < 10; k++)
+		contents.push_back(std::string(100, 'a' + k));
+	return contents;
+	}
+
+}
+
+BOOST_AUTO_TEST_SUITE( test_SharedState_OpenFiles )
+
+BOOST_AUTO_TEST_CASE( test_callback_fires_immediately_without_pending_appends )
+	{
+	path basePath = unique_path();
+	create_directories(basePath);
+
+		{
+		OpenFiles files(10);
+		DurabilityObserver observer((basePath / "log").string());
+
+		files.whenAppendsAreDurable(observer.callback());
+
+		BOOST_CHECK(observer.fired());
+
+		files.shutdown();
+		}
+
+	remove_all(basePath);
+	}
+
+BOOST_AUTO_TEST_CASE( test_callback_fires_after_appends_are_flushed )
+	{
+	path basePath = unique_path();
+	create_directories(basePath);
+	std::string logPath = (basePath / "log").string();
+
+		{
+		OpenFiles files(10);
+		DurabilityObserver observer(logPath);
+
+		for (auto& s: someContents())
+			files.append(logPath, s);
+
+		files.whenAppendsAreDurable(observer.callback());
+
+		BOOST_CHECK(observer.waitUntilFired(5.0));
+		BOOST_CHECK(observer.contentsWhenFired() == someContents());
+
+		// everything is durable now, so the next waiter doesn't wait for the flush loop
+		DurabilityObserver secondObserver(logPath);
+		files.whenAppendsAreDurable(secondObserver.callback());
+		BOOST_CHECK(secondObserver.fired());
+
+		files.shutdown();
+		}
+
+	remove_all(basePath);
+	}
+
+BOOST_AUTO_TEST_CASE( test_appends_within_the_window_share_a_flush )
+	{
+	path basePath = unique_path();
+	create_directories(basePath);
+	std::string firstPath = (basePath / "first").string();
+	std::string secondPath = (basePath / "second").string();
+
+		{
+		OpenFiles files(10, 0.25);
+		DurabilityObserver firstObserver(firstPath);
+		DurabilityObserver secondObserver(secondPath);
+
+		files.append(firstPath, "first");
+		files.whenAppendsAreDurable(firstObserver.callback());
+
+		files.append(secondPath, "second");
+		files.whenAppendsAreDurable(secondObserver.callback());
+
+		BOOST_CHECK(firstObserver.waitUntilFired(5.0));
+		BOOST_CHECK(secondObserver.waitUntilFired(5.0));
+
+		BOOST_CHECK(firstObserver.contentsWhenFired() == std::vector<std::string>(1, "first"));
+		BOOST_CHECK(secondObserver.contentsWhenFired() == std::vector<std::string>(1, "second"));
+
+		files.shutdown();
+		}
+
+	remove_all(basePath);
+	}
+
+BOOST_AUTO_TEST_CASE( test_callbacks_fire_when_a_file_is_closed_with_pending_appends )
+	{
+	path basePath = unique_path();
+	create_directories(basePath);
+	std::string logPath = (basePath / "log").string();
+
+		{
+		OpenFiles files(10, 0.25);
+		DurabilityObserver observer(logPath);
+
+		for (auto& s: someContents())
+			files.append(logPath, s);
+
+		files.whenAppendsAreDurable(observer.callback());
+
+		// log rotation closes the file while the callback is still waiting for its flush
+		files.closeFile(logPath);
+
+		BOOST_CHECK(observer.waitUntilFired(5.0));
+		BOOST_CHECK(observer.contentsWhenFired() == someContents());
+
+		files.shutdown();
+		}
+
+	remove_all(basePath);
+	}
+
+BOOST_AUTO_TEST_CASE( test_pending_callbacks_fire_at_shutdown )
+	{
+	path basePath = unique_path();
+	create_directories(basePath);
+	std::string logPath = (basePath / "log").string();
+
+		{
+		// a window long enough that only shutdown can release the callback
+		OpenFiles files(10, 60.0);
+		DurabilityObserver observer(logPath);
+
+		for (auto& s: someContents())
+			files.append(logPath, s);
+
+		files.whenAppendsAreDurable(observer.callback());
+
+		files.shutdown();
+
+		BOOST_CHECK(observer.fired());
+		BOOST_CHECK(observer.contentsWhenFired() == someContents());
+		}
+
+	remove_all(basePath);
+	}
+
+BOOST_AUTO_TEST_SUITE_END()
+
@@ -70,6 +70,11 @@ public:
         writer->flush();
         }
 
+    static void sync(boost::shared_ptr<ChecksummedFile::ChecksummedWriter>& writer)
+        {
+        writer->sync();
+        }
+
     static uint64_t written(boost::shared_ptr<ChecksummedFile::ChecksummedWriter>& writer)
         {
         return writer->written();
@@ -100,6 +105,7 @@ public:
         class_<boost::shared_ptr<ChecksummedWriter> >("ChecksummedWriter")
             .def("path", &path)
             .def("flush", &flush)
+            .def("sync", &sync)
             .def("written", &written)
             .def("fileSize", &fileSize)
             .def("writeString", &writeString)
@@ -318,6 +324,12 @@ public:
         return extract<bool>(outTuple[0]);
         }
 
+    void whenAppendsAreDurable(boost::function0<void> callback)
+        {
+        // python appends are written synchronously
+        callback();
+        }
+
     //
     // python wrapper stuff
 
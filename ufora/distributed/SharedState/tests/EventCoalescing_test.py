@@ -0,0 +1,133 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import threading
+import time
+import unittest
+
+import ufora.native.Json as NativeJson
+import ufora.distributed.SharedState.SharedState as SharedState
+import ufora.distributed.SharedState.tests.SharedStateTestHarness as SharedStateTestHarness
+import ufora.distributed.SharedState.Connections.FilteredChannelFactory as FilteredChannelFactory
+
+SPACE_NAME = NativeJson.Json("coalesced")
+UPDATE_COUNT = 200
+
+class EventCounter(object):
+    """A channel filter that counts the Event messages the manager sends to views."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.eventCount = 0
+
+    def __call__(self, message, inputChannel, outputChannel):
+        if isinstance(message, SharedState.MessageIn):
+            with self.lock:
+                self.eventCount += self.countEvents(message)
+        return message
+
+    def countEvents(self, message):
+        if message.isBundle():
+            return sum(self.countEvents(elt) for elt in message.getBundleElements())
+        return 1 if message.isEvent() else 0
+
+
+class EventCoalescingTest(unittest.TestCase):
+    def createHarness(self, eventCoalescingInterval, counter):
+        def channelFactoryFactory(callbackScheduler, manager):
+            return FilteredChannelFactory.FilteredChannelFactory(callbackScheduler, manager, counter)
+
+        return SharedStateTestHarness.SharedStateTestHarness(
+            True,
+            inMemChannelFactoryFactory=channelFactoryFactory,
+            eventCoalescingInterval=eventCoalescingInterval
+            )
+
+    def updateOneKeyRepeatedly(self, eventCoalescingInterval):
+        """Write UPDATE_COUNT values to one key and return how many Event messages
+        the views were sent before they all saw the last one."""
+        counter = EventCounter()
+        harness = self.createHarness(eventCoalescingInterval, counter)
+        try:
+            writer = harness.newView()
+            reader = harness.newView()
+            harness.subscribeToKeyspace(writer, SPACE_NAME)
+            harness.subscribeToKeyspace(reader, SPACE_NAME)
+
+            for ix in range(UPDATE_COUNT):
+                harness.writeToKeyspace(
+                    writer,
+                    SPACE_NAME,
+                    NativeJson.Json("key"),
+                    NativeJson.Json(str(ix))
+                    )
+
+            lastValue = NativeJson.Json(str(UPDATE_COUNT - 1))
+            t0 = time.time()
+            while [v for _, v in harness.getAllItemsFromView(reader, SPACE_NAME)] != [lastValue]:
+                self.assertLess(time.time() - t0, 30.0)
+                time.sleep(0.01)
+
+            return counter.eventCount
+        finally:
+            harness.teardown()
+
+    def test_multi_key_transactions_are_not_dropped(self):
+        #each transaction writes the same 'shared' key and a key of its own. If any of its
+        #partial events were coalesced away, readers would never apply the transaction and
+        #its own key would never appear.
+        harness = self.createHarness(0.5, EventCounter())
+        try:
+            writer = harness.newView()
+            reader = harness.newView()
+            harness.subscribeToKeyspace(writer, SPACE_NAME)
+            harness.subscribeToKeyspace(reader, SPACE_NAME)
+
+            keyspace = SharedState.Keyspace("TakeHighestIdKeyType", SPACE_NAME, 1)
+            for ix in range(UPDATE_COUNT):
+                with SharedState.Transaction(writer):
+                    writer[SharedState.Key(keyspace, (NativeJson.Json("shared"),))] = \
+                        NativeJson.Json(str(ix))
+                    writer[SharedState.Key(keyspace, (NativeJson.Json("own_%s" % ix),))] = \
+                        NativeJson.Json(str(ix))
+
+            expected = dict(
+                [(NativeJson.Json("own_%s" % ix), NativeJson.Json(str(ix)))
+                    for ix in range(UPDATE_COUNT)] +
+                [(NativeJson.Json("shared"), NativeJson.Json(str(UPDATE_COUNT - 1)))]
+                )
+
+            def readerItems():
+                return dict((k[0], v) for k, v in harness.getAllItemsFromView(reader, SPACE_NAME))
+
+            t0 = time.time()
+            while len(readerItems()) < len(expected):
+                self.assertLess(time.time() - t0, 30.0)
+                time.sleep(0.01)
+
+            self.assertEqual(readerItems(), expected)
+        finally:
+            harness.teardown()
+
+    def test_repeated_updates_collapse(self):
+        uncoalesced = self.updateOneKeyRepeatedly(0.0)
+        coalesced = self.updateOneKeyRepeatedly(0.5)
+
+        #every write is echoed to both views when nothing is coalesced
+        self.assertGreaterEqual(uncoalesced, UPDATE_COUNT)
+        self.assertLess(coalesced, uncoalesced / 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
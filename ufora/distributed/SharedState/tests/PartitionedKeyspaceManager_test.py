@@ -0,0 +1,195 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import logging
+import threading
+import time
+import unittest
+
+import ufora.native.Json as NativeJson
+import ufora.distributed.SharedState.SharedState as SharedState
+import ufora.distributed.SharedState.tests.SharedStateTestHarness as SharedStateTestHarness
+import ufora.distributed.SharedState.tests.sharedStateIntrospection_test as sharedStateIntrospection_test
+import ufora.test.PerformanceTestReporter as PerformanceTestReporter
+import ufora.util.RetryAssert as RetryAssert
+
+def keyspaceName(ix):
+    return NativeJson.Json("partitioned_%s" % ix)
+
+def waitForKeyCount(harness, view, spacename, count, timeout=30.0):
+    t0 = time.time()
+    while len(harness.getAllKeysFromView(view, spacename)) < count:
+        if time.time() - t0 > timeout:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class PartitionedKeyspaceManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.harness = SharedStateTestHarness.SharedStateTestHarness(True, partitionCount=4)
+
+    def tearDown(self):
+        self.harness.teardown()
+
+    def test_writes_to_every_partition_are_visible(self):
+        writer = self.harness.newView()
+        reader = self.harness.newView()
+
+        names = [keyspaceName(ix) for ix in range(16)]
+        for name in names:
+            self.harness.subscribeToKeyspace(writer, name)
+            self.harness.writeToKeyspace(writer, name, NativeJson.Json("key"), name)
+
+        for name in names:
+            self.harness.subscribeToKeyspace(reader, name)
+            self.assertTrue(waitForKeyCount(self.harness, reader, name, 1))
+            self.assertEqual(
+                [value for _, value in self.harness.getAllItemsFromView(reader, name)],
+                [name]
+                )
+
+    def test_views_survive_pings(self):
+        view = self.harness.newView()
+        name = keyspaceName(0)
+        self.harness.subscribeToKeyspace(view, name)
+
+        for ix in range(3):
+            self.harness.writeToKeyspace(
+                view,
+                name,
+                NativeJson.Json(str(ix)),
+                NativeJson.Json(str(ix))
+                )
+            self.harness.sendPingAndCompact()
+
+        reader = self.harness.newView()
+        self.harness.subscribeToKeyspace(reader, name)
+        self.assertTrue(waitForKeyCount(self.harness, reader, name, 3))
+
+    def test_first_writes_go_to_every_partition(self):
+        #a new view writes to all partitions straight away, so they must already
+        #know its client id
+        names = [keyspaceName(ix) for ix in range(16)]
+        for _ in range(4):
+            writer = self.harness.newView()
+            for name in names:
+                self.harness.subscribeToKeyspace(writer, name)
+                self.harness.writeToKeyspace(writer, name, NativeJson.Json(str(writer.id)), name)
+
+        reader = self.harness.newView()
+        for name in names:
+            self.harness.subscribeToKeyspace(reader, name)
+            self.assertTrue(waitForKeyCount(self.harness, reader, name, 4))
+
+    def clientStatuses(self, view):
+        with SharedState.Transaction(view):
+            return [
+                (k[0].toSimple(), int(k[1].toSimple()), v.value())
+                for k, v in SharedState.iterItems(view, SharedState.getClientInfoKeyspace())
+                ]
+
+    def test_client_status_is_published_once(self):
+        views = [self.harness.newView() for _ in range(3)]
+        for view in views:
+            view.waitConnect()
+            view.subscribe(
+                SharedState.KeyRange(SharedState.getClientInfoKeyspace(), 1, None, None, True, False)
+                )
+
+        def assertOneStatusPerView():
+            statuses = self.clientStatuses(views[0])
+
+            self.assertEqual(len(set(managerId for managerId, _, _ in statuses)), 1)
+            self.assertEqual(
+                sorted(clientId for _, clientId, _ in statuses),
+                sorted(view.id for view in views)
+                )
+            for _, _, status in statuses:
+                self.assertEqual(status, NativeJson.Json('connected'))
+
+        RetryAssert.retryAssert(assertOneStatusPerView, [], numRetries=50)
+
+
+class PartitionedIntrospectionTest(sharedStateIntrospection_test.IntrospectionTest):
+    def createHarness(self):
+        return SharedStateTestHarness.SharedStateTestHarness(True, partitionCount=4)
+
+
+class PartitionedKeyspaceManagerThroughputTest(unittest.TestCase):
+    def measureTransactionThroughput(self, partitionCount, viewCount=8, transactionsPerView=500):
+        """Write 'transactionsPerView' keys from each of 'viewCount' views, each into its
+        own keyspace, and return the transactions per second the manager absorbed."""
+        harness = SharedStateTestHarness.SharedStateTestHarness(
+            True,
+            partitionCount=partitionCount
+            )
+        try:
+            views = [harness.newView() for _ in range(viewCount)]
+            for ix, view in enumerate(views):
+                harness.subscribeToKeyspace(view, keyspaceName(ix))
+
+            def writeKeys(view, name):
+                for key in range(transactionsPerView):
+                    harness.writeToKeyspace(
+                        view,
+                        name,
+                        NativeJson.Json(str(key)),
+                        NativeJson.Json(str(key))
+                        )
+
+            threads = [
+                threading.Thread(target=writeKeys, args=(view, keyspaceName(ix)))
+                for ix, view in enumerate(views)
+                ]
+
+            t0 = time.time()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            #the transactions have only landed once a fresh view can read them back
+            reader = harness.newView()
+            for ix in range(viewCount):
+                harness.subscribeToKeyspace(reader, keyspaceName(ix))
+                self.assertTrue(
+                    waitForKeyCount(harness, reader, keyspaceName(ix), transactionsPerView)
+                    )
+            elapsed = time.time() - t0
+        finally:
+            harness.teardown()
+
+        throughput = viewCount * transactionsPerView / elapsed
+        logging.info(
+            "%s partition(s): %s transactions in %.2f seconds (%.0f per second)",
+            partitionCount,
+            viewCount * transactionsPerView,
+            elapsed,
+            throughput
+            )
+        return throughput
+
+    @PerformanceTestReporter.PerfTest("python.SharedState.PartitionedThroughput.1Partition")
+    def test_throughput_1_partition(self):
+        self.measureTransactionThroughput(1)
+
+    @PerformanceTestReporter.PerfTest("python.SharedState.PartitionedThroughput.4Partitions")
+    def test_throughput_4_partitions(self):
+        self.measureTransactionThroughput(4)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
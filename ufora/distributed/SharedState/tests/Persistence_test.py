@@ -21,7 +21,10 @@ import shutil
 import ufora.native.Json as NativeJson
 import logging
 import ufora.native.SharedState as SharedStateNative
+import ufora.native.Storage as StorageNative
+import ufora.native.CallbackScheduler as CallbackScheduler
 import ufora.distributed.SharedState.SharedState as SharedState
+import ufora.distributed.SharedState.SharedStateService as SharedStateService
 import ufora.distributed.SharedState.tests.SharedStateTestHarness as SharedStateTestHarness
 import ufora.distributed.SharedState.Storage.LogFilePruner as LogFilePruner
 
@@ -295,6 +298,86 @@ class PersistenceTest(unittest.TestCase):
         self.assertEqual(set(items.keys()), allKeysInView)
         self.assertEqual(set(items.items()), set((x[0][0], x[1]) for x in allItemsFromView))
 
+    def test_flush_responds_once_writes_are_on_disk(self):
+        #the harness never pings, so nothing but the flush request writes the log out
+        for ix in range(20):
+            self.harness.writeToKeyspace(
+                self.view,
+                self.keyspaceName,
+                NativeJson.Json('key%s' % ix),
+                NativeJson.Json('value%s' % ix)
+                )
+
+        self.view.flush()
+
+        readSuccess, serializedEntries = StorageNative.readToVector(
+            getCurLogFile(self.tempDir, self.keyspaceName)
+            )
+        self.assertTrue(readSuccess)
+
+        deserializeSuccess, entries = StorageNative.deserializeAllLogEntries(serializedEntries)
+        self.assertTrue(deserializeSuccess)
+        self.assertEqual(len(entries), 20)
+
+    def writeSessionToKeyspaces(self, keyspaceNames, keyCount):
+        """Write 'keyCount' random values to each keyspace from a new harness and return them."""
+        self.harness = self.newHarness()
+        view = self.harness.newView()
+
+        items = {}
+        for keyspaceName in keyspaceNames:
+            self.harness.subscribeToKeyspace(view, keyspaceName)
+            for ix in range(keyCount):
+                key = self.randomString(8)
+                value = self.randomString()
+                self.harness.writeToKeyspace(view, keyspaceName, key, value)
+                items[(keyspaceName, key)] = value
+
+        view.flush()
+        self.harness.teardown()
+        self.harness = None
+        return items
+
+    def test_reload_after_startup_compression(self):
+        self.harness.teardown()
+        self.harness = None
+
+        keyspaceNames = [NativeJson.Json('compressed-keyspace-%s' % ix) for ix in range(6)]
+
+        #two sessions, so that each keyspace has more than one log file to fold together
+        items = self.writeSessionToKeyspaces(keyspaceNames, 50)
+        items.update(self.writeSessionToKeyspaces(keyspaceNames, 50))
+
+        compressionLoops = []
+        class Service(SharedStateService.SharedStateService):
+            def compressionLoop(self, toCompress, failures):
+                compressionLoops.append(toCompress)
+                SharedStateService.SharedStateService.compressionLoop(self, toCompress, failures)
+
+        service = Service(
+            CallbackScheduler.singletonForTesting(),
+            cachePathOverride=self.tempDir,
+            compressionThreadCount=4
+            )
+        try:
+            service.compressOrphandLogFiles()
+        finally:
+            service.keyspaceManager.shutdown()
+
+        self.assertEqual(len(compressionLoops), 4)
+        for keyspaceName in keyspaceNames:
+            self.assertEqual(len(getStateFiles(self.tempDir, keyspaceName)), 1)
+
+        self.harness = self.newHarness()
+        view = self.harness.newView()
+        reloaded = {}
+        for keyspaceName in keyspaceNames:
+            self.harness.subscribeToKeyspace(view, keyspaceName)
+            for key, value in self.harness.getAllItemsFromView(view, keyspaceName):
+                reloaded[(keyspaceName, key[0])] = value
+
+        self.assertEqual(reloaded, items)
+
     def test_long_keyspace(self):
         longKeyspace = ''.join(chr(x + ord('a')) for x in range(26)) * 9
         self.harness.subscribeToKeyspace(self.view, NativeJson.Json(longKeyspace))
@@ -31,22 +31,34 @@ class SharedStateTestHarness(object):
             maxOpenFiles = 256,
             inMemChannelFactoryFactory = None,
             maxLogFileSizeMb = 10,
-            pingInterval = None):
+            pingInterval = None,
+            partitionCount = 1,
+            eventCoalescingInterval = None):
 
         self.inMemory = inMemory
         self.manager = None
         self.callbackScheduler = CallbackScheduler.singletonForTesting()
 
         if self.inMemory:
-            self.manager = SharedStateService.KeyspaceManager(
-                10001,
-                1,
+            managerArgs = dict(
                 cachePathOverride=cachePathOverride,
                 pingInterval = IN_MEMORY_HARNESS_PING_INTERVAL if pingInterval is None else pingInterval,
                 maxOpenFiles=maxOpenFiles,
-                maxLogFileSizeMb=maxLogFileSizeMb
+                maxLogFileSizeMb=maxLogFileSizeMb,
+                eventCoalescingInterval=eventCoalescingInterval
                 )
 
+            if partitionCount > 1:
+                self.manager = SharedStateService.PartitionedKeyspaceManager(
+                    self.callbackScheduler,
+                    partitionCount,
+                    10001,
+                    1,
+                    **managerArgs
+                    )
+            else:
+                self.manager = SharedStateService.KeyspaceManager(10001, 1, **managerArgs)
+
             #although named otherwise InMemoryChannelFactory is actually a factory for a channelFactory
             # or a channelFactoryFactory
 
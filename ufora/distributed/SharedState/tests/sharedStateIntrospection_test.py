@@ -25,8 +25,11 @@ import random
 
 
 class IntrospectionTest(unittest.TestCase):
+    def createHarness(self):
+        return SharedStateTestHarness.SharedStateTestHarness(True)
+
     def setUp(self):
-        self.harness = SharedStateTestHarness.SharedStateTestHarness(True)
+        self.harness = self.createHarness()
         self.manager = SharedStateService.KeyspaceManager(10001,1, pingInterval=1)
         self.introKeyspace = SharedState.getClientInfoKeyspace()
         self.introRange = SharedState.KeyRange(self.introKeyspace, 1, None, None, True, False)
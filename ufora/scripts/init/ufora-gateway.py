@@ -42,6 +42,14 @@ def createArgumentParser():
                         default=os.getenv("UFORA_GATEWAY_CLUSTER_NAME", "(default)"),
                         help=("The name of the cluster this gateway is connected to. "
                               "Default: %(default)s"))
+
+    parser.add_argument('-w',
+                        '--worker-pool-size',
+                        type=int,
+                        default=int(os.getenv("UFORA_GATEWAY_WORKER_POOL_SIZE", 0)),
+                        help=("The number of pre-started connection handler processes. "
+                              "If zero, a new process is started for every connection. "
+                              "Default: %(default)s"))
     return parser
 
 
@@ -51,7 +59,8 @@ def createService(args):
     channelListener = ChannelListener.SocketListener(args.port)
     return BackendGatewayService.BackendGatewayService(callbackScheduler,
                                                        channelListener,
-                                                       args.store_address)
+                                                       args.store_address,
+                                                       args.worker_pool_size)
 
 
 def main(args):
@@ -24,11 +24,16 @@ import ufora.distributed.util.common as common
 import cPickle as pickle
 import Queue as Queue
 import ufora.core.SubprocessRunner as SubprocessRunner
+import ufora.util.SharedMemoryFile as SharedMemoryFile
 
 BYTE_DATA = "D"
 BYTE_EXCEPTION = "E"
+BYTE_SHARED_MEMORY = "S"
 FORK_START_TIMEOUT = 5.0
 
+#results at least this large are handed back in a shared-memory file rather than the pipe
+SHARED_MEMORY_RESULT_THRESHOLD = 1024 * 1024
+
 class HeartbeatLogger:
     def __init__(self, msg, timeout=1.0):
         self.msg = msg
@@ -63,6 +68,10 @@ class OutOfProcessDownloader:
 
     Queries must be pickleable callables. Clients will either receive an exception or have
     the result passed to them as a file descriptor and a bytecount containing the answer.
+
+    Small results come back through the pipe. Large ones, and callables that return a
+    SharedMemoryFile they've filled in directly, come back as a shared-memory file that the
+    client reads from in place, so the data never has to pass through the pipe.
     """
 
     def __init__(self, actuallyRunOutOfProcess, childPipes = None):
@@ -154,12 +163,12 @@ class OutOfProcessDownloader:
                     if not isException and outgoingMessage is None:
                         return
 
-                finalValueToWrite = (
-                    (BYTE_EXCEPTION if isException else BYTE_DATA) +
-                    common.longToString(len(outgoingMessage)) + outgoingMessage
-                    )
+                tag, outgoingMessage = self.encodeResult_(isException, outgoingMessage)
 
-                os.write(self.childWriteFD, finalValueToWrite)
+                os.write(
+                    self.childWriteFD,
+                    tag + common.longToString(len(outgoingMessage)) + outgoingMessage
+                    )
         except:
             logging.error("Main OutOfProcessDownloader loop failed: %s", traceback.format_exc())
         finally:
@@ -167,6 +176,28 @@ class OutOfProcessDownloader:
             if self.actuallyRunOutOfProcess:
                 os._exit(0)
 
+    def encodeResult_(self, isException, outgoingMessage):
+        """Return the tag and payload to send to the parent for the result of a callable."""
+        if isException:
+            return BYTE_EXCEPTION, outgoingMessage
+
+        if isinstance(outgoingMessage, SharedMemoryFile.SharedMemoryFile):
+            outgoingMessage.close()
+            return BYTE_SHARED_MEMORY, outgoingMessage.path
+
+        if len(outgoingMessage) < SHARED_MEMORY_RESULT_THRESHOLD:
+            return BYTE_DATA, outgoingMessage
+
+        sharedFile = SharedMemoryFile.SharedMemoryFile(len(outgoingMessage))
+        try:
+            sharedFile.write(0, outgoingMessage)
+            sharedFile.close()
+        except:
+            sharedFile.unlink()
+            raise
+
+        return BYTE_SHARED_MEMORY, sharedFile.path
+
     def runOutOfProc(self):
         isException = None
         outgoingMessage = None
@@ -188,7 +219,8 @@ class OutOfProcessDownloader:
             outgoingMessage = callableObj() if msgInput is None else \
                 callableObj(msgInput)
 
-            assert isinstance(outgoingMessage, str), "Callable %s returned %s, not str" % (callableObj, type(outgoingMessage))
+            assert isinstance(outgoingMessage, (str, SharedMemoryFile.SharedMemoryFile)), \
+                "Callable %s returned %s, not str" % (callableObj, type(outgoingMessage))
 
             isException = False
         except Exception as e:
@@ -230,7 +262,8 @@ class OutOfProcessDownloader:
         try:
             outgoingMessage = callback()
 
-            assert isinstance(outgoingMessage, str), "Callable %s returned %s, not str" % (callback, type(outgoingMessage))
+            assert isinstance(outgoingMessage, (str, SharedMemoryFile.SharedMemoryFile)), \
+                "Callable %s returned %s, not str" % (callback, type(outgoingMessage))
 
             isException = False
         except Exception as e:
@@ -256,7 +289,8 @@ class OutOfProcessDownloader:
     def executeAndCallback(self, toExecute, outputCallback, inputCallback=None):
         ''' Runs a callable in a separate process, marshalling input/output via callback.
 
-        toExecute      - a callable that can be pickled
+        toExecute      - a callable that can be pickled. It returns either a string or a
+                         SharedMemoryFile holding its result.
         outputCallback - a callback taking a file-descriptor and an integer representing
                          the number of bytes that can be read from the descriptor.
         inputCallback  - a callback that takes a file-descriptor and writes a 4-byte
@@ -294,42 +328,129 @@ class OutOfProcessDownloader:
 
             prefix = os.read(self.parentReadFD, 5)
 
-            assert prefix[0] in (BYTE_EXCEPTION, BYTE_DATA), prefix
-            isException = prefix[0] == BYTE_EXCEPTION
+            assert prefix[0] in (BYTE_EXCEPTION, BYTE_DATA, BYTE_SHARED_MEMORY), prefix
 
             msgSize = common.stringToLong(prefix[1:5])
 
-            if isException:
+            if prefix[0] == BYTE_EXCEPTION:
                 pickledException = os.read(self.parentReadFD, msgSize)
                 raise pickle.loads(pickledException)
+            elif prefix[0] == BYTE_SHARED_MEMORY:
+                SharedMemoryFile.consume(os.read(self.parentReadFD, msgSize), outputCallback)
             else:
                 outputCallback(self.parentReadFD, msgSize)
 
 
 class OutOfProcessDownloaderPool:
-    """Models a pool of out-of-process-downloaders"""
-    def __init__(self, maxProcesses, actuallyRunOutOfProcess = True):
-        self.downloadersQueue = Queue.Queue()
+    """Models a pool of out-of-process-downloaders.
 
-        self.allDownloaders = []
+    The pool starts 'minProcesses' downloaders up front (by default, all 'maxProcesses' of
+    them). When a client needs one and they're all busy, it starts another, up to
+    'maxProcesses'. Downloaders beyond 'minProcesses' that sit idle for 'idleTimeout' seconds
+    are shut down.
+    """
+    def __init__(self,
+                 maxProcesses,
+                 actuallyRunOutOfProcess=True,
+                 minProcesses=None,
+                 idleTimeout=60.0):
+        self.maxProcesses = maxProcesses
+        self.minProcesses = maxProcesses if minProcesses is None else min(minProcesses,
+                                                                          maxProcesses)
+        self.actuallyRunOutOfProcess = actuallyRunOutOfProcess
+        self.idleTimeout = idleTimeout
 
-        for ix in range(maxProcesses):
-            downloader = OutOfProcessDownloader(actuallyRunOutOfProcess)
-            downloader.start()
-            self.downloadersQueue.put(downloader)
+        self.lock = threading.Condition()
+
+        #(downloader, time it went idle). we hand out the most recently used first, so that
+        #any extra downloaders are the ones left idle long enough to be shut down
+        self.idleDownloaders = []
+        self.allDownloaders = []
+        self.downloadersStarting = 0
 
+        for ix in range(self.minProcesses):
+            downloader = self.startDownloader_()
+            self.idleDownloaders.append((downloader, time.time()))
             self.allDownloaders.append(downloader)
 
+        self.reaperStopped = threading.Event()
+        self.reaperThread = None
+        if self.minProcesses < self.maxProcesses:
+            self.reaperThread = ManagedThread.ManagedThread(target=self.reapIdleDownloaders_)
+            self.reaperThread.start()
+
+    def startDownloader_(self):
+        downloader = OutOfProcessDownloader(self.actuallyRunOutOfProcess)
+        downloader.start()
+        return downloader
+
     def getDownloader(self):
         return OutOfProcessDownloadProxy(self)
 
+    def processCount(self):
+        with self.lock:
+            return len(self.allDownloaders)
+
     def checkoutDownloader_(self):
-        return self.downloadersQueue.get()
+        with self.lock:
+            while (not self.idleDownloaders and
+                   len(self.allDownloaders) + self.downloadersStarting >= self.maxProcesses):
+                self.lock.wait()
+
+            if self.idleDownloaders:
+                return self.idleDownloaders.pop()[0]
+
+            self.downloadersStarting += 1
+
+        downloader = None
+        try:
+            downloader = self.startDownloader_()
+        finally:
+            with self.lock:
+                self.downloadersStarting -= 1
+                if downloader is not None:
+                    self.allDownloaders.append(downloader)
+                    logging.info(
+                        "OutOfProcessDownloaderPool grew to %s downloaders",
+                        len(self.allDownloaders)
+                        )
+                else:
+                    self.lock.notify()
+
+        return downloader
 
     def checkinDownloader_(self, downloader):
-        self.downloadersQueue.put(downloader)
+        with self.lock:
+            self.idleDownloaders.append((downloader, time.time()))
+            self.lock.notify()
+
+    def reapIdleDownloaders_(self):
+        while not self.reaperStopped.wait(min(self.idleTimeout, 1.0)):
+            toStop = []
+
+            with self.lock:
+                cutoff = time.time() - self.idleTimeout
+                while (self.idleDownloaders and
+                       self.idleDownloaders[0][1] < cutoff and
+                       len(self.allDownloaders) > self.minProcesses):
+                    downloader = self.idleDownloaders.pop(0)[0]
+                    self.allDownloaders.remove(downloader)
+                    toStop.append(downloader)
+
+            for downloader in toStop:
+                downloader.stop()
+
+            if toStop:
+                logging.info(
+                    "OutOfProcessDownloaderPool shrank to %s downloaders",
+                    self.processCount()
+                    )
 
     def teardown(self):
+        if self.reaperThread is not None:
+            self.reaperStopped.set()
+            self.reaperThread.join()
+
         for d in self.allDownloaders:
             d.stop()
 
@@ -16,7 +16,9 @@ import unittest
 import ufora.util.OutOfProcessDownloader as OutOfProcessDownloader
 import ufora.config.Mainline as Mainline
 import ufora.distributed.util.common as common
+import ufora.util.SharedMemoryFile as SharedMemoryFile
 import Queue
+import threading
 import time
 import logging
 import os
@@ -31,6 +33,22 @@ def assertsFalse():
 def echoInput(toEcho):
     return toEcho
 
+def returnsALargeString():
+    return "x" * (OutOfProcessDownloader.SHARED_MEMORY_RESULT_THRESHOLD * 3)
+
+def returnsASharedMemoryFile():
+    result = SharedMemoryFile.SharedMemoryFile(10)
+    result.write(0, "0123456789")
+    return result
+
+class Sleeps:
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def __call__(self):
+        time.sleep(self.seconds)
+        return "slept"
+
 class DoublesString:
     def __init__(self, x):
         self.x = x
@@ -118,3 +136,65 @@ class OutOfProcessDownloaderTestCases:
         finally:
             pool.teardown()
 
+    def test_large_results_use_shared_memory(self):
+        self.verifyLargeResults()
+
+    def test_large_results_use_shared_memory_in_proc(self):
+        self.verifyLargeResults(actuallyRunOutOfProcess=False)
+
+    def verifyLargeResults(self, actuallyRunOutOfProcess=True):
+        pool = OutOfProcessDownloader.OutOfProcessDownloaderPool(1, actuallyRunOutOfProcess)
+        try:
+            queue = Queue.Queue()
+
+            pool.getDownloader().executeAndCallbackWithString(returnsALargeString, queue.put)
+            self.assertEqual(queue.get(), returnsALargeString())
+
+            def readsFromAFile(fd, size):
+                self.assertFalse(os.path.exists("/proc/self/fd/%s" % fd) and
+                                 os.readlink("/proc/self/fd/%s" % fd).startswith("pipe:"))
+                queue.put(os.read(fd, size))
+
+            pool.getDownloader().executeAndCallbackWithFileDescriptor(
+                returnsASharedMemoryFile,
+                readsFromAFile
+                )
+            self.assertEqual(queue.get(), "0123456789")
+        finally:
+            pool.teardown()
+
+    def test_pool_grows_and_shrinks_with_demand(self):
+        pool = OutOfProcessDownloader.OutOfProcessDownloaderPool(
+            3,
+            actuallyRunOutOfProcess=False,
+            minProcesses=1,
+            idleTimeout=0.5
+            )
+        try:
+            self.assertEqual(pool.processCount(), 1)
+
+            queue = Queue.Queue()
+            threads = [
+                threading.Thread(
+                    target=lambda: pool.getDownloader().executeAndCallbackWithString(
+                        Sleeps(0.5),
+                        queue.put
+                        )
+                    )
+                for _ in range(3)
+                ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            self.assertEqual([queue.get() for _ in range(3)], ["slept"] * 3)
+            self.assertEqual(pool.processCount(), 3)
+
+            t0 = time.time()
+            while pool.processCount() > 1 and time.time() - t0 < 10.0:
+                time.sleep(0.1)
+
+            self.assertEqual(pool.processCount(), 1)
+        finally:
+            pool.teardown()
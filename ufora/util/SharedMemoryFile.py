@@ -0,0 +1,83 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""Memory-backed files that one process fills in place and another loads from a descriptor.
+
+The writer maps the file and writes each piece of data at its offset as it arrives, so it
+never holds a second copy of the contents. The reader opens the file by path, hands the
+descriptor to whatever consumes it (e.g. the VDM), and deletes it.
+"""
+
+import mmap
+import os
+import tempfile
+
+SHARED_MEMORY_DIRECTORY = "/dev/shm"
+
+def sharedMemoryDirectory():
+    if os.path.isdir(SHARED_MEMORY_DIRECTORY) and os.access(SHARED_MEMORY_DIRECTORY, os.W_OK):
+        return SHARED_MEMORY_DIRECTORY
+    return tempfile.gettempdir()
+
+
+class SharedMemoryFile(object):
+    def __init__(self, size, prefix="ufora_"):
+        self.size = size
+        self.mapped = None
+
+        fd, self.path = tempfile.mkstemp(prefix=prefix, dir=sharedMemoryDirectory())
+        try:
+            os.ftruncate(fd, size)
+            if size > 0:
+                self.mapped = mmap.mmap(fd, size)
+        except:
+            os.close(fd)
+            self.unlink()
+            raise
+
+        os.close(fd)
+
+    def write(self, offset, data):
+        assert offset + len(data) <= self.size
+        self.mapped[offset:offset + len(data)] = data
+
+    def close(self):
+        """Unmap the file, leaving it in place for a reader."""
+        if self.mapped is not None:
+            self.mapped.close()
+            self.mapped = None
+
+    def unlink(self):
+        self.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def consume(path, callbackTakingFDAndSize):
+    """Call 'callbackTakingFDAndSize' with an open descriptor for 'path' and its size, then
+    delete the file."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            return callbackTakingFDAndSize(fd, os.fstat(fd).st_size)
+        finally:
+            os.close(fd)
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
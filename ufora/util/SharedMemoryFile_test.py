@@ -0,0 +1,56 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import os
+import unittest
+
+import ufora.util.SharedMemoryFile as SharedMemoryFile
+
+class SharedMemoryFileTest(unittest.TestCase):
+    def test_writes_at_offsets_are_visible_to_readers(self):
+        sharedFile = SharedMemoryFile.SharedMemoryFile(10)
+        sharedFile.write(5, "world")
+        sharedFile.write(0, "hello")
+        sharedFile.close()
+
+        contents = []
+        SharedMemoryFile.consume(
+            sharedFile.path,
+            lambda fd, size: contents.append(os.read(fd, size))
+            )
+
+        self.assertEqual(contents, ["helloworld"])
+        self.assertFalse(os.path.exists(sharedFile.path))
+
+    def test_consume_deletes_the_file_when_the_callback_fails(self):
+        sharedFile = SharedMemoryFile.SharedMemoryFile(4)
+        sharedFile.close()
+
+        def fail(fd, size):
+            raise IOError("couldn't load")
+
+        with self.assertRaises(IOError):
+            SharedMemoryFile.consume(sharedFile.path, fail)
+
+        self.assertFalse(os.path.exists(sharedFile.path))
+
+    def test_unlink(self):
+        sharedFile = SharedMemoryFile.SharedMemoryFile(0)
+        sharedFile.unlink()
+        self.assertFalse(os.path.exists(sharedFile.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
@@ -0,0 +1,104 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import logging
+import Queue
+import sys
+import threading
+import traceback
+
+import ufora.util.ManagedThread as ManagedThread
+
+class ThreadPool(object):
+    """A fixed set of long-lived threads that run batches of callables.
+
+    Threads are started on first use and live as long as the process. Callables run on the
+    pool must not themselves wait on the pool, or they can deadlock it.
+    """
+    def __init__(self, threadCount):
+        self.threadCount = threadCount
+        self.queue_ = Queue.Queue()
+        self.threads_ = []
+        self.lock_ = threading.Lock()
+
+    def runAll(self, callables):
+        """Run every callable on the pool and return their results in order.
+
+        If any callable raises, the exception of the first one that did is re-raised (with
+        its traceback) once they have all finished.
+        """
+        self.ensureStarted_()
+
+        batch = Batch(len(callables))
+        for ix, toCall in enumerate(callables):
+            self.queue_.put((batch, ix, toCall))
+
+        batch.wait()
+
+        for succeeded, result in batch.results:
+            if not succeeded:
+                raise result[0], result[1], result[2]
+
+        return [result for _, result in batch.results]
+
+    def submit(self, toCall):
+        """Run 'toCall' on the pool without waiting for it.
+
+        'toCall' is responsible for reporting its own result; exceptions that escape it are
+        logged and dropped.
+        """
+        self.ensureStarted_()
+        self.queue_.put((None, None, toCall))
+
+    def ensureStarted_(self):
+        with self.lock_:
+            while len(self.threads_) < self.threadCount:
+                thread = ManagedThread.ManagedThread(target=self.workerLoop_)
+                thread.start()
+                self.threads_.append(thread)
+
+    def workerLoop_(self):
+        while True:
+            batch, ix, toCall = self.queue_.get()
+            if batch is None:
+                try:
+                    toCall()
+                except:
+                    logging.error("ThreadPool task %s failed:\n%s", toCall, traceback.format_exc())
+                continue
+
+            try:
+                batch.complete(ix, (True, toCall()))
+            except:
+                batch.complete(ix, (False, sys.exc_info()))
+
+
+class Batch(object):
+    def __init__(self, count):
+        self.results = [None] * count
+        self.remaining = count
+        self.condition = threading.Condition()
+
+    def complete(self, ix, result):
+        with self.condition:
+            self.results[ix] = result
+            self.remaining -= 1
+            if self.remaining == 0:
+                self.condition.notify_all()
+
+    def wait(self):
+        with self.condition:
+            while self.remaining > 0:
+                self.condition.wait()
+
@@ -0,0 +1,78 @@
+#   Copyright 2015 Ufora Inc.
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import threading
+import unittest
+
+import ufora.util.ThreadPool as ThreadPool
+
+class ThreadPoolTest(unittest.TestCase):
+    def test_results_are_in_order(self):
+        pool = ThreadPool.ThreadPool(4)
+        self.assertEqual(
+            pool.runAll([lambda ix=ix: ix * ix for ix in range(20)]),
+            [ix * ix for ix in range(20)]
+            )
+
+    def test_threads_are_reused(self):
+        pool = ThreadPool.ThreadPool(2)
+        threadIds = set()
+
+        def recordThread():
+            threadIds.add(threading.current_thread().ident)
+
+        for _ in range(5):
+            pool.runAll([recordThread] * 4)
+
+        self.assertLessEqual(len(threadIds), 2)
+
+    def test_exceptions_are_reraised_after_the_batch(self):
+        pool = ThreadPool.ThreadPool(2)
+        finished = []
+
+        def fail():
+            raise ValueError("bad range")
+
+        def succeed():
+            finished.append(True)
+
+        with self.assertRaises(ValueError):
+            pool.runAll([succeed, fail, succeed])
+
+        self.assertEqual(len(finished), 2)
+
+    def test_submit_does_not_wait(self):
+        pool = ThreadPool.ThreadPool(2)
+        release = threading.Event()
+        finished = threading.Event()
+
+        def slow():
+            release.wait()
+            finished.set()
+
+        pool.submit(slow)
+        self.assertEqual(pool.runAll([lambda: 1]), [1])
+        self.assertFalse(finished.is_set())
+
+        release.set()
+        finished.wait(5.0)
+        self.assertTrue(finished.is_set())
+
+    def test_empty_batch(self):
+        self.assertEqual(ThreadPool.ThreadPool(1).runAll([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
+